@@ -1,11 +1,10 @@
-from utils import query_bedrock_with_multiple_files, try_parse_json_like
-from prompt_loader import TASK_PROMPT_REGISTRY
-from model_registry import ModelRegistry
-import json
+from utils import aquery_bedrock_with_multiple_files, try_parse_json_like, build_prompt_payload
+from prompt_loader import TASK_PROMPT_REGISTRY, split_prompt_template
+from utils.model_router import routed_call, expect_json
 from state import PipelineState
 
 
-def run_checklist(state: PipelineState) -> PipelineState:
+async def run_checklist(state: PipelineState) -> PipelineState:
     parsed = state.get("parsed_data", {})
     if not parsed:
         return {
@@ -15,14 +14,20 @@ def run_checklist(state: PipelineState) -> PipelineState:
             }
         }
 
-    doc_text = json.dumps(parsed, indent=2)
-    prompt = TASK_PROMPT_REGISTRY.get(
-        "CHECKLIST", "").replace("{doc_text}", doc_text)
+    doc_text = build_prompt_payload(parsed, "checklist")
+    static_prompt, prompt_suffix = split_prompt_template(
+        TASK_PROMPT_REGISTRY.get("CHECKLIST", ""), "{doc_text}")
 
-    response = query_bedrock_with_multiple_files(
-        prompt=prompt,
-        files=[],  # No files needed — we already have parsed data
-        model_id=ModelRegistry.sonnet_3_5
+    response, _ = await routed_call(
+        "Checklist",
+        lambda model_id: aquery_bedrock_with_multiple_files(
+            prompt=doc_text + prompt_suffix,
+            files=[],  # No files needed — we already have parsed data
+            model_id=model_id,
+            cache_prefix=static_prompt,
+            agent="Checklist"
+        ),
+        expect_json((list, dict))
     )
     parsed = try_parse_json_like(response)
     return {
@@ -1,75 +1,100 @@
-from utils import query_bedrock_with_multiple_files, try_parse_json_like
-from prompt_loader import TASK_PROMPT_REGISTRY
-from model_registry import ModelRegistry
-from utils import create_doc_messages
-from utils.embedding_utils_opensearch import search_similar_description
-import json
-import boto3
+from utils import try_parse_json_like, get_response_text
+from prompt_loader import TASK_PROMPT_REGISTRY, split_prompt_template
+from utils.model_router import routed_call, expect_json, CONFIDENCE_INSTRUCTION
+from utils import create_doc_messages, aconverse, log_token_usage, build_prompt_payload
 from state import PipelineState
-import numpy as np
 
 
-bedrock = boto3.client(service_name='bedrock-runtime')
+GOODS_SERVICES_LABELS = ("goods", "service", "uncertain")
 
-def goods_services_classification(parsed_data) -> str:   
+
+async def goods_services_classification(parsed_data) -> str:
     base_prompt = TASK_PROMPT_REGISTRY.get("GOODS_SERVICES", "")
-    final_prompt = base_prompt.replace("{parsed_data}", str(parsed_data))
-    messages = create_doc_messages(final_prompt, [])
+    static_prompt, prompt_suffix = split_prompt_template(base_prompt, "{parsed_data}")
+    payload = build_prompt_payload(parsed_data, "goods_services")
+
+    async def ask(model_id):
+        messages = create_doc_messages(
+            payload + prompt_suffix, [],
+            cache_prefix=static_prompt, model_id=model_id)
+        response = await aconverse(
+            modelId=model_id,
+            messages=messages,
+            inferenceConfig={
+                "temperature": 0.3
+            }
+        )
+        log_token_usage("Goods/Services Classification", model_id, response)
+        return get_response_text(response)
+
+    # "uncertain" is the model saying it is not sure: ask the larger one
+    full_text, _ = await routed_call(
+        "Goods/Services Classification", ask,
+        lambda text: None if build_goods_services_result(text)["classification"] != "uncertain"
+        else "low_confidence")
+    return full_text
 
-    print(messages)
 
-    response = bedrock.converse(
-        modelId=ModelRegistry.sonnet_3_7,
-        messages=messages,
-        inferenceConfig={
-            "temperature": 0.3
-        }
-    )
+def build_goods_services_result(full_text: str) -> dict:
+    label = full_text.strip().strip('"').lower()
+    return {
+        "classification": label if label in GOODS_SERVICES_LABELS else "uncertain",
+        "full_text": full_text
+    }
 
-    output_message = response["output"]["message"]
-    full_text = ""
-    for block in output_message["content"]:
-        if "text" in block:
-            full_text += block["text"]
 
-    return full_text
-
-async def run_data_sec_classification(state: PipelineState) -> PipelineState:
+async def run_goods_services_classification(state: PipelineState) -> PipelineState:
+    """Own graph node, so it runs alongside the security classification instead of before it."""
     parsed_data = state.get("parsed_data", {})
     if not parsed_data:
         return {
-            "Data Security": {
+            "goods_services": {
                 "error": "❌ No parsed data available"
             }
         }
 
     try:
-        gs_result = goods_services_classification(parsed_data)
-        print(gs_result)
-        # Continue to data security classification regardless of goods/services
-    except:
-        print("error")
-
-
-    base_prompt = TASK_PROMPT_REGISTRY.get("SECURITY_CLASSIFICATION", "")
-    final_prompt = base_prompt.replace("{parsed_data}", str(parsed_data))
-    messages = create_doc_messages(final_prompt, [])
+        full_text = await goods_services_classification(parsed_data)
+    except Exception as e:
+        return {
+            "goods_services": {
+                "error": f"❌ Exception: {str(e)}"
+            }
+        }
+    return {"goods_services": build_goods_services_result(full_text)}
 
-    print(messages)
 
-    response = bedrock.converse(
-        modelId=ModelRegistry.sonnet_3_7,
-        messages=messages,
-        inferenceConfig={
-            "temperature": 0.5
+async def run_data_sec_classification(state: PipelineState) -> PipelineState:
+    parsed_data = state.get("parsed_data", {})
+    if not parsed_data:
+        return {
+            "data_security": {
+                "error": "❌ No parsed data available"
+            }
         }
-    )
 
-    output_message = response["output"]["message"]
-    full_text = ""
-    for block in output_message["content"]:
-        if "text" in block:
-            full_text += block["text"]
+    # The ~13 KB protection-level guide is static, so it goes first as a cached prefix
+    base_prompt = TASK_PROMPT_REGISTRY.get("SECURITY_CLASSIFICATION", "")
+    static_prompt, prompt_suffix = split_prompt_template(base_prompt, "{parsed_data}")
+    payload = build_prompt_payload(parsed_data, "data_security")
+
+    async def ask(model_id):
+        messages = create_doc_messages(
+            payload + prompt_suffix + CONFIDENCE_INSTRUCTION, [],
+            cache_prefix=static_prompt, model_id=model_id)
+        response = await aconverse(
+            modelId=model_id,
+            messages=messages,
+            inferenceConfig={
+                "temperature": 0.5
+            }
+        )
+        log_token_usage("Data Security Classification", model_id, response)
+        return get_response_text(response)
+
+    full_text, _ = await routed_call(
+        "Data Security Classification", ask,
+        expect_json(required=("protection_level",), check_confidence=True))
 
     parsed = try_parse_json_like(full_text)
     if not parsed:
@@ -82,7 +107,3 @@ async def run_data_sec_classification(state: PipelineState) -> PipelineState:
     # parsed["similarity_search_classification"] = similarity_search_classification
 
     return {"data_security": parsed}
-
-
-
-
@@ -97,40 +97,53 @@
 #     return {"parsed_data": parsed}
 
 
+import os
 import asyncio
 from tools import build_general_doc_prompt_from_file
 from utils import (
     try_parse_json_like,
     query_bedrock_with_multiple_files_with_tools,
-    compress_file_if_needed,
-    get_file_size_mb,
-    MAX_CHUNK_SIZE_MB
+    aquery_bedrock_with_multiple_files,
+    aquery_bedrock_with_multiple_files_with_tools
 )
+from utils.file_compression_utils import split_pdf, acompress_to_fit, size_limit_mb, get_compression_pool
+from utils.image_normalize import is_image, normalize_image, ImageDeduper
+from utils.chunk_merge import page_windows, merge_chunk_results
+from utils.parse_cache import parse_cache_key, cache_get, cache_put
+from utils.doc_classifier import classify_document, DocTypeGuess
+from utils import doc_classifier
+from utils.pdf_text import is_pdf, extract_text_layer
+from utils.prompt_payload import estimate_tokens
+from utils.telemetry import record_text_layer
+from utils.s3_attachment_loader import resolve_attachment, attachment_in_memory, NamedBytesIO
 from model_registry import ModelRegistry
+from prompt_loader import PARSER_PROMPT_REGISTRY, TASK_PROMPT_REGISTRY
 from tools import get_tool_config
 from state import PipelineState
-# from config.processing_limits import (
-#     MAX_DOCUMENTS_PER_BATCH, 
-#     BATCH_DELAY_SECONDS,
-#     MAX_RETRIES,
-#     RETRY_DELAY_SECONDS,
-#     ENABLE_PROGRESS_LOGGING
-# )
+from config.processing_limits import (
+    ENABLE_PROGRESS_LOGGING,
+    ENABLE_TEXT_LAYER,
+    TEXT_LAYER_MIN_QUALITY,
+    PDF_PAGE_TOKEN_ESTIMATE,
+    ENABLE_CHUNKED_PARSING,
+    CHUNKED_PARSE_MIN_PAGES,
+    PARSE_CHUNK_PAGES,
+    PARSE_CHUNK_OVERLAP_PAGES,
+    ENABLE_IMAGE_NORMALIZATION,
+    IMAGE_MAX_LONG_EDGE,
+    IMAGE_GRAYSCALE_MAX_SATURATION,
+    IMAGE_JPEG_QUALITY,
+    DOC_CLASSIFIER_MIN_CONFIDENCE,
+    DOC_CLASSIFIER_MAX_PAGES
+)
+import json
 
-# --- Synchronous single document processor ---
-def route_and_parse_document(file, prompt_path="Task_Prompts/Parser.txt"):
-    prompt = build_general_doc_prompt_from_file(prompt_path)
+PARSER_MODEL_ID = ModelRegistry.sonnet_3
+PARSER_PROMPT_PATH = "Task_Prompts/Parser.txt"
+PARSER_TOOLS = ["get_prompt_for_doc_type", "summarize_document"]
 
-    response = query_bedrock_with_multiple_files_with_tools(
-        prompt=prompt,
-        files=[file],
-        model_id=ModelRegistry.sonnet_3,
-        tool_config=get_tool_config([
-            "get_prompt_for_doc_type",
-            "summarize_document"
-        ])
-    )
 
+def build_parse_result(response):
     parsed = try_parse_json_like(response)
     if parsed:
         return {
@@ -144,127 +157,293 @@ def route_and_parse_document(file, prompt_path="Task_Prompts/Parser.txt"):
         }
 
 
-async def async_parse_document(file):
-    # compressed_file = compress_file_if_needed(file, file.name)
-    # compressed_file.name = file.name
-    # size_mb = get_file_size_mb(compressed_file)
+# --- Synchronous single document processor ---
+def route_and_parse_document(file, prompt_path=PARSER_PROMPT_PATH):
+    prompt = build_general_doc_prompt_from_file(prompt_path)
+
+    response = query_bedrock_with_multiple_files_with_tools(
+        prompt=prompt,
+        files=[file],
+        model_id=PARSER_MODEL_ID,
+        tool_config=get_tool_config(PARSER_TOOLS)
+    )
+
+    return build_parse_result(response)
+
+
+def build_direct_parse_prompt(doc_type: str) -> str:
+    """Parser prompt with the type's Parser_Prompts entry inlined, for a single call without tools."""
+    available_types = ", ".join(
+        f'"{t}"' for t in sorted(PARSER_PROMPT_REGISTRY) if t != "FALLBACK_SUMMARY")
+    return (
+        TASK_PROMPT_REGISTRY["PARSER_DIRECT"]
+        .replace("{parser_instructions}", PARSER_PROMPT_REGISTRY[doc_type].strip())
+        .replace("{available_types}", available_types)
+        .replace("{doc_type}", doc_type)
+    )
+
 
-    # if size_mb > MAX_CHUNK_SIZE_MB:
-    #     return {
-    #         "result": None,
-    #         "error": f"❌ Even after compression, file '{file.name}' is still over 4.5MB.",
-    #     }
+# --- Non-blocking single document processor ---
+async def aroute_and_parse_document(file, prompt_path=PARSER_PROMPT_PATH, guess=None):
+    # A confident local doc-type guess skips the get_prompt_for_doc_type round
+    # trip, which would otherwise send the document bytes to Bedrock twice
+    if guess is not None and guess.is_confident and guess.doc_type in PARSER_PROMPT_REGISTRY:
+        response = await aquery_bedrock_with_multiple_files(
+            prompt=build_direct_parse_prompt(guess.doc_type),
+            files=[file],
+            model_id=PARSER_MODEL_ID
+        )
+        result = build_parse_result(response)
+        # The direct prompt has no summary path, so the model answering with a
+        # different type (or Unknown) hands the document to the tool flow
+        parsed_type = (result["result"] or {}).get("doc_type")
+        if parsed_type == guess.doc_type:
+            result["doc_type_source"] = "local"
+            result["doc_type_confidence"] = round(guess.confidence, 2)
+            return result
+        if ENABLE_PROGRESS_LOGGING:
+            print(f"⚠️ Direct parse of '{file.name}' as {guess.doc_type} returned "
+                  f"{parsed_type or 'no JSON'}, using the tool flow")
+        file.seek(0)
+
+    prompt = build_general_doc_prompt_from_file(prompt_path)
+
+    response = await aquery_bedrock_with_multiple_files_with_tools(
+        prompt=prompt,
+        files=[file],
+        model_id=PARSER_MODEL_ID,
+        tool_config=get_tool_config(PARSER_TOOLS)
+    )
+
+    result = build_parse_result(response)
+    result["doc_type_source"] = "llm"
+    return result
+
+
+def sends_text_layer(text_layer) -> bool:
+    return ENABLE_TEXT_LAYER and text_layer is not None and text_layer.quality >= TEXT_LAYER_MIN_QUALITY
+
+
+def report_text_layer(file, file_bytes, text_layer):
+    quality = text_layer.quality if text_layer is not None else 0.0
+    if not sends_text_layer(text_layer):
+        record_text_layer(file.name, "file", quality, len(file_bytes), len(file_bytes), 0)
+        return
+    text = text_layer.render()
+    est_tokens_saved = max(0, len(text_layer.pages) * PDF_PAGE_TOKEN_ESTIMATE - estimate_tokens(text))
+    record_text_layer(file.name, "text", quality, len(file_bytes), len(text.encode("utf-8")), est_tokens_saved)
+
+
+def select_request_file(file, file_bytes, text_layer):
+    """
+    What the parser attaches: the rendered text layer (as a .txt document) for
+    born-digital PDFs, the original upload for scans, images and office files.
+    """
+    if not sends_text_layer(text_layer):
+        return file
+    return NamedBytesIO(text_layer.render().encode("utf-8"), os.path.splitext(file.name)[0] + ".txt")
+
+
+async def fit_request_file(file, data: bytes = None):
+    """
+    Compress an attachment that is over Bedrock's size limit. Returns (file, None),
+    or (None, error result) when even the smallest setting does not fit.
+    """
+    if data is None:
+        data = file.read()
+        file.seek(0)
+    compressed, name, info = await acompress_to_fit(data, file.name)
+    if not info.get("compressed"):
+        compressed, name = data, file.name
+
+    limit_mb = size_limit_mb(name)
+    if len(compressed) > limit_mb * 1024 * 1024:
+        return None, {
+            "result": None,
+            "error": f"❌ Even after compression, file '{file.name}' is still over {limit_mb}MB.",
+        }
+    if not info.get("compressed"):
+        return file, None
+    if ENABLE_PROGRESS_LOGGING:
+        print(f"🗜️ Compressed '{file.name}' {len(data) / 1e6:.1f}MB -> {len(compressed) / 1e6:.1f}MB "
+              f"({info.get('method')}{', cached' if info.get('cached') else ''})")
+    return NamedBytesIO(compressed, name), None
+
+
+async def aparse_fitted_document(file, data: bytes = None, guess=None):
+    file, error = await fit_request_file(file, data)
+    if error is not None:
+        return error
+    return await aroute_and_parse_document(file, guess=guess)
+
+
+# --- Chunked parsing of long PDFs ---
+def build_chunk_files(file, file_bytes, text_layer, windows) -> list:
+    """One attachment per page window: a slice of the text layer, or a split-out PDF for scans."""
+    base = os.path.splitext(file.name)[0]
+    if sends_text_layer(text_layer):
+        return [NamedBytesIO(text_layer.render(start, end).encode("utf-8"), f"{base} p{start + 1}-{end}.txt")
+                for start, end in windows]
+    parts = split_pdf(file_bytes, windows)
+    return [NamedBytesIO(part, f"{base} p{start + 1}-{end}.pdf") for part, (start, end) in zip(parts, windows)]
+
+
+async def aparse_chunked_document(file, file_bytes, text_layer, guess, total_pages):
+    """
+    Parse a long PDF as overlapping page windows, all in flight at once (the
+    governor bounds the concurrency), and merge their fields into one entry.
+    Without a confident local doc type the first window goes through the tool
+    flow to settle it. Returns None when the document is not of a known type,
+    so the caller parses it whole for a summary.
+    """
+    windows = page_windows(total_pages, PARSE_CHUNK_PAGES, PARSE_CHUNK_OVERLAP_PAGES)
+    chunk_files = await asyncio.to_thread(build_chunk_files, file, file_bytes, text_layer, windows)
+    if ENABLE_PROGRESS_LOGGING:
+        print(f"📑 Parsing '{file.name}' ({total_pages} pages) as {len(windows)} page windows")
+
+    first = []
+    if guess is not None and guess.is_confident and guess.doc_type in PARSER_PROMPT_REGISTRY:
+        doc_type, source = guess.doc_type, "local"
+    else:
+        first = [await aparse_fitted_document(chunk_files[0])]
+        # The prompt tool uppercases its input, so the model may answer "Invoice"
+        doc_type = ((first[0].get("result") or {}).get("doc_type") or "").upper()
+        source = "llm"
+        if doc_type not in PARSER_PROMPT_REGISTRY or doc_type == "FALLBACK_SUMMARY":
+            return None
+
+    # Every window is parsed as the document's type in one call each
+    forced = DocTypeGuess(doc_type, 1.0, text_evidence=True)
+    rest = await asyncio.gather(*(
+        aparse_fitted_document(chunk, guess=forced) for chunk in chunk_files[len(first):]
+    ))
+    result = merge_chunk_results(doc_type, first + list(rest), windows)
+    result["doc_type_source"] = source
+    return result
+
+
+async def normalize_attachment(file, file_bytes):
+    """Image attachments downsampled, grey pages made grayscale and metadata stripped, in the pool."""
+    loop = asyncio.get_running_loop()
+    try:
+        data, _, info = await loop.run_in_executor(
+            get_compression_pool(), normalize_image, file_bytes, file.name)
+    except Exception as e:
+        if ENABLE_PROGRESS_LOGGING:
+            print(f"⚠️ Could not normalize image '{file.name}': {str(e)}")
+        return file, file_bytes, None
+    if ENABLE_PROGRESS_LOGGING and info["normalized"]:
+        print(f"🖼️ Normalized '{file.name}' {info['original_size']} -> {info['size']}"
+              f"{' grayscale' if info['grayscale'] else ''}, {info['original_bytes']} -> {info['bytes']} bytes")
+    return NamedBytesIO(data, file.name), data, info
+
+
+async def aparse_new_document(file, file_bytes):
+    text_layer = await asyncio.to_thread(extract_text_layer, file_bytes) if is_pdf(file_bytes) else None
+    guess = await asyncio.to_thread(classify_document, file.name, file_bytes, None, text_layer)
+    report_text_layer(file, file_bytes, text_layer)
+
+    total_pages = len(text_layer.pages) if text_layer is not None else 0
+    if ENABLE_CHUNKED_PARSING and total_pages > CHUNKED_PARSE_MIN_PAGES:
+        result = await aparse_chunked_document(file, file_bytes, text_layer, guess, total_pages)
+        if result is not None:
+            return result
+
+    request_file = select_request_file(file, file_bytes, text_layer)
+    # Over-limit uploads are compressed in the pool; the text layer never needs it
+    return await aparse_fitted_document(
+        request_file, file_bytes if request_file is file else None, guess=guess)
+
+
+def parse_settings_fingerprint() -> str:
+    """
+    Everything besides the bytes that decides what the parser sends and which
+    path it takes (direct or tool flow, text layer or file, chunked or whole),
+    so changing any of it misses the cache instead of serving stale parses.
+    """
+    return json.dumps({
+        "direct_prompt": TASK_PROMPT_REGISTRY["PARSER_DIRECT"],
+        "classifier": {
+            "min_confidence": DOC_CLASSIFIER_MIN_CONFIDENCE,
+            "max_pages": DOC_CLASSIFIER_MAX_PAGES,
+            "filename_patterns": doc_classifier.FILENAME_PATTERNS,
+            "keywords": doc_classifier.KEYWORDS,
+            "filename_only_max_confidence": doc_classifier.FILENAME_ONLY_MAX_CONFIDENCE,
+        },
+        "text_layer": [ENABLE_TEXT_LAYER, TEXT_LAYER_MIN_QUALITY],
+        "chunking": [ENABLE_CHUNKED_PARSING, CHUNKED_PARSE_MIN_PAGES, PARSE_CHUNK_PAGES, PARSE_CHUNK_OVERLAP_PAGES],
+        "images": [ENABLE_IMAGE_NORMALIZATION, IMAGE_MAX_LONG_EDGE, IMAGE_GRAYSCALE_MAX_SATURATION, IMAGE_JPEG_QUALITY],
+    }, sort_keys=True)
+
+
+async def async_parse_document(file, deduper=None):
+    file_bytes = file.read()
+    file.seek(0)
+    # The parser's tools hand back Parser_Prompts entries, so they are part of the key
+    cache_key = parse_cache_key(
+        file_bytes,
+        build_general_doc_prompt_from_file(PARSER_PROMPT_PATH),
+        PARSER_MODEL_ID,
+        json.dumps(PARSER_PROMPT_REGISTRY, sort_keys=True),
+        parse_settings_fingerprint(),
+    )
+    cached = await asyncio.to_thread(cache_get, cache_key)
+    if cached is not None:
+        return cached
+
+    claim = None
+    if ENABLE_IMAGE_NORMALIZATION and is_image(file.name):
+        file, file_bytes, info = await normalize_attachment(file, file_bytes)
+        if deduper is not None and info is not None:
+            original, claim = deduper.claim(info["pixel_hash"], file.name)
+            if original is not None:
+                if ENABLE_PROGRESS_LOGGING:
+                    print(f"♻️ '{file.name}' is identical to '{original}'; reusing its parse")
+                return {**(await asyncio.shield(claim)), "duplicate_of": original}
+
+    try:
+        result = await aparse_new_document(file, file_bytes)
+    except Exception as e:
+        if claim is not None:
+            claim.set_result({"result": None, "error": f"❌ Document processing failed: {str(e)}"})
+        raise
+    if claim is not None:
+        claim.set_result(result)
+    # Only successful parses are cached; failures are retried on the next job
+    if result.get("result") is not None:
+        await asyncio.to_thread(cache_put, cache_key, result)
+    return result
+
+
+async def safe_parse_document(file, deduper=None):
+    # Concurrency and throttling retries are handled per model by the Bedrock
+    # governor; a document that still fails is reported instead of failing the job.
+    try:
+        # S3 attachments may still be downloading; each document starts as soon as it lands
+        file = await resolve_attachment(file)
+        # Spilled attachments are read back only as the job's memory budget allows
+        async with attachment_in_memory(file):
+            return await async_parse_document(file, deduper)
+    except Exception as e:
+        if ENABLE_PROGRESS_LOGGING:
+            print(f"❌ Failed to parse '{file.name}': {str(e)}")
+        return {
+            "result": None,
+            "error": f"❌ Document processing failed: {str(e)}"
+        }
 
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, route_and_parse_document, file)
 
 # --- Parse all uploaded documents in parallel ---
 async def parse_documents_parallel(files):
-    tasks = [async_parse_document(file) for file in files]
+    if ENABLE_PROGRESS_LOGGING:
+        print(f"Processing {len(files)} documents")
+    # Image attachments with identical pixels within the job are parsed once
+    deduper = ImageDeduper()
+    tasks = [safe_parse_document(file, deduper) for file in files]
     results = await asyncio.gather(*tasks)
     
     return dict(zip([file.name for file in files], results))
 
-# async def process_batch_with_retry(batch, batch_num, total_batches):
-#     """
-#     Process a batch of documents with retry logic for throttling exceptions.
-#     """
-#     for attempt in range(MAX_RETRIES + 1):
-#         try:
-#             if ENABLE_PROGRESS_LOGGING:
-#                 print(f"Processing batch {batch_num}/{total_batches} ({len(batch)} documents) - Attempt {attempt + 1}")
-            
-#             tasks = [async_parse_document(file) for file in batch]
-#             batch_results = await asyncio.gather(*tasks)
-            
-#             if ENABLE_PROGRESS_LOGGING:
-#                 print(f"✅ Batch {batch_num}/{total_batches} completed successfully")
-            
-#             return batch_results
-            
-#         except Exception as e:
-#             error_msg = str(e).lower()
-#             if "throttling" in error_msg or "rate limit" in error_msg or "too many requests" in error_msg:
-#                 if attempt < MAX_RETRIES:
-#                     wait_time = RETRY_DELAY_SECONDS * (2 ** attempt)  # Exponential backoff
-#                     if ENABLE_PROGRESS_LOGGING:
-#                         print(f"⚠️  Throttling detected in batch {batch_num}. Retrying in {wait_time}s... (Attempt {attempt + 1}/{MAX_RETRIES + 1})")
-#                     await asyncio.sleep(wait_time)
-#                     continue
-#                 else:
-#                     if ENABLE_PROGRESS_LOGGING:
-#                         print(f"❌ Batch {batch_num} failed after {MAX_RETRIES + 1} attempts due to throttling")
-#                     raise
-#             else:
-#                 # Non-throttling error, don't retry
-#                 if ENABLE_PROGRESS_LOGGING:
-#                     print(f"❌ Batch {batch_num} failed with non-throttling error: {str(e)}")
-#                 raise
-    
-#     # This should never be reached, but just in case
-#     raise Exception(f"Batch {batch_num} failed after all retry attempts")
-
-
-# # --- Parse documents in batches to avoid throttling ---
-# async def parse_documents_parallel(files):
-#     if not files:
-#         return {}
-    
-#     total_files = len(files)
-#     if ENABLE_PROGRESS_LOGGING:
-#         print(f"Processing {total_files} documents in batches of {MAX_DOCUMENTS_PER_BATCH}")
-    
-#     # Check if we exceed the maximum limit
-#     if total_files > MAX_DOCUMENTS_PER_BATCH:
-#         if ENABLE_PROGRESS_LOGGING:
-#             print(f"⚠️  Warning: {total_files} documents exceed recommended limit of {MAX_DOCUMENTS_PER_BATCH}")
-#             print(f"   Processing in batches with {BATCH_DELAY_SECONDS}s delays to avoid throttling")
-    
-#     all_results = {}
-    
-#     # Process files in batches
-#     for i in range(0, total_files, MAX_DOCUMENTS_PER_BATCH):
-#         batch = files[i:i + MAX_DOCUMENTS_PER_BATCH]
-#         batch_num = (i // MAX_DOCUMENTS_PER_BATCH) + 1
-#         total_batches = (total_files + MAX_DOCUMENTS_PER_BATCH - 1) // MAX_DOCUMENTS_PER_BATCH
-        
-#         # Process current batch with retry logic
-#         try:
-#             batch_results = await process_batch_with_retry(batch, batch_num, total_batches)
-            
-#             # Store results
-#             for file, result in zip(batch, batch_results):
-#                 all_results[file.name] = result
-                
-#         except Exception as e:
-#             if ENABLE_PROGRESS_LOGGING:
-#                 print(f"❌ Failed to process batch {batch_num}: {str(e)}")
-#             # Continue with next batch instead of failing completely
-#             for file in batch:
-#                 all_results[file.name] = {
-#                     "result": None,
-#                     "error": f"❌ Batch processing failed: {str(e)}"
-#                 }
-        
-#         # Add delay between batches to avoid throttling (except for the last batch)
-#         if i + MAX_DOCUMENTS_PER_BATCH < total_files:
-#             if ENABLE_PROGRESS_LOGGING:
-#                 print(f"Waiting {BATCH_DELAY_SECONDS}s before next batch...")
-#             await asyncio.sleep(BATCH_DELAY_SECONDS)
-    # if ENABLE_PROGRESS_LOGGING:
-    #     print(f"✅ Completed processing {total_files} documents")
-    # return all_results
-
-
 async def parse_documents_node(state: PipelineState) -> PipelineState:
     parsed = await parse_documents_parallel(state["uploaded_files"])
-    # uploaded_files = state.get("uploaded_files", [])
-    
-    # # Check document limit before processing
-    # if len(uploaded_files) > MAX_DOCUMENTS_PER_BATCH:
-    #     if ENABLE_PROGRESS_LOGGING:
-    #         print(f"⚠️  Processing {len(uploaded_files)} documents (exceeds recommended limit of {MAX_DOCUMENTS_PER_BATCH})")
-    #         print(f"   This may take longer due to throttling protection")
-    
-    # parsed = await parse_documents_parallel(uploaded_files)
     return {"parsed_data": parsed}
\ No newline at end of file
@@ -0,0 +1,270 @@
+import re
+import copy
+import asyncio
+from utils import create_doc_messages, aconverse, log_token_usage, try_parse_json_like
+from utils import get_unique_purchasing_categories, build_prompt_payload
+from utils.union_job_utils import (
+    load_union_job_data,
+    build_cost_check,
+    CSV_PATH as UNION_CSV_PATH,
+    TITLE_COLUMN,
+    COST_COLUMN
+)
+from utils.union_job_matcher import get_union_job_matcher
+from prompt_loader import TASK_PROMPT_REGISTRY, split_prompt_template
+from model_registry import ModelRegistry
+from state import PipelineState
+from tools import load_tool_spec
+from Agents.checklist import run_checklist
+from Agents.validation import validate_data
+from Agents.union_job_classifier import (
+    union_job_check,
+    select_prompt_titles,
+    resolve_matched_row,
+    match_locally
+)
+from Agents.pc_llm_mapping import pc_llm_mapping, build_pc_mapping, CSV_PATH as PC_CSV_PATH
+from Agents.phi_agreement_checker import phi_agreement_checker
+from Agents.data_sec_classification import (
+    run_data_sec_classification,
+    run_goods_services_classification,
+    build_goods_services_result,
+    GOODS_SERVICES_LABELS
+)
+from config.processing_limits import (
+    FUSED_ANALYSIS_MAX_TOKENS,
+    UNION_MATCH_TOP_K,
+    ENABLE_PROGRESS_LOGGING
+)
+
+FUSED_MODEL_ID = ModelRegistry.sonnet_3_7
+TOOL_NAME = "submit_analysis"
+
+FUSED_HEADER = """You are completing several independent review tasks on the same set of parsed purchase documents.
+Each task is given below inside <task name="..."> tags, with its original instructions. The documents
+are provided once, after the last task; wherever a task refers to "the document(s)" or "the data", use them.
+
+Answer every task by calling the submit_analysis tool exactly once. Put each task's answer in the field
+with the same name as the task, in the format that task asks for: JSON objects and lists as JSON values,
+free-text answers as a string (keep any {{...}} markers the task asks for). Do not answer in plain text.
+"""
+
+UNION_TOOL_NOTE = """
+The get_UC_cost tool is not available in this request. Leave "UC_Cost" as null and "Pass" as null in
+"cost_check" and report "PO_Cost" as stated in the document; the UC cost is looked up afterwards.
+"""
+
+
+# --- Section instructions ---
+def task_instructions(template: str, placeholder: str) -> str:
+    """A task prompt without its document slot (and the "Documents:" label right before it)."""
+    prefix, suffix = split_prompt_template(template, placeholder)
+    lines = prefix.rstrip().splitlines()
+    if lines and lines[-1].strip().endswith(":") and len(lines[-1].strip()) < 40:
+        lines = lines[:-1]
+    return "\n".join(lines).strip() + ("\n" + suffix.strip() if suffix.strip() else "")
+
+
+def wrap_task(name: str, instructions: str) -> str:
+    return f'<task name="{name}">\n{instructions}\n</task>\n'
+
+
+def build_static_prompt() -> str:
+    """Header plus the tasks that are identical for every job: sent as the cached prefix."""
+    formatted_pcs = ", ".join(f"'{cat}'" for cat in get_unique_purchasing_categories(PC_CSV_PATH))
+    tasks = [
+        ("checklist", task_instructions(TASK_PROMPT_REGISTRY["CHECKLIST"], "{doc_text}")),
+        ("phi_agreement", task_instructions(TASK_PROMPT_REGISTRY["PHI_AGREEMENT_CHECK"], "{parsed_data}")),
+        ("pc_classification", task_instructions(
+            TASK_PROMPT_REGISTRY["PC_CLASSIFICATION"].replace("{pc_category_list}", formatted_pcs),
+            "{parsed_data}")),
+        ("goods_services", task_instructions(TASK_PROMPT_REGISTRY["GOODS_SERVICES"], "{parsed_data}")),
+        ("data_security", task_instructions(TASK_PROMPT_REGISTRY["SECURITY_CLASSIFICATION"], "{parsed_data}")),
+    ]
+    return FUSED_HEADER + "\n" + "".join(wrap_task(name, text) for name, text in tasks)
+
+
+def build_tool_config(sections: list) -> dict:
+    """submit_analysis restricted to the sections in this request, forced as the only answer."""
+    spec = copy.deepcopy(load_tool_spec(TOOL_NAME))
+    schema = spec["inputSchema"]["json"]
+    schema["properties"] = {k: v for k, v in schema["properties"].items() if k in sections}
+    schema["required"] = [k for k in schema["required"] if k in sections]
+    return {
+        "tools": [{"toolSpec": spec}],
+        "toolChoice": {"tool": {"name": TOOL_NAME}}
+    }
+
+
+# --- Section results ---
+def _as_json(value):
+    # Models sometimes return a nested object as a JSON string
+    if isinstance(value, str):
+        return try_parse_json_like(value)
+    return value
+
+
+def checklist_section(value, context):
+    value = _as_json(value)
+    if isinstance(value, (list, dict)) and value:
+        return {"checklist_result": {"result": value}}
+    return None
+
+
+def validation_section(value, context):
+    value = _as_json(value)
+    if isinstance(value, dict):
+        return {"validation_result": {"result": value}}
+    return None
+
+
+def union_job_section(value, context):
+    value = _as_json(value)
+    if not isinstance(value, dict) or not isinstance(value.get("union_job_detected"), bool):
+        return None
+    matched_row = resolve_matched_row(value, context["union_jobs"], context["matcher"])
+    if isinstance(matched_row, dict) and matched_row.get(COST_COLUMN):
+        # Stand-in for the get_UC_cost tool call the fan-out agent makes
+        value["cost_check"] = build_cost_check(
+            matched_row[COST_COLUMN], (value.get("cost_check") or {}).get("PO_Cost"))
+    return {
+        "union_job_check": {
+            **value,
+            "match_method": "fused",
+            "candidate_titles": len(context["prompt_titles"]),
+            "matched_row": matched_row
+        }
+    }
+
+
+def phi_agreement_section(value, context):
+    if isinstance(value, str) and re.search(r"\{\{(PHI|NOPHI)\}\}", value):
+        return {"phi_agreement": {"full_text": value}}
+    return None
+
+
+def pc_classification_section(value, context):
+    if isinstance(value, str) and re.search(r"\{\{.+?\}\}", value):
+        return {"pc_mapping": build_pc_mapping(value)}
+    return None
+
+
+def goods_services_section(value, context):
+    if isinstance(value, str) and value.strip().strip('"').lower() in GOODS_SERVICES_LABELS:
+        return {"goods_services": build_goods_services_result(value)}
+    return None
+
+
+def data_security_section(value, context):
+    value = _as_json(value)
+    if isinstance(value, dict) and value.get("protection_level"):
+        return {"data_security": value}
+    return None
+
+
+# Tool field -> (result builder, existing agent used as the fallback)
+SECTIONS = {
+    "checklist": (checklist_section, run_checklist),
+    "phi_agreement": (phi_agreement_section, phi_agreement_checker),
+    "pc_classification": (pc_classification_section, pc_llm_mapping),
+    "goods_services": (goods_services_section, run_goods_services_classification),
+    "data_security": (data_security_section, run_data_sec_classification),
+    "validation": (validation_section, validate_data),
+    "union_job": (union_job_section, union_job_check),
+}
+
+
+def extract_tool_input(response) -> dict:
+    for block in response["output"]["message"]["content"]:
+        tool_use = block.get("toolUse")
+        if tool_use and tool_use.get("name") == TOOL_NAME:
+            return tool_use.get("input") or {}
+    return {}
+
+
+# --- Node ---
+async def run_fused_analysis(state: PipelineState) -> PipelineState:
+    """
+    Every post-parse analysis in one Converse call that answers through a forced
+    tool whose schema has a field per section. Sections that come back missing or
+    malformed are re-run with their own agent, concurrently.
+    """
+    parsed = state.get("parsed_data", {})
+    po_check = "Yes" if any(
+        ((doc.get("result") or {}).get("doc_type") or "").upper() == "PO" for doc in parsed.values()
+    ) else "No"
+    if not parsed:
+        return {"po_check": po_check, "fused_analysis": {"error": "❌ No parsed data available"}}
+
+    results = {"po_check": po_check}
+    sections = ["checklist", "phi_agreement", "pc_classification", "goods_services", "data_security"]
+    dynamic_tasks = []
+    context = {}
+
+    if po_check == "Yes":
+        sections.append("validation")
+        dynamic_tasks.append(wrap_task("validation", task_instructions(
+            TASK_PROMPT_REGISTRY["DATA_VALIDATION"], "{doc_text}")))
+
+    # The union title list depends on the job, so this task goes after the cache point
+    union_jobs, job_titles = load_union_job_data(filepath=UNION_CSV_PATH, title_col=TITLE_COLUMN)
+    matcher = get_union_job_matcher()
+    candidates = matcher.rank_parsed_data(parsed, top_k=UNION_MATCH_TOP_K)
+    local_match = match_locally(parsed, candidates, union_jobs)
+    if local_match is not None:
+        results["union_job_check"] = local_match
+    else:
+        prompt_titles = select_prompt_titles(candidates, job_titles)
+        context.update(union_jobs=union_jobs, matcher=matcher, prompt_titles=prompt_titles)
+        sections.append("union_job")
+        union_template = TASK_PROMPT_REGISTRY["UNION_JOB_CLASSIFICATION"].replace(
+            "{union_job_list}", ", ".join(sorted(set(prompt_titles))))
+        dynamic_tasks.append(wrap_task(
+            "union_job", task_instructions(union_template, "{doc_text}") + UNION_TOOL_NOTE))
+
+    prompt = "".join(dynamic_tasks) + "\nDocuments:\n" + build_prompt_payload(parsed, "fused")
+
+    fused_output, usage, error = {}, None, None
+    try:
+        response = await aconverse(
+            modelId=FUSED_MODEL_ID,
+            messages=create_doc_messages(
+                prompt, [], cache_prefix=build_static_prompt(), model_id=FUSED_MODEL_ID),
+            toolConfig=build_tool_config(sections),
+            inferenceConfig={
+                "temperature": 0,
+                "maxTokens": FUSED_ANALYSIS_MAX_TOKENS
+            }
+        )
+        usage = log_token_usage("Fused Analysis", FUSED_MODEL_ID, response)
+        fused_output = extract_tool_input(response)
+    except Exception as e:
+        error = f"❌ Fused analysis call failed: {str(e)}"
+
+    fallbacks = []
+    for name in sections:
+        build, _ = SECTIONS[name]
+        try:
+            section_result = build(fused_output.get(name), context)
+        except Exception:
+            section_result = None
+        if section_result is None:
+            fallbacks.append(name)
+        else:
+            results.update(section_result)
+
+    if fallbacks:
+        if ENABLE_PROGRESS_LOGGING:
+            print(f"⚠️ Fused analysis falling back to single agents for: {', '.join(fallbacks)}")
+        for fallback_result in await asyncio.gather(
+                *(SECTIONS[name][1](state) for name in fallbacks)):
+            results.update(fallback_result)
+
+    results["fused_analysis"] = {
+        "model_id": FUSED_MODEL_ID,
+        "sections": sections,
+        "fallbacks": fallbacks,
+        "usage": usage,
+        "error": error
+    }
+    return results
@@ -1,18 +1,24 @@
 import re
-from prompt_loader import TASK_PROMPT_REGISTRY
-from utils import get_unique_purchasing_categories
-from model_registry import ModelRegistry
-import pandas as pd
+from prompt_loader import TASK_PROMPT_REGISTRY, split_prompt_template
+from utils import get_unique_purchasing_categories, get_buyer_rows_for_categories
+from utils.model_router import routed_call
 import os
-from utils import create_doc_messages
-import boto3
+from utils import create_doc_messages, aconverse, log_token_usage, build_prompt_payload, get_response_text
 from state import PipelineState
 
 CSV_PATH = os.path.join(
     "Data", "PC_Buyer_Assignments - Copy(Buyer Review).csv")
 COLUMN_TO_SEARCH = "Purchasing Category"
 
-bedrock = boto3.client(service_name='bedrock-runtime')
+
+def build_pc_mapping(full_text: str) -> dict:
+    """Categories the model wrapped in {{...}} and the buyer rows for each (file order)."""
+    llm_categories = re.findall(r"\{\{(.*?)\}\}", full_text)
+    return {
+        "full_text": full_text,
+        "categories": llm_categories,
+        "matched_df": get_buyer_rows_for_categories(CSV_PATH, llm_categories),
+    }
 
 
 async def pc_llm_mapping(state: PipelineState) -> PipelineState:
@@ -27,16 +33,34 @@ async def pc_llm_mapping(state: PipelineState) -> PipelineState:
     pc_list = get_unique_purchasing_categories(CSV_PATH)
     formatted_list = ", ".join(f"'{cat}'" for cat in pc_list)
 
-    final_prompt = base_prompt.replace("{parsed_data}", str(
-        parsed_data)).replace("{pc_category_list}", formatted_list)
-    messages = create_doc_messages(final_prompt, [])
-    response = bedrock.converse(
-        modelId=ModelRegistry.haiku_3_5,
-        messages=messages,
-        inferenceConfig={
-            "temperature": 0
-        }
-    )
+    # Instructions + category list are identical across jobs: cached prefix
+    static_prompt, prompt_suffix = split_prompt_template(
+        base_prompt.replace("{pc_category_list}", formatted_list), "{parsed_data}")
+    payload = build_prompt_payload(parsed_data, "pc_classification")
+
+    async def ask(model_id):
+        messages = create_doc_messages(
+            payload + prompt_suffix, [],
+            cache_prefix=static_prompt, model_id=model_id)
+        response = await aconverse(
+            modelId=model_id,
+            messages=messages,
+            inferenceConfig={
+                "temperature": 0
+            }
+        )
+        log_token_usage("LLM PC Classifier", model_id, response)
+        return response
+
+    def validate(response):
+        categories = re.findall(r"\{\{(.*?)\}\}", get_response_text(response))
+        if not categories:
+            return "missing_marker"
+        if not get_buyer_rows_for_categories(CSV_PATH, categories):
+            return "unknown_category"
+        return None
+
+    response, _ = await routed_call("LLM PC Classifier", ask, validate)
 
     output_message = response["output"]["message"]
     full_text = ""
@@ -44,17 +68,9 @@ async def pc_llm_mapping(state: PipelineState) -> PipelineState:
         if "text" in block:
             full_text += block["text"]
 
-    llm_categories = re.findall(r"\{\{(.*?)\}\}", full_text)
-
-    df = pd.read_csv(CSV_PATH)
-    # Filter rows where column matches any extracted field (exact match)
-    matched_df = df[df[COLUMN_TO_SEARCH].astype(str).isin(llm_categories)]
-
     return {
         "pc_mapping": {
-            "full_text": full_text,
-            "categories": llm_categories,
-            "matched_df": matched_df.to_dict(orient="records"),
+            **build_pc_mapping(full_text),
             "stop_reason": response.get('stopReason', None),
             "usage": response.get('usage', None),
         }
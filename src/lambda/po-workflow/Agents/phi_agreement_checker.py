@@ -1,11 +1,9 @@
-from prompt_loader import TASK_PROMPT_REGISTRY
-from utils import create_doc_messages
-from model_registry import ModelRegistry
-import boto3
+from prompt_loader import TASK_PROMPT_REGISTRY, split_prompt_template
+import re
+from utils import create_doc_messages, aconverse, log_token_usage, build_prompt_payload, get_response_text
+from utils.model_router import routed_call
 from state import PipelineState
 
-bedrock = boto3.client(service_name='bedrock-runtime')
-
 
 async def phi_agreement_checker(state: PipelineState) -> PipelineState:
     parsed_data = state.get("parsed_data", {})
@@ -16,15 +14,27 @@ async def phi_agreement_checker(state: PipelineState) -> PipelineState:
             }
         }
     base_prompt = TASK_PROMPT_REGISTRY.get("PHI_AGREEMENT_CHECK", "")
-    final_prompt = base_prompt.replace("{parsed_data}", str(parsed_data))
-    messages = create_doc_messages(final_prompt, [])
-    response = bedrock.converse(
-        modelId=ModelRegistry.haiku_3_5,
-        messages=messages,
-        inferenceConfig={
-            "temperature": 0
-        }
-    )
+    static_prompt, prompt_suffix = split_prompt_template(base_prompt, "{parsed_data}")
+    payload = build_prompt_payload(parsed_data, "phi_agreement")
+
+    async def ask(model_id):
+        messages = create_doc_messages(
+            payload + prompt_suffix, [],
+            cache_prefix=static_prompt, model_id=model_id)
+        response = await aconverse(
+            modelId=model_id,
+            messages=messages,
+            inferenceConfig={
+                "temperature": 0
+            }
+        )
+        log_token_usage("PHI Agreement Check", model_id, response)
+        return response
+
+    # An answer without the {{PHI}} / {{NOPHI}} marker is unusable downstream
+    response, _ = await routed_call(
+        "PHI Agreement Check", ask,
+        lambda r: None if re.search(r"\{\{(PHI|NOPHI)\}\}", get_response_text(r)) else "missing_marker")
     output_message = response["output"]["message"]
     full_text = ""
     for block in output_message["content"]:
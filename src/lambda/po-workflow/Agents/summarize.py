@@ -1,17 +1,17 @@
 from state import PipelineState
 import json
-import markdown2
 from io import BytesIO
-from utils import query_bedrock_with_multiple_files
+from utils import aquery_bedrock_with_multiple_files
 from model_registry import ModelRegistry
 from prompt_loader import TASK_PROMPT_REGISTRY
-from weasyprint import HTML
 import base64
+import asyncio
 
-def summarize_and_generate_pdf(state: PipelineState) -> PipelineState:
+async def summarize_and_generate_pdf(state: PipelineState) -> PipelineState:
     summary_data = extract_summary(state)
-    markdown = summarize_with_claude(summary_data)
-    pdf_bytes = markdown_to_pdf_bytes(markdown)
+    markdown = await summarize_with_claude(summary_data)
+    # WeasyPrint rendering is CPU-bound, keep it off the event loop
+    pdf_bytes = await asyncio.to_thread(markdown_to_pdf_bytes, markdown)
     return {"pdf_summary": pdf_bytes}
 
 def extract_summary(state: dict) -> dict:
@@ -19,24 +19,30 @@ def extract_summary(state: dict) -> dict:
         "Checklist": state.get("checklist_result"),
         "PO Exists": state.get("po_check"),
         "PO Validation": state.get("validation_result"),
-        "Union Job Check": state.get("union_result"),
-        "PHI Agreement": state.get("phi_check"),
-        "PC Classification": state.get("pc_classification"),
-        "Data Security Classification": state.get("data_sec_result"),
+        "Union Job Check": state.get("union_job_check"),
+        "PHI Agreement": state.get("phi_agreement"),
+        "PC Classification": state.get("pc_mapping"),
+        "Goods or Services": state.get("goods_services"),
+        "Data Security Classification": state.get("data_security"),
     }
 
-def summarize_with_claude(summary_json: dict) -> str:
+async def summarize_with_claude(summary_json: dict) -> str:
     base_prompt = TASK_PROMPT_REGISTRY.get("SUMMARY_PROMPT", "")
-    full_prompt = base_prompt + "\n\n" + json.dumps(summary_json, indent=2)
 
-    response = query_bedrock_with_multiple_files(
-        prompt=full_prompt,
+    response = await aquery_bedrock_with_multiple_files(
+        prompt=json.dumps(summary_json, indent=2),
         files=[],
-        model_id=ModelRegistry.haiku_3_5
+        model_id=ModelRegistry.haiku_3_5,
+        cache_prefix=base_prompt + "\n\n",
+        agent="Generate Summary PDF"
     )
     return response
 
 def markdown_to_pdf_bytes(markdown_string: str) -> bytes:
+    # WeasyPrint pulls in Pango/cairo bindings; only load them when a PDF is rendered
+    import markdown2
+    from weasyprint import HTML
+
     # Convert Markdown to HTML
     html_body = markdown2.markdown(markdown_string)
 
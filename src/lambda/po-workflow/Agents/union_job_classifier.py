@@ -1,13 +1,99 @@
-import json
-from utils import query_bedrock_with_multiple_files_with_tools, try_parse_json_like
-from utils.union_job_utils import load_union_job_data, CSV_PATH, TITLE_COLUMN
-from prompt_loader import TASK_PROMPT_REGISTRY
-from model_registry import ModelRegistry
+from utils import aquery_bedrock_with_multiple_files_with_tools, try_parse_json_like, build_prompt_payload
+from utils.union_job_utils import load_union_job_data, build_cost_check, CSV_PATH, TITLE_COLUMN, COST_COLUMN
+from utils.union_job_matcher import get_union_job_matcher, find_phrase_cost, tokenize, DESCRIPTION_FIELD_RE
+from prompt_loader import TASK_PROMPT_REGISTRY, split_prompt_template
+from utils.model_router import routed_call, expect_json, CONFIDENCE_INSTRUCTION
 from state import PipelineState
 from tools import get_tool_config
+from config.processing_limits import (
+    UNION_MATCH_TOP_K,
+    UNION_TITLE_RESOLVE_THRESHOLD,
+    UNION_MATCH_MIN_CANDIDATE_SCORE,
+    ENABLE_UNION_LOCAL_MATCH,
+    UNION_LOCAL_MATCH_MIN_TITLE_TOKENS,
+    ENABLE_PROGRESS_LOGGING
+)
 
 
-def union_job_check(state: PipelineState) -> PipelineState:
+def build_local_match_result(candidate, matched_row, cost_check) -> dict:
+    """Same shape as the LLM answer, for matches clear enough to skip the call."""
+    return {
+        "union_job_detected": True,
+        "matched_union_title": candidate.title,
+        "match_sources": [{
+            "doc_name": candidate.doc_name,
+            "doc_type": candidate.doc_type,
+            "rationale": (
+                f"The phrase '{candidate.phrase}' in the {candidate.field} field "
+                f"matches the union job title '{candidate.title}'."
+            ),
+        }],
+        "cost_check": cost_check,
+        "match_method": "local",
+        "match_score": round(candidate.score, 3),
+        "matched_row": matched_row,
+    }
+
+
+def match_locally(parsed, candidates, union_jobs):
+    """
+    The union job result without an LLM call, or None when the match is not
+    certain. Only a full match of a multi-word title inside a description
+    field counts, with no other full match it does not contain, and only when
+    both costs are found locally: the UC cost in the table and the PO cost
+    next to the matched phrase.
+    """
+    if not ENABLE_UNION_LOCAL_MATCH or not candidates:
+        return None
+    best = candidates[0]
+    title_tokens = set(tokenize(best.title))
+    if best.score < 1.0 or not DESCRIPTION_FIELD_RE.search(best.field) \
+            or len(title_tokens) < UNION_LOCAL_MATCH_MIN_TITLE_TOKENS:
+        return None
+    # "Lead Custodian" over "Custodian" is fine; two unrelated full matches are not
+    if any(c.score >= 1.0 and not set(tokenize(c.title)) <= title_tokens for c in candidates[1:]):
+        return None
+
+    matched_row = union_jobs.lookup(best.title)
+    if matched_row is None or not matched_row.get(COST_COLUMN):
+        return None
+    cost_check = build_cost_check(matched_row[COST_COLUMN], find_phrase_cost(parsed, best))
+    if cost_check["Pass"] is None:
+        return None
+
+    if ENABLE_PROGRESS_LOGGING:
+        print(f"✅ Union job matched locally: {best.title} ({best.field})")
+    return build_local_match_result(best, matched_row, cost_check)
+
+
+def select_prompt_titles(candidates, job_titles) -> list:
+    """Top local candidates when they are trustworthy, otherwise every title."""
+    if candidates and candidates[0].score >= UNION_MATCH_MIN_CANDIDATE_SCORE:
+        return [c.title for c in candidates]
+    # Nothing close lexically (e.g. "janitorial" vs "Custodian"): let the
+    # model match semantically against every title
+    return job_titles
+
+
+def resolve_matched_row(raw_output: dict, union_jobs, matcher):
+    """Reference row for the title the model picked, or a note when it is not in the list."""
+    matched_title_raw = raw_output.get("matched_union_title")
+    matched_title = matched_title_raw.strip().lower() if matched_title_raw else ""
+
+    matched_row = union_jobs.lookup(matched_title) if matched_title else None
+    if matched_title and matched_row is None:
+        # The model paraphrased the title; resolve it against the list
+        resolved = matcher.best_title(matched_title_raw, UNION_TITLE_RESOLVE_THRESHOLD)
+        matched_row = union_jobs.lookup(resolved) if resolved else None
+
+    if matched_title and matched_row is None:
+        matched_row = {
+            "note": f"No match found in union job list for title '{matched_title}'"
+        }
+    return matched_row
+
+
+async def union_job_check(state: PipelineState) -> PipelineState:
     parsed = state.get("parsed_data", {})
     if not parsed:
         return {
@@ -17,32 +103,39 @@ def union_job_check(state: PipelineState) -> PipelineState:
         }
 
     try:
-        df, job_titles = load_union_job_data(
+        union_jobs, job_titles = load_union_job_data(
             filepath=CSV_PATH, title_col=TITLE_COLUMN)
-        if TITLE_COLUMN not in df.columns:
-            return {
-                "union_job_check": {
-                    "error": f"❌ Missing required column: '{TITLE_COLUMN}' in CSV.",
-                }
-            }
-        df["__normalized_title__"] = df[TITLE_COLUMN].astype(
-            str).str.strip().str.lower()
 
-        union_list_str = ", ".join(sorted(set(job_titles)))
+        # Rank titles locally against the description fields: a certain match
+        # with both costs at hand needs no LLM call, otherwise only the top
+        # candidates go into the prompt
+        matcher = get_union_job_matcher()
+        candidates = matcher.rank_parsed_data(parsed, top_k=UNION_MATCH_TOP_K)
+        local_match = match_locally(parsed, candidates, union_jobs)
+        if local_match is not None:
+            return {"union_job_check": local_match}
+
+        prompt_titles = select_prompt_titles(candidates, job_titles)
+        union_list_str = ", ".join(sorted(set(prompt_titles)))
         prompt_template = TASK_PROMPT_REGISTRY["UNION_JOB_CLASSIFICATION"]
-        doc_text = json.dumps(parsed, indent=2)
-        prompt = (
-            prompt_template.replace("{doc_text}", doc_text)
-            .replace("{union_job_list}", union_list_str)
-        )
+        doc_text = build_prompt_payload(parsed, "union_job")
+        # Instructions + the title list come before the document: cached prefix
+        static_prompt, prompt_suffix = split_prompt_template(
+            prompt_template.replace("{union_job_list}", union_list_str), "{doc_text}")
 
-        response = query_bedrock_with_multiple_files_with_tools(
-            prompt=prompt,
-            files=[],
-            model_id=ModelRegistry.haiku_3_5,
-            tool_config=get_tool_config([
-                "get_UC_cost"
-            ])
+        response, _ = await routed_call(
+            "Check if Union Job",
+            lambda model_id: aquery_bedrock_with_multiple_files_with_tools(
+                prompt=doc_text + prompt_suffix + CONFIDENCE_INSTRUCTION,
+                files=[],
+                model_id=model_id,
+                tool_config=get_tool_config([
+                    "get_UC_cost"
+                ]),
+                cache_prefix=static_prompt,
+                agent="Check if Union Job"
+            ),
+            expect_json(required=("union_job_detected",), check_confidence=True)
         )
 
         raw_output = try_parse_json_like(response)
@@ -55,25 +148,12 @@ def union_job_check(state: PipelineState) -> PipelineState:
                 }
             }
 
-        matched_title_raw = raw_output.get("matched_union_title")
-        matched_title = matched_title_raw.strip().lower() if matched_title_raw else ""
-
-        match_df = df[df["__normalized_title__"] == matched_title]
-        matched_row = None
-
-        if matched_title and not match_df.empty:
-            records = match_df.drop(
-                columns=["__normalized_title__"], errors="ignore").to_dict(orient="records")
-            matched_row = records[0] if records else None
-        elif matched_title:
-            matched_row = {
-                "note": f"No match found in union job list for title '{matched_title}'"
-            }
-
         return {
             "union_job_check": {
                 **raw_output,
-                "matched_row": matched_row
+                "match_method": "llm",
+                "candidate_titles": len(prompt_titles),
+                "matched_row": resolve_matched_row(raw_output, union_jobs, matcher)
             }
         }
 
@@ -1,11 +1,10 @@
-from utils import query_bedrock_with_multiple_files, try_parse_json_like
-from prompt_loader import TASK_PROMPT_REGISTRY
-from model_registry import ModelRegistry
-import json
+from utils import aquery_bedrock_with_multiple_files, try_parse_json_like, build_prompt_payload
+from prompt_loader import TASK_PROMPT_REGISTRY, split_prompt_template
+from utils.model_router import routed_call, expect_json, CONFIDENCE_INSTRUCTION
 from state import PipelineState
 
 
-def validate_data(state: PipelineState) -> PipelineState:
+async def validate_data(state: PipelineState) -> PipelineState:
     parsed = state.get("parsed_data", {})
     if not parsed:
         return {
@@ -17,14 +16,20 @@ def validate_data(state: PipelineState) -> PipelineState:
         }
 
     try:
-        doc_text = json.dumps(parsed, indent=2)
-        prompt = TASK_PROMPT_REGISTRY.get(
-            "DATA_VALIDATION", "").replace("{doc_text}", doc_text)
+        doc_text = build_prompt_payload(parsed, "validation")
+        static_prompt, prompt_suffix = split_prompt_template(
+            TASK_PROMPT_REGISTRY.get("DATA_VALIDATION", ""), "{doc_text}")
 
-        response = query_bedrock_with_multiple_files(
-            prompt=prompt,
-            files=[],
-            model_id=ModelRegistry.sonnet_3_5
+        response, _ = await routed_call(
+            "Validate PO data",
+            lambda model_id: aquery_bedrock_with_multiple_files(
+                prompt=doc_text + prompt_suffix + CONFIDENCE_INSTRUCTION,
+                files=[],
+                model_id=model_id,
+                cache_prefix=static_prompt,
+                agent="Validate PO data"
+            ),
+            expect_json(check_confidence=True)
         )
 
         parsed_result = try_parse_json_like(response)
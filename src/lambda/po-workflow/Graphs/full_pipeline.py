@@ -1,3 +1,4 @@
+from functools import lru_cache
 from langgraph.graph import StateGraph, END
 from langchain_core.runnables import RunnableLambda
 
@@ -7,15 +8,16 @@ from Agents.validation import validate_data
 from Agents.union_job_classifier import union_job_check
 from Agents.pc_llm_mapping import pc_llm_mapping
 from Agents.phi_agreement_checker import phi_agreement_checker
-from Agents.data_sec_classification import run_data_sec_classification
+from Agents.data_sec_classification import run_data_sec_classification, run_goods_services_classification
 from Agents.summarize import summarize_and_generate_pdf
 from state import PipelineState
+from utils.telemetry import traced
 
 
 def check_po_exists(state: PipelineState) -> PipelineState:
     parsed = state.get("parsed_data", {})
     for doc in parsed.values():
-        doc_type = doc.get("result", {}).get("doc_type", "").upper()
+        doc_type = ((doc.get("result") or {}).get("doc_type") or "").upper()
         if doc_type == "PO":
             return {"po_check": "Yes"}
     return {"po_check": "No"}
@@ -24,15 +26,16 @@ def build_full_pipeline_graph():
     graph = StateGraph(PipelineState)
 
     # Nodes
-    graph.add_node("Parse Documents", RunnableLambda(parse_documents_node))
-    graph.add_node("Checklist", RunnableLambda(run_checklist))
-    graph.add_node("Check PO Exists", RunnableLambda(check_po_exists))
-    graph.add_node("Validate PO data", RunnableLambda(validate_data))
-    graph.add_node("Check if Union Job", RunnableLambda(union_job_check))
-    graph.add_node("PHI Agreement Check", RunnableLambda(phi_agreement_checker))
-    graph.add_node("LLM PC Classifier", RunnableLambda(pc_llm_mapping))
-    graph.add_node("Data Security Classification", RunnableLambda(run_data_sec_classification))
-    graph.add_node("Generate Summary PDF", RunnableLambda(summarize_and_generate_pdf))
+    graph.add_node("Parse Documents", RunnableLambda(traced("Parse Documents", parse_documents_node)))
+    graph.add_node("Checklist", RunnableLambda(traced("Checklist", run_checklist)))
+    graph.add_node("Check PO Exists", RunnableLambda(traced("Check PO Exists", check_po_exists)))
+    graph.add_node("Validate PO data", RunnableLambda(traced("Validate PO data", validate_data)))
+    graph.add_node("Check if Union Job", RunnableLambda(traced("Check if Union Job", union_job_check)))
+    graph.add_node("PHI Agreement Check", RunnableLambda(traced("PHI Agreement Check", phi_agreement_checker)))
+    graph.add_node("LLM PC Classifier", RunnableLambda(traced("LLM PC Classifier", pc_llm_mapping)))
+    graph.add_node("Data Security Classification", RunnableLambda(traced("Data Security Classification", run_data_sec_classification)))
+    graph.add_node("Goods/Services Classification", RunnableLambda(traced("Goods/Services Classification", run_goods_services_classification)))
+    graph.add_node("Generate Summary PDF", RunnableLambda(traced("Generate Summary PDF", summarize_and_generate_pdf)))
 
     # Entry
     graph.set_entry_point("Parse Documents")
@@ -44,6 +47,7 @@ def build_full_pipeline_graph():
     graph.add_edge("Parse Documents", "PHI Agreement Check")
     graph.add_edge("Parse Documents", "LLM PC Classifier")
     graph.add_edge("Parse Documents", "Data Security Classification")
+    graph.add_edge("Parse Documents", "Goods/Services Classification")
 
     graph.add_conditional_edges("Check PO Exists", lambda s: s["po_check"], {
         "Yes": "Validate PO data",
@@ -56,9 +60,15 @@ def build_full_pipeline_graph():
     graph.add_edge("PHI Agreement Check", "Generate Summary PDF")
     graph.add_edge("LLM PC Classifier", "Generate Summary PDF")
     graph.add_edge("Data Security Classification", "Generate Summary PDF")
+    graph.add_edge("Goods/Services Classification", "Generate Summary PDF")
 
     graph.add_edge("Generate Summary PDF", END)
 
 
-
     return graph.compile()
+
+
+@lru_cache(maxsize=1)
+def get_full_pipeline_graph():
+    """Compiled graph shared by every invocation in this container; it holds no per-job state."""
+    return build_full_pipeline_graph()
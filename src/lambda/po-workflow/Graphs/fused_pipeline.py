@@ -0,0 +1,40 @@
+from functools import lru_cache
+from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableLambda
+
+from Agents.doc_parser import parse_documents_node
+from Agents.fused_analysis import run_fused_analysis
+from Agents.summarize import summarize_and_generate_pdf
+from state import PipelineState
+from utils.telemetry import traced
+
+
+def build_fused_pipeline_graph():
+    graph = StateGraph(PipelineState)
+
+    graph.add_node("Parse Documents", RunnableLambda(traced("Parse Documents", parse_documents_node)))
+    graph.add_node("Fused Analysis", RunnableLambda(traced("Fused Analysis", run_fused_analysis)))
+    graph.add_node("Generate Summary PDF", RunnableLambda(traced("Generate Summary PDF", summarize_and_generate_pdf)))
+
+    graph.set_entry_point("Parse Documents")
+    graph.add_edge("Parse Documents", "Fused Analysis")
+    graph.add_edge("Fused Analysis", "Generate Summary PDF")
+    graph.add_edge("Generate Summary PDF", END)
+
+    return graph.compile()
+
+
+@lru_cache(maxsize=1)
+def get_fused_pipeline_graph():
+    """Compiled once per container, like the fan-out graph."""
+    return build_fused_pipeline_graph()
+
+
+def get_pipeline_graph(mode: str = None):
+    """The analysis graph selected by PIPELINE_MODE: "fused" or the default fan-out graph."""
+    from config.processing_limits import PIPELINE_MODE
+    from Graphs.full_pipeline import get_full_pipeline_graph
+
+    if (mode or PIPELINE_MODE) == "fused":
+        return get_fused_pipeline_graph()
+    return get_full_pipeline_graph()
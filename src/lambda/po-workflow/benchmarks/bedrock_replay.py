@@ -0,0 +1,113 @@
+"""
+Record real converse responses once, then replay them offline with configurable
+latency and throttling, so pipeline changes can be timed without Bedrock.
+
+A recording is JSON lines, one per call:
+    {"key": ..., "model_id": ..., "latency_ms": ..., "response": {...converse response...}}
+"key" is the start of the first text block of the request. Agents put their
+static instructions first, so the key identifies the task and is stable across jobs.
+"""
+import json
+import random
+import threading
+import time
+
+from benchmarks.bedrock_stub import StubBedrockClient
+
+KEY_CHARS = 200
+
+
+def request_key(kwargs) -> str:
+    for message in kwargs.get("messages", []):
+        for block in message.get("content", []):
+            if block.get("text"):
+                return block["text"][:KEY_CHARS]
+    return ""
+
+
+def load_recordings(path: str) -> dict:
+    """key -> list of recorded calls (a task may have been recorded more than once)."""
+    recordings = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                recordings.setdefault(record["key"], []).append(record)
+    return recordings
+
+
+class RecordingBedrockClient:
+    """Wraps the real client and appends every converse call to a recording."""
+
+    def __init__(self, client, path: str):
+        self.client = client
+        self.path = path
+        self._lock = threading.Lock()
+
+    def converse(self, **kwargs):
+        started = time.perf_counter()
+        response = self.client.converse(**kwargs)
+        record = {
+            "key": request_key(kwargs),
+            "model_id": kwargs.get("modelId"),
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "response": {k: v for k, v in response.items() if k != "ResponseMetadata"},
+        }
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+        return response
+
+    def invoke_model(self, **kwargs):
+        return self.client.invoke_model(**kwargs)
+
+
+class ReplayBedrockClient(StubBedrockClient):
+    """
+    Answers converse calls from a recording, sleeping for the recorded latency
+    (times `latency_scale`, or a fixed `latency_seconds` when no recording
+    matches) and raising ThrottlingException on `throttle_rate` of calls so
+    the governor's backoff is exercised. Unrecorded requests fall back to the
+    canned stub answers.
+    """
+
+    def __init__(self, recordings: dict = None, latency_scale: float = 1.0,
+                 latency_seconds: float = 0.0, jitter: float = 0.2, throttle_rate: float = 0.0,
+                 seed: int = 0, **kwargs):
+        super().__init__(latency_seconds=0.0, **kwargs)
+        self.recordings = recordings or {}
+        self.latency_scale = latency_scale
+        self.default_latency_seconds = latency_seconds
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.throttles = 0
+        self.replayed = 0
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _draw(self):
+        with self._rng_lock:
+            return self._rng.random(), self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def converse(self, **kwargs):
+        from botocore.exceptions import ClientError
+
+        throttle_draw, jitter = self._draw()
+        if throttle_draw < self.throttle_rate:
+            with self._lock:
+                self.throttles += 1
+            time.sleep(0.02)  # a throttle still costs a round trip
+            raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "Injected"}},
+                              "Converse")
+
+        candidates = self.recordings.get(request_key(kwargs))
+        if not candidates:
+            if self.default_latency_seconds:
+                time.sleep(self.default_latency_seconds * jitter)
+            return super().converse(**kwargs)
+
+        with self._lock:
+            record = candidates[self.replayed % len(candidates)]
+            self.calls += 1
+            self.replayed += 1
+        time.sleep(record["latency_ms"] / 1000 * self.latency_scale * jitter)
+        return json.loads(json.dumps(record["response"]))
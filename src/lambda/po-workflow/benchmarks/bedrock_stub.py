@@ -0,0 +1,161 @@
+"""
+Offline stand-in for the bedrock-runtime client, used by the benchmarks so the
+pipeline can be timed without network access or Bedrock credentials.
+"""
+import hashlib
+import io
+import json
+import random
+import threading
+import time
+
+# Canned answers, picked by a marker that only appears in the matching prompt
+CANNED_RESPONSES = [
+    ("smart document parser", json.dumps({
+        "doc_type": "PO",
+        "parsed_data": {
+            "PO Number": "PO-000123",
+            "Supplier Name": "Acme Facilities Inc.",
+            "Line Item Description": "Janitorial services for Building 12",
+            "Total Amount": "$12,400.00",
+            "Information to be exchanged between client and supplier": "Building access schedules",
+        },
+    })),
+    ("technical writer", "# Summary\n\n## Checklist\n- [PASSED] Stubbed summary\n"),
+    ("Checklist items", json.dumps([
+        {"check": "Funding Source", "status": "✅ Passed", "note": "Stubbed"},
+    ])),
+    ("Data Validation Prompt", json.dumps({"status": "No other documents to validate the PO against"})),
+    ("Union Job Reference List", json.dumps({
+        "union_job_detected": True,
+        "matched_union_title": "Custodian",
+        "match_sources": [{"doc_name": "po", "doc_type": "PO", "rationale": "Stubbed"}],
+    })),
+    ("purchasing categories you can", "{{Janitorial Services}}\nStubbed reasoning."),
+    ("Personal Health Information", "{{NOPHI}} Stubbed reasoning."),
+    ("document classification specialist", "service"),
+    ("expert in data classification", json.dumps({
+        "data_shared": False,
+        "protection_level": "P1",
+        "information_exchanged": "Building access schedules",
+        "institutional_information_type": "Public information",
+        "justification": "Stubbed",
+    })),
+]
+
+# Answers for forced tool calls (toolChoice), keyed by tool name
+CANNED_TOOL_INPUTS = {
+    "submit_analysis": {
+        "checklist": [{"check": "Funding Source", "status": "✅ Passed", "note": "Stubbed"}],
+        "phi_agreement": "{{NOPHI}} Stubbed reasoning.",
+        "pc_classification": "{{Janitorial Services}}\nStubbed reasoning.",
+        "goods_services": "service",
+        "data_security": {
+            "data_shared": False,
+            "protection_level": "P1",
+            "information_exchanged": "Building access schedules",
+            "institutional_information_type": "Public information",
+            "justification": "Stubbed",
+        },
+        "validation": {"status": "No other documents to validate the PO against"},
+        "union_job": {
+            "union_job_detected": True,
+            "matched_union_title": "Custodian",
+            "match_sources": [{"doc_name": "po", "doc_type": "PO", "rationale": "Stubbed"}],
+            "cost_check": {"UC_Cost": None, "PO_Cost": "$12,400.00", "Pass": None},
+        },
+    },
+}
+
+EMBEDDING_DIM = 1024
+
+
+def fake_embedding(text: str, dim: int = EMBEDDING_DIM) -> list:
+    """Deterministic pseudo-embedding: the same text always maps to the same vector."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    return [rng.gauss(0.0, 1.0) for _ in range(dim)]
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class StubBedrockClient:
+    """Implements the subset of the bedrock-runtime client the pipeline calls."""
+
+    def __init__(self, latency_seconds: float = 0.0, embedding_latency_seconds: float = 0.0,
+                 output_token_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.output_token_seconds = output_token_seconds  # Generation time per output token
+        self.embedding_latency_seconds = embedding_latency_seconds
+        self.calls = 0
+        self.embedding_calls = 0
+        self.usage_by_model = {}
+        self._lock = threading.Lock()
+
+    def converse(self, **kwargs):
+        self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+        prompt = "".join(
+            block.get("text", "")
+            for message in kwargs.get("messages", [])
+            for block in message.get("content", [])
+        )
+        forced_tool = (kwargs.get("toolConfig") or {}).get("toolChoice", {}).get("tool", {}).get("name")
+        if forced_tool:
+            schema = next(t["toolSpec"]["inputSchema"]["json"] for t in kwargs["toolConfig"]["tools"]
+                          if t["toolSpec"]["name"] == forced_tool)
+            tool_input = {k: v for k, v in CANNED_TOOL_INPUTS.get(forced_tool, {}).items()
+                          if k in schema.get("properties", {})}
+            text = json.dumps(tool_input)
+            content = [{"toolUse": {"toolUseId": f"stub-{self.calls}", "name": forced_tool,
+                                    "input": tool_input}}]
+            stop_reason = "tool_use"
+        else:
+            text = next((answer for marker, answer in CANNED_RESPONSES if marker in prompt), "{}")
+            content = [{"text": text}]
+            stop_reason = "end_turn"
+        input_tokens = estimate_tokens(prompt)
+        output_tokens = estimate_tokens(text)
+        if self.output_token_seconds:
+            time.sleep(output_tokens * self.output_token_seconds)
+
+        with self._lock:
+            totals = self.usage_by_model.setdefault(
+                kwargs.get("modelId"), {"calls": 0, "inputTokens": 0, "outputTokens": 0})
+            totals["calls"] += 1
+            totals["inputTokens"] += input_tokens
+            totals["outputTokens"] += output_tokens
+        return {
+            "output": {"message": {"role": "assistant", "content": content}},
+            "stopReason": stop_reason,
+            "usage": {
+                "inputTokens": input_tokens,
+                "outputTokens": output_tokens,
+                "totalTokens": input_tokens + output_tokens,
+            },
+        }
+
+
+    def invoke_model(self, **kwargs):
+        self.embedding_calls += 1
+        if self.embedding_latency_seconds:
+            time.sleep(self.embedding_latency_seconds)
+
+        text = json.loads(kwargs["body"])["inputText"]
+        body = json.dumps({
+            "embedding": fake_embedding(text),
+            "inputTextTokenCount": estimate_tokens(text),
+        })
+        return {"body": io.BytesIO(body.encode("utf-8")), "contentType": "application/json"}
+
+
+def install_stub(client=None):
+    """Route every converse and invoke_model call in the pipeline to the stub client."""
+    import utils.bedrock_utils as bedrock_utils
+    client = client or StubBedrockClient()
+    bedrock_utils.bedrock = client
+    return client
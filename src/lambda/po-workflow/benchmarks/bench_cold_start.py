@@ -0,0 +1,95 @@
+"""
+Cold-start import cost of the Lambda handler module, with and without Streamlit.
+
+Each sample imports `main` in a fresh interpreter, the same way the Lambda runtime
+does on a cold start. "headless" is the handler as shipped; "streamlit" also
+imports the Streamlit pipeline stream, which is what the handler used to pull in.
+`-X importtime` output is used to report the slowest top-level imports.
+
+Run from src/lambda/po-workflow:
+    python -m benchmarks.bench_cold_start --iterations 5
+"""
+import os
+import argparse
+import statistics
+import subprocess
+import sys
+
+PROBE = (
+    "import sys, time\n"
+    "started = time.perf_counter()\n"
+    "import main\n"
+    "{extra}"
+    "print('IMPORT_MS', (time.perf_counter() - started) * 1000)\n"
+    "print('STREAMLIT_LOADED', 'streamlit' in sys.modules)\n"
+)
+
+VARIANTS = {
+    "headless": "",
+    "streamlit": "import utils.langgraph_streaming_utils\n",
+}
+
+
+def probe_env():
+    env = dict(os.environ)
+    env.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+    env.setdefault("PARSE_CACHE_BACKEND", "none")
+    return env
+
+
+def sample(extra: str, importtime: bool = False):
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", PROBE.format(extra=extra)]
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=probe_env(), check=True)
+
+    import_ms, streamlit_loaded = None, None
+    for line in proc.stdout.splitlines():
+        if line.startswith("IMPORT_MS"):
+            import_ms = float(line.split()[1])
+        elif line.startswith("STREAMLIT_LOADED"):
+            streamlit_loaded = line.split()[1] == "True"
+    return import_ms, streamlit_loaded, proc.stderr
+
+
+def top_imports(importtime_log: str, limit: int):
+    """Top-level packages by cumulative import time, from `-X importtime` stderr."""
+    totals = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, raw_name = line[len("import time:"):].split("|")
+        cumulative, name = cumulative.strip(), raw_name.strip()
+        # nested imports are indented; the outermost entry already includes them
+        if not cumulative.isdigit() or len(raw_name) - len(raw_name.lstrip()) > 1:
+            continue
+        root = name.split(".")[0]
+        totals[root] = totals.get(root, 0) + int(cumulative)
+    return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    medians = {}
+    for label, extra in VARIANTS.items():
+        samples = [sample(extra) for _ in range(args.iterations)]
+        times = [ms for ms, _, _ in samples]
+        medians[label] = statistics.median(times)
+        print(f"{label:>9}: import main median {medians[label]:8.1f} ms  "
+              f"min {min(times):8.1f} ms  streamlit loaded: {samples[0][1]}")
+
+    print(f"cold-start import saved: {medians['streamlit'] - medians['headless']:.1f} ms")
+
+    _, _, log = sample(VARIANTS["headless"], importtime=True)
+    print(f"\nslowest top-level imports (headless, cumulative us):")
+    for name, us in top_imports(log, args.top):
+        print(f"  {name:<30} {us:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Embedding index build: old sequential loop vs the concurrent, resumable builder.
+
+Bedrock invoke_model is stubbed with a fixed per-call latency. Four runs are
+reported: the old one-call-at-a-time loop, a fresh concurrent build, a rerun
+with nothing changed (every row reused), and an interrupted build that resumes
+from its checkpoint.
+
+Run from src/lambda/po-workflow:
+    python -m benchmarks.bench_embedding_build --latency-ms 80
+"""
+import os
+import argparse
+import shutil
+import tempfile
+import time
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+os.environ.setdefault("EMBEDDING_CACHE_BACKEND", "none")
+
+from benchmarks.bedrock_stub import StubBedrockClient, install_stub
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    from utils.embedding_utils import (
+        load_texts_for_embedding, build_embedding_index, invoke_embedding,
+        PC_CSV_PATH, EMBEDDING_MODEL_ID, CHECKPOINT_SUFFIX)
+    from utils.vector_index import write_vector_index
+    from config.processing_limits import EMBEDDING_MAX_WORKERS
+
+    workers = args.workers or EMBEDDING_MAX_WORKERS
+    stub = install_stub(StubBedrockClient(embedding_latency_seconds=args.latency_ms / 1000))
+    texts = load_texts_for_embedding(PC_CSV_PATH)
+    workdir = tempfile.mkdtemp(prefix="embed-bench-")
+    try:
+        def sequential():
+            vectors = [invoke_embedding(t) for t in texts]
+            write_vector_index(os.path.join(workdir, "sequential"), vectors, texts, EMBEDDING_MODEL_ID)
+
+        _, seq_ms = timed(sequential)
+        print(f"sequential   : {seq_ms:9.1f} ms  {len(texts)} calls")
+
+        index_path = os.path.join(workdir, "pc_vector_index")
+        build_ms = {}
+        for label in ("concurrent", "rerun"):
+            before = stub.embedding_calls
+            stats, build_ms[label] = timed(
+                lambda: build_embedding_index(texts, index_path, max_workers=workers))
+            print(f"{label:<13}: {build_ms[label]:9.1f} ms  "
+                  f"{stub.embedding_calls - before} calls  {stats}")
+
+        # Interrupted build: fail every call after the first half, then resume
+        resume_path = os.path.join(workdir, "resumed")
+        half = len(texts) // 2
+        calls = {"n": 0}
+
+        def flaky_embed(text, model_id):
+            calls["n"] += 1
+            if calls["n"] > half:
+                raise RuntimeError("simulated interruption")
+            return invoke_embedding(text, model_id)
+
+        try:
+            build_embedding_index(texts, resume_path, max_workers=workers, embed_fn=flaky_embed)
+        except RuntimeError as e:
+            print(f"interrupted  : {e}")
+        checkpointed = sum(1 for _ in open(resume_path + CHECKPOINT_SUFFIX))
+        before = stub.embedding_calls
+        stats, ms = timed(lambda: build_embedding_index(texts, resume_path, max_workers=workers))
+        print(f"resumed      : {ms:9.1f} ms  {stub.embedding_calls - before} calls "
+              f"({checkpointed} rows from checkpoint)  {stats}")
+        print(f"fresh build speedup vs sequential ({workers} workers): "
+              f"{seq_ms / max(build_ms['concurrent'], 1e-6):.1f}x")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
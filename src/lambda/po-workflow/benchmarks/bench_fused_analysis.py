@@ -0,0 +1,92 @@
+"""
+Fan-out graph (one agent per check) vs the fused graph (one multi-task call).
+
+Runs both graphs on the same stubbed job and reports Bedrock calls, input/output
+tokens, estimated cost and wall-clock per job. The stub charges a fixed latency
+per call plus a per-output-token generation time, so the fused call pays for
+answering every section serially while the fan-out calls overlap.
+
+Run from src/lambda/po-workflow:
+    python -m benchmarks.bench_fused_analysis --iterations 10 --latency 0.8 --token-ms 20
+"""
+import os
+import argparse
+import asyncio
+import statistics
+import time
+from io import BytesIO
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+os.environ.setdefault("PARSE_CACHE_BACKEND", "none")
+
+from benchmarks.bedrock_stub import StubBedrockClient, install_stub
+from model_registry import ModelRegistry
+
+# On-demand USD per 1M (input, output) tokens; edit to match the current price list
+PRICES_PER_MTOK = {
+    ModelRegistry.sonnet_3_7: (3.00, 15.00),
+    ModelRegistry.sonnet_3_5: (3.00, 15.00),
+    ModelRegistry.haiku_3_5: (0.80, 4.00),
+}
+
+
+class NamedBytesIO(BytesIO):
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+def estimate_cost(usage_by_model: dict) -> float:
+    cost = 0.0
+    for model_id, usage in usage_by_model.items():
+        input_price, output_price = PRICES_PER_MTOK.get(model_id, (0.0, 0.0))
+        cost += (usage["inputTokens"] * input_price + usage["outputTokens"] * output_price) / 1e6
+    return cost
+
+
+def run_mode(mode: str, iterations: int, latency: float, token_seconds: float) -> dict:
+    from Graphs.fused_pipeline import get_pipeline_graph
+
+    pipeline = get_pipeline_graph(mode)
+    client = install_stub(StubBedrockClient(
+        latency_seconds=latency, output_token_seconds=token_seconds))
+
+    walls, fallbacks = [], 0
+    for _ in range(iterations):
+        files = [NamedBytesIO(b"%PDF-1.4 stub purchase order", "po.pdf")]
+        started = time.perf_counter()
+        state = asyncio.run(pipeline.ainvoke({"uploaded_files": files}))
+        walls.append((time.perf_counter() - started) * 1000)
+        fallbacks += len((state.get("fused_analysis") or {}).get("fallbacks") or [])
+
+    usage = client.usage_by_model
+    return {
+        "calls": client.calls / iterations,
+        "input": sum(u["inputTokens"] for u in usage.values()) / iterations,
+        "output": sum(u["outputTokens"] for u in usage.values()) / iterations,
+        "cost": estimate_cost(usage) / iterations,
+        "wall_ms": statistics.median(walls),
+        "fallbacks": fallbacks / iterations,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.8, help="Seconds per call before the first token")
+    parser.add_argument("--token-ms", type=float, default=20.0, help="Milliseconds per output token")
+    args = parser.parse_args()
+
+    results = {mode: run_mode(mode, args.iterations, args.latency, args.token_ms / 1000)
+               for mode in ("fanout", "fused")}
+
+    print(f"{'mode':>7} {'calls':>6} {'input tok':>10} {'output tok':>11} "
+          f"{'cost $':>9} {'wall ms':>9} {'fallbacks':>10}")
+    for mode, r in results.items():
+        print(f"{mode:>7} {r['calls']:6.1f} {r['input']:10.0f} {r['output']:11.0f} "
+              f"{r['cost']:9.5f} {r['wall_ms']:9.1f} {r['fallbacks']:10.1f}")
+    print("per job, whole graph (parse and summary calls are the same in both modes)")
+
+
+if __name__ == "__main__":
+    main()
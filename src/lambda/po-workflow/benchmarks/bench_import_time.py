@@ -0,0 +1,74 @@
+"""
+Import-time profile of the Lambda entry point, checked against the cold-start budget.
+
+Runs `python -X importtime` on `from main import handler` in a fresh interpreter,
+reports the slowest top-level imports and which heavy optional dependencies got
+loaded, and exits non-zero when the median exceeds COLD_START_IMPORT_BUDGET_MS,
+so the number can be tracked in CI.
+
+Run from src/lambda/po-workflow:
+    python -m benchmarks.bench_import_time --iterations 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+from benchmarks.bench_cold_start import probe_env, top_imports
+from config.processing_limits import COLD_START_IMPORT_BUDGET_MS
+
+# Should only be imported by the node that needs them, never by `import main`
+DEFERRED_MODULES = (
+    "streamlit", "weasyprint", "markdown2", "pandas", "numpy",
+    "PIL", "PyPDF2", "opensearchpy",
+)
+
+PROBE = (
+    "import sys, time\n"
+    "started = time.perf_counter()\n"
+    "from main import handler\n"
+    "print('IMPORT_MS', (time.perf_counter() - started) * 1000)\n"
+    "print('LOADED', ','.join(m for m in {deferred!r} if m in sys.modules))\n"
+)
+
+
+def sample():
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(deferred=DEFERRED_MODULES)],
+        capture_output=True, text=True, env=probe_env(), check=True)
+    import_ms, loaded = None, []
+    for line in proc.stdout.splitlines():
+        if line.startswith("IMPORT_MS"):
+            import_ms = float(line.split()[1])
+        elif line.startswith("LOADED"):
+            loaded = [m for m in line[len("LOADED"):].strip().split(",") if m]
+    return import_ms, loaded, proc.stderr
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=COLD_START_IMPORT_BUDGET_MS)
+    args = parser.parse_args()
+
+    samples = [sample() for _ in range(args.iterations)]
+    times = [ms for ms, _, _ in samples]
+    median = statistics.median(times)
+    _, loaded, log = samples[-1]
+
+    print(f"import main: median {median:.1f} ms  min {min(times):.1f} ms  "
+          f"max {max(times):.1f} ms  (budget {args.budget_ms:.0f} ms)")
+    print(f"deferred modules loaded at import: {', '.join(loaded) or 'none'}")
+    print("\nslowest top-level imports (cumulative us):")
+    for name, us in top_imports(log, args.top):
+        print(f"  {name:<30} {us:>10}")
+
+    if median > args.budget_ms or loaded:
+        print("\n❌ cold-start import budget exceeded")
+        sys.exit(1)
+    print("\n✅ within cold-start import budget")
+
+
+if __name__ == "__main__":
+    main()
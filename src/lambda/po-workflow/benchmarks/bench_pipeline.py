@@ -0,0 +1,134 @@
+"""
+End-to-end pipeline benchmark against recorded (or canned) Bedrock responses.
+
+Runs synthetic jobs of N attachments through the graph with run_pipeline and
+reports p50/p95 job latency, throughput, Bedrock calls, governor queueing and
+retries, and the process's peak RSS. Throttles can be injected to exercise the
+governor. Nothing leaves the machine unless --record is given.
+
+Run from src/lambda/po-workflow:
+    # offline, canned answers at a fixed latency
+    python -m benchmarks.bench_pipeline --attachments 1 5 10 25 50 --jobs 5 --latency 0.8
+    # replay a recording with 5% throttles
+    python -m benchmarks.bench_pipeline --replay recording.jsonl --throttle-rate 0.05
+    # record real responses for later replay (needs Bedrock credentials)
+    python -m benchmarks.bench_pipeline --record recording.jsonl --files po.pdf quote.pdf --jobs 1
+"""
+import os
+import argparse
+import asyncio
+import resource
+import statistics
+import time
+from io import BytesIO
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+os.environ.setdefault("PARSE_CACHE_BACKEND", "none")
+os.environ.setdefault("ENABLE_EMF_METRICS", "false")
+
+from benchmarks.bedrock_replay import ReplayBedrockClient, RecordingBedrockClient, load_recordings
+from benchmarks.bedrock_stub import install_stub
+
+
+class NamedBytesIO(BytesIO):
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux: the process high-water mark so far
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def synthetic_attachments(job: int, count: int, size_kb: int) -> list:
+    """Distinct small PDFs (distinct bytes, so no cache can short-circuit a parse)."""
+    padding = b"0" * max(0, size_kb * 1024 - 64)
+    return [
+        NamedBytesIO(b"%PDF-1.4\n% synthetic attachment " + f"{job}-{i}\n".encode() + padding,
+                     f"attachment_{i}.pdf")
+        for i in range(count)
+    ]
+
+
+def real_attachments(paths: list) -> list:
+    files = []
+    for path in paths:
+        with open(path, "rb") as f:
+            files.append(NamedBytesIO(f.read(), os.path.basename(path)))
+    return files
+
+
+def run_job(pipeline, files):
+    from utils.pipeline_runner import run_pipeline
+    from utils.telemetry import JobTelemetry
+
+    telemetry = JobTelemetry()
+    started = time.perf_counter()
+    asyncio.run(run_pipeline(files, pipeline, telemetry=telemetry))
+    return (time.perf_counter() - started) * 1000, telemetry.summary()["bedrock"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--attachments", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    parser.add_argument("--jobs", type=int, default=5, help="Jobs per attachment count")
+    parser.add_argument("--attachment-kb", type=int, default=64)
+    parser.add_argument("--mode", choices=["fanout", "fused"], default="fanout")
+    parser.add_argument("--replay", help="Recording (JSON lines) to answer converse calls from")
+    parser.add_argument("--latency", type=float, default=0.5,
+                        help="Seconds per call for requests not in the recording")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier on recorded latencies")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of calls that get throttled")
+    parser.add_argument("--record", help="Call Bedrock for real and append responses to this file")
+    parser.add_argument("--files", nargs="+", help="Real attachments to use instead of synthetic ones")
+    args = parser.parse_args()
+
+    import utils.bedrock_utils as bedrock_utils
+    from Graphs.fused_pipeline import get_pipeline_graph
+
+    if args.record:
+        install_stub(RecordingBedrockClient(bedrock_utils.bedrock, args.record))
+    else:
+        install_stub(ReplayBedrockClient(
+            load_recordings(args.replay) if args.replay else None,
+            latency_scale=args.latency_scale,
+            latency_seconds=args.latency,
+            throttle_rate=args.throttle_rate,
+        ))
+    client = bedrock_utils.bedrock
+    pipeline = get_pipeline_graph(args.mode)
+
+    sizes = [len(args.files)] if args.files else args.attachments
+    print(f"{'docs':>5} {'jobs':>5} {'p50 ms':>9} {'p95 ms':>9} {'jobs/s':>7} {'docs/s':>7} "
+          f"{'calls':>6} {'retries':>8} {'queue ms':>9} {'peak MB':>8}")
+    for size in sizes:
+        latencies, calls, retries, queue_ms = [], 0, 0, 0.0
+        wall = time.perf_counter()
+        for job in range(args.jobs):
+            files = real_attachments(args.files) if args.files else \
+                synthetic_attachments(job, size, args.attachment_kb)
+            elapsed_ms, bedrock = run_job(pipeline, files)
+            latencies.append(elapsed_ms)
+            calls += bedrock["calls"]
+            retries += bedrock["retries"]
+            queue_ms += bedrock["queue_ms"]
+        wall = time.perf_counter() - wall
+
+        print(f"{size:>5} {args.jobs:>5} {statistics.median(latencies):9.1f} "
+              f"{percentile(latencies, 95):9.1f} {args.jobs / wall:7.2f} {args.jobs * size / wall:7.1f} "
+              f"{calls / args.jobs:6.1f} {retries / args.jobs:8.1f} {queue_ms / args.jobs:9.1f} "
+              f"{peak_rss_mb():8.1f}")
+
+    if isinstance(client, ReplayBedrockClient):
+        print(f"replayed {client.replayed} recorded responses, {client.calls - client.replayed} canned, "
+              f"{client.throttles} injected throttles")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Load test for the in-container vector store behind the similar-description lookup.
+
+Builds a synthetic local index (Titan v1 sized vectors with "institutional
+information type" records), then fires k=1 queries from a thread pool and
+reports latency percentiles and throughput. No network or OpenSearch needed.
+
+Run from src/lambda/po-workflow:
+    python -m benchmarks.bench_vector_store --records 5000 --queries 2000 --threads 8
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bedrock_stub import fake_embedding
+
+INFORMATION_TYPES = ["Public information", "Internal use", "Confidential", "Restricted"]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--dim", type=int, default=1536)
+    args = parser.parse_args()
+
+    from utils.vector_index import write_vector_index
+    from utils.vector_store import LocalVectorStore
+
+    workdir = tempfile.mkdtemp(prefix="vector-store-bench-")
+    try:
+        texts = [f"service description {i}" for i in range(args.records)]
+        records = [{"description": t, "institutional information type":
+                    INFORMATION_TYPES[i % len(INFORMATION_TYPES)]} for i, t in enumerate(texts)]
+        started = time.perf_counter()
+        vectors = [fake_embedding(t, args.dim) for t in texts]
+        write_vector_index(os.path.join(workdir, "services_vector_index"),
+                           vectors, texts, "stub", records=records)
+        print(f"built {args.records} x {args.dim} index in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        store = LocalVectorStore("services", index_dir=workdir)
+        print(f"load: {(time.perf_counter() - started) * 1000:.2f} ms")
+
+        queries = [vectors[i % args.records] for i in range(args.queries)]
+
+        def timed_search(vector):
+            t0 = time.perf_counter()
+            hits = store.search(vector, k=1)
+            return (time.perf_counter() - t0) * 1000, hits
+
+        wall = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            results = list(pool.map(timed_search, queries))
+        wall = time.perf_counter() - wall
+
+        latencies = [ms for ms, _ in results]
+        correct = sum(1 for i, (_, hits) in enumerate(results)
+                      if hits and hits[0][0]["description"] == texts[i % args.records])
+        print(f"queries: {args.queries} on {args.threads} threads  "
+              f"p50 {statistics.median(latencies):.3f} ms  p95 {percentile(latencies, 95):.3f} ms  "
+              f"max {max(latencies):.3f} ms")
+        print(f"throughput: {args.queries / wall:.0f} queries/s  recall@1 on exact vectors: "
+              f"{correct / args.queries:.3f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Per-invoke overhead of the Lambda handler path, before and after warm-start caching.
+
+"cold" clears every module-scope cache before each invocation, which reproduces the
+old behaviour of rebuilding the graph and re-reading prompts, tool specs and CSVs
+on every call. "warm" reuses them. Bedrock is stubbed, so the difference is the
+per-invoke overhead alone.
+
+Run from src/lambda/po-workflow:
+    python -m benchmarks.bench_warm_start --iterations 20
+"""
+import os
+import argparse
+import asyncio
+import statistics
+import time
+from io import BytesIO
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+os.environ.setdefault("PARSE_CACHE_BACKEND", "none")
+
+from benchmarks.bedrock_stub import install_stub
+
+
+class NamedBytesIO(BytesIO):
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+def clear_caches():
+    import prompt_loader
+    import tools
+    from utils import reference_data, union_job_matcher
+    from Graphs import full_pipeline
+
+    prompt_loader.get_parser_prompt_registry.cache_clear()
+    prompt_loader.get_task_prompt_registry.cache_clear()
+    tools.load_tool_spec.cache_clear()
+    tools.build_general_doc_prompt_from_file.cache_clear()
+    reference_data.clear_reference_tables()
+    union_job_matcher._matcher = None
+    full_pipeline.get_full_pipeline_graph.cache_clear()
+
+
+def run_invocation(cold: bool):
+    from main import warm_up
+
+    if cold:
+        clear_caches()
+    files = [NamedBytesIO(b"%PDF-1.4 stub purchase order", "po.pdf")]
+
+    started = time.perf_counter()
+    warm_up()
+    setup_ms = (time.perf_counter() - started) * 1000
+
+    from Graphs.full_pipeline import get_full_pipeline_graph
+    asyncio.run(get_full_pipeline_graph().ainvoke({"uploaded_files": files}))
+    total_ms = (time.perf_counter() - started) * 1000
+    return setup_ms, total_ms
+
+
+def report(label, samples):
+    setup = [s for s, _ in samples]
+    total = [t for _, t in samples]
+    print(f"{label:>5}: setup median {statistics.median(setup):8.2f} ms  "
+          f"mean {statistics.mean(setup):8.2f} ms | "
+          f"invoke median {statistics.median(total):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    install_stub()
+    run_invocation(cold=False)  # import everything once so both modes start equal
+
+    cold = [run_invocation(cold=True) for _ in range(args.iterations)]
+    warm = [run_invocation(cold=False) for _ in range(args.iterations)]
+
+    report("cold", cold)
+    report("warm", warm)
+    saved = statistics.median(s for s, _ in cold) - statistics.median(s for s, _ in warm)
+    print(f"per-invoke overhead saved: {saved:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
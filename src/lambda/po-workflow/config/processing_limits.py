@@ -0,0 +1,248 @@
+"""
+Configuration file for document processing limits and throttling protection.
+Adjust these values based on your Bedrock service limits and requirements.
+"""
+import os
+
+# Document Processing Limits
+MAX_DOCUMENTS_PER_BATCH = 4  # Maximum documents to process simultaneously
+BATCH_DELAY_SECONDS = 1.0    # Delay between batches to avoid throttling
+
+# Bedrock API Limits (adjust based on your service tier)
+MAX_CONCURRENT_REQUESTS = 4   # Maximum concurrent Bedrock API calls
+REQUEST_TIMEOUT_SECONDS = 30  # Timeout for individual Bedrock requests
+
+# File Size Limits
+MAX_FILE_SIZE_MB = 4.5       # Maximum file size in MB before compression
+MAX_TOTAL_BATCH_SIZE_MB = 20 # Maximum total size of documents in a batch
+
+# Retry Configuration
+MAX_RETRIES = 3              # Maximum retry attempts for failed requests
+RETRY_DELAY_SECONDS = 2.0    # Delay between retry attempts
+
+# Performance Monitoring
+ENABLE_PROGRESS_LOGGING = True  # Enable detailed progress logging
+ENABLE_PERFORMANCE_METRICS = True  # Enable performance timing metrics
+
+# Throttling Protection
+ENABLE_THROTTLING_PROTECTION = True  # Enable automatic throttling protection
+THROTTLING_BACKOFF_MULTIPLIER = 1.5  # Multiplier for exponential backoff
+MAX_BACKOFF_SECONDS = 10.0   # Maximum backoff delay
+MIN_CONCURRENT_REQUESTS = 1  # Floor for the adaptive per-model concurrency limit
+
+# Parsed Document Cache
+PARSE_CACHE_BACKEND = os.environ.get("PARSE_CACHE_BACKEND", "sqlite")  # "sqlite", "s3" or "none"
+PARSE_CACHE_PATH = os.environ.get("PARSE_CACHE_PATH", "/tmp/parse_cache.sqlite")
+PARSE_CACHE_S3_BUCKET = os.environ.get("PARSE_CACHE_S3_BUCKET", "")
+PARSE_CACHE_S3_PREFIX = os.environ.get("PARSE_CACHE_S3_PREFIX", "cache/parsed/")
+PARSE_CACHE_TTL_SECONDS = 7 * 24 * 3600  # Cached parse results expire after a week
+PARSE_CACHE_MAX_SIZE_MB = 256  # Local cache is trimmed (least recently used first) above this size
+
+# Attachment Loading
+S3_MAX_CONCURRENT_DOWNLOADS = 8  # Parallel S3 GETs (and pooled connections) per container
+MAX_IN_MEMORY_ATTACHMENTS_MB = 256  # Attachment bytes a job may hold in RAM; the rest spill to disk
+SPILL_THRESHOLD_MB = 16  # Objects larger than this always stream to SPILL_DIR
+SPILL_DIR = "/tmp"
+
+# Union Job Matching
+UNION_MATCH_TOP_K = 15  # Candidate titles sent to the LLM instead of the full list
+UNION_TITLE_RESOLVE_THRESHOLD = 0.95  # Local score needed to map the model's paraphrased title to a listed one
+UNION_MATCH_MIN_CANDIDATE_SCORE = 0.5  # Below this the candidates are not trusted; send every title
+ENABLE_UNION_LOCAL_MATCH = os.environ.get("ENABLE_UNION_LOCAL_MATCH", "true").lower() == "true"  # Full title match with a local cost check skips the LLM
+UNION_LOCAL_MATCH_MIN_TITLE_TOKENS = 2  # Single-word titles ("Cook", "Driver") always go to the LLM
+
+# Vector Index
+VECTOR_INDEX_DIR = os.environ.get("VECTOR_INDEX_DIR", "Data")  # Prebuilt <name>.npy + <name>.texts.json
+VECTOR_SEARCH_TOP_K = 5
+EMBEDDING_MAX_WORKERS = 4  # Concurrent embedding calls when building an index (the governor still applies)
+EMBEDDING_CHECKPOINT_EVERY = 25  # Flush build progress to the checkpoint file every N vectors
+
+# Vector Store (similar-description lookups)
+VECTOR_STORE_BACKEND = os.environ.get("VECTOR_STORE_BACKEND", "local")  # "local" (numpy, in-container) or "opensearch"
+OPENSEARCH_HOST = os.environ.get("OPENSEARCH_HOST", "")
+OPENSEARCH_PORT = int(os.environ.get("OPENSEARCH_PORT", "443"))
+OPENSEARCH_REGION = os.environ.get("OPENSEARCH_REGION", os.environ.get("AWS_REGION", "us-west-2"))
+OPENSEARCH_USERNAME = os.environ.get("OPENSEARCH_USERNAME", "")  # Basic auth if set, otherwise IAM (SigV4)
+OPENSEARCH_PASSWORD = os.environ.get("OPENSEARCH_PASSWORD", "")
+
+# Embedding Cache
+EMBEDDING_CACHE_SIZE = 2048  # Query embeddings kept in memory (LRU)
+EMBEDDING_CACHE_BACKEND = os.environ.get("EMBEDDING_CACHE_BACKEND", "sqlite")  # "sqlite" or "none" (memory only)
+EMBEDDING_CACHE_PATH = os.environ.get("EMBEDDING_CACHE_PATH", "/tmp/embedding_cache.sqlite")
+EMBEDDING_CACHE_MAX_ENTRIES = 50000  # On-disk entries kept, least recently used trimmed first
+
+# Prompt Payloads
+COMPACT_PROMPT_PAYLOADS = True  # Minified per-task projection of parsed_data instead of the full indented dump
+
+# Document Type Pre-classification
+DOC_CLASSIFIER_MIN_CONFIDENCE = 0.75  # Local guess share needed to skip the parser's doc-type tool round trip
+DOC_CLASSIFIER_MAX_PAGES = 3  # Pages of text layer read for keywords
+
+# Text Layer
+ENABLE_TEXT_LAYER = os.environ.get("ENABLE_TEXT_LAYER", "true").lower() == "true"  # Send extracted text instead of born-digital PDFs
+TEXT_LAYER_MIN_QUALITY = 0.9  # text_quality() score needed to send text; scans and garbled layers go as PDFs
+TEXT_LAYER_MIN_PAGE_CHARS = 80  # Non-space characters for a page to count as having a text layer
+PDF_PAGE_TOKEN_ESTIMATE = 1500  # Approximate input tokens of one PDF page in a document block, for savings reports
+
+# Chunked Parsing
+ENABLE_CHUNKED_PARSING = os.environ.get("ENABLE_CHUNKED_PARSING", "true").lower() == "true"
+CHUNKED_PARSE_MIN_PAGES = 20  # PDFs with more pages are parsed as concurrent page windows and merged
+PARSE_CHUNK_PAGES = 10  # Pages per window
+PARSE_CHUNK_OVERLAP_PAGES = 1  # Pages shared by neighbouring windows, so a field split across a boundary is seen whole
+
+# Attachment Compression
+MAX_IMAGE_SIZE_MB = 3.75  # Bedrock's image block limit (documents: MAX_CHUNK_SIZE_MB in file_compression_utils)
+COMPRESSION_EXECUTOR = os.environ.get("COMPRESSION_EXECUTOR", "process")  # "process" or "thread"
+COMPRESSION_MAX_WORKERS = min(4, os.cpu_count() or 1)
+COMPRESSION_CACHE_MAX_MB = 128  # Compressed outputs kept in memory, keyed by content hash
+
+# Image Normalisation
+ENABLE_IMAGE_NORMALIZATION = os.environ.get("ENABLE_IMAGE_NORMALIZATION", "true").lower() == "true"
+IMAGE_MAX_LONG_EDGE = 1568  # Pixels; the model downscales larger images itself, after they are uploaded and billed
+IMAGE_GRAYSCALE_MAX_SATURATION = 0.08  # Mean HSV saturation (0-1) at or below which a page is sent as grayscale
+IMAGE_JPEG_QUALITY = 85
+
+# Model Routing
+MODEL_ROUTING = os.environ.get("MODEL_ROUTING", "tiered")  # "tiered" (cheapest model first, escalate) or "fixed" (each agent's pre-routing model)
+ESCALATION_CONFIDENCE_THRESHOLD = 0.6  # Self-reported confidence below this escalates to the next tier
+
+# Telemetry
+ENABLE_EMF_METRICS = os.environ.get("ENABLE_EMF_METRICS", "true").lower() == "true"  # CloudWatch EMF lines per node and Bedrock call
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "POWorkflow")
+
+# Analysis Graph
+PIPELINE_MODE = os.environ.get("PIPELINE_MODE", "fanout")  # "fanout" (one agent per check) or "fused" (one multi-task call)
+FUSED_ANALYSIS_MAX_TOKENS = 4096  # Output budget of the fused call; it answers every section at once
+
+# Cold Start
+COLD_START_IMPORT_BUDGET_MS = float(os.environ.get("COLD_START_IMPORT_BUDGET_MS", "1500"))  # Target for `import main`
+
+def get_processing_config():
+    """
+    Get the current processing configuration as a dictionary.
+    """
+    return {
+        "max_documents_per_batch": MAX_DOCUMENTS_PER_BATCH,
+        "batch_delay_seconds": BATCH_DELAY_SECONDS,
+        "max_concurrent_requests": MAX_CONCURRENT_REQUESTS,
+        "request_timeout_seconds": REQUEST_TIMEOUT_SECONDS,
+        "max_file_size_mb": MAX_FILE_SIZE_MB,
+        "max_total_batch_size_mb": MAX_TOTAL_BATCH_SIZE_MB,
+        "max_retries": MAX_RETRIES,
+        "retry_delay_seconds": RETRY_DELAY_SECONDS,
+        "enable_progress_logging": ENABLE_PROGRESS_LOGGING,
+        "enable_performance_metrics": ENABLE_PERFORMANCE_METRICS,
+        "enable_throttling_protection": ENABLE_THROTTLING_PROTECTION,
+        "throttling_backoff_multiplier": THROTTLING_BACKOFF_MULTIPLIER,
+        "max_backoff_seconds": MAX_BACKOFF_SECONDS,
+        "min_concurrent_requests": MIN_CONCURRENT_REQUESTS,
+        "parse_cache_backend": PARSE_CACHE_BACKEND,
+        "parse_cache_ttl_seconds": PARSE_CACHE_TTL_SECONDS,
+        "parse_cache_max_size_mb": PARSE_CACHE_MAX_SIZE_MB,
+        "s3_max_concurrent_downloads": S3_MAX_CONCURRENT_DOWNLOADS,
+        "max_in_memory_attachments_mb": MAX_IN_MEMORY_ATTACHMENTS_MB,
+        "spill_threshold_mb": SPILL_THRESHOLD_MB,
+        "union_match_top_k": UNION_MATCH_TOP_K,
+        "union_title_resolve_threshold": UNION_TITLE_RESOLVE_THRESHOLD,
+        "union_match_min_candidate_score": UNION_MATCH_MIN_CANDIDATE_SCORE,
+        "enable_union_local_match": ENABLE_UNION_LOCAL_MATCH,
+        "union_local_match_min_title_tokens": UNION_LOCAL_MATCH_MIN_TITLE_TOKENS,
+        "vector_index_dir": VECTOR_INDEX_DIR,
+        "vector_search_top_k": VECTOR_SEARCH_TOP_K,
+        "embedding_max_workers": EMBEDDING_MAX_WORKERS,
+        "vector_store_backend": VECTOR_STORE_BACKEND,
+        "embedding_cache_size": EMBEDDING_CACHE_SIZE,
+        "embedding_cache_backend": EMBEDDING_CACHE_BACKEND,
+        "embedding_cache_max_entries": EMBEDDING_CACHE_MAX_ENTRIES,
+        "compact_prompt_payloads": COMPACT_PROMPT_PAYLOADS,
+        "doc_classifier_min_confidence": DOC_CLASSIFIER_MIN_CONFIDENCE,
+        "doc_classifier_max_pages": DOC_CLASSIFIER_MAX_PAGES,
+        "enable_text_layer": ENABLE_TEXT_LAYER,
+        "text_layer_min_quality": TEXT_LAYER_MIN_QUALITY,
+        "text_layer_min_page_chars": TEXT_LAYER_MIN_PAGE_CHARS,
+        "pdf_page_token_estimate": PDF_PAGE_TOKEN_ESTIMATE,
+        "enable_chunked_parsing": ENABLE_CHUNKED_PARSING,
+        "chunked_parse_min_pages": CHUNKED_PARSE_MIN_PAGES,
+        "parse_chunk_pages": PARSE_CHUNK_PAGES,
+        "parse_chunk_overlap_pages": PARSE_CHUNK_OVERLAP_PAGES,
+        "max_image_size_mb": MAX_IMAGE_SIZE_MB,
+        "compression_executor": COMPRESSION_EXECUTOR,
+        "compression_max_workers": COMPRESSION_MAX_WORKERS,
+        "compression_cache_max_mb": COMPRESSION_CACHE_MAX_MB,
+        "enable_image_normalization": ENABLE_IMAGE_NORMALIZATION,
+        "image_max_long_edge": IMAGE_MAX_LONG_EDGE,
+        "image_grayscale_max_saturation": IMAGE_GRAYSCALE_MAX_SATURATION,
+        "image_jpeg_quality": IMAGE_JPEG_QUALITY,
+        "model_routing": MODEL_ROUTING,
+        "escalation_confidence_threshold": ESCALATION_CONFIDENCE_THRESHOLD,
+        "enable_emf_metrics": ENABLE_EMF_METRICS,
+        "metrics_namespace": METRICS_NAMESPACE,
+        "pipeline_mode": PIPELINE_MODE,
+        "fused_analysis_max_tokens": FUSED_ANALYSIS_MAX_TOKENS,
+        "cold_start_import_budget_ms": COLD_START_IMPORT_BUDGET_MS
+    }
+
+def validate_config():
+    """
+    Validate the configuration values and return any warnings.
+    """
+    warnings = []
+    
+    if MAX_DOCUMENTS_PER_BATCH > 10:
+        warnings.append("MAX_DOCUMENTS_PER_BATCH > 10 may cause throttling issues")
+    
+    if BATCH_DELAY_SECONDS < 0.5:
+        warnings.append("BATCH_DELAY_SECONDS < 0.5 may not provide sufficient throttling protection")
+    
+    if MAX_CONCURRENT_REQUESTS > MAX_DOCUMENTS_PER_BATCH:
+        warnings.append("MAX_CONCURRENT_REQUESTS should not exceed MAX_DOCUMENTS_PER_BATCH")
+
+    if MIN_CONCURRENT_REQUESTS < 1 or MIN_CONCURRENT_REQUESTS > MAX_CONCURRENT_REQUESTS:
+        warnings.append("MIN_CONCURRENT_REQUESTS must be between 1 and MAX_CONCURRENT_REQUESTS")
+
+    if PARSE_CACHE_BACKEND == "s3" and not PARSE_CACHE_S3_BUCKET:
+        warnings.append("PARSE_CACHE_BACKEND is 's3' but PARSE_CACHE_S3_BUCKET is not set; cache disabled")
+
+    if SPILL_THRESHOLD_MB > MAX_IN_MEMORY_ATTACHMENTS_MB:
+        warnings.append("SPILL_THRESHOLD_MB above MAX_IN_MEMORY_ATTACHMENTS_MB has no effect")
+
+    if not 0 < UNION_MATCH_MIN_CANDIDATE_SCORE <= 1 or not 0 < UNION_TITLE_RESOLVE_THRESHOLD <= 1:
+        warnings.append("UNION_MATCH_MIN_CANDIDATE_SCORE and UNION_TITLE_RESOLVE_THRESHOLD must be in (0, 1]")
+
+    if UNION_LOCAL_MATCH_MIN_TITLE_TOKENS < 1:
+        warnings.append("UNION_LOCAL_MATCH_MIN_TITLE_TOKENS must be at least 1")
+
+    if VECTOR_STORE_BACKEND == "opensearch" and not OPENSEARCH_HOST:
+        warnings.append("VECTOR_STORE_BACKEND is 'opensearch' but OPENSEARCH_HOST is not set")
+
+    if EMBEDDING_MAX_WORKERS > MAX_CONCURRENT_REQUESTS:
+        warnings.append("EMBEDDING_MAX_WORKERS above MAX_CONCURRENT_REQUESTS only queues in the governor")
+
+    if not 0.5 < DOC_CLASSIFIER_MIN_CONFIDENCE <= 1:
+        warnings.append("DOC_CLASSIFIER_MIN_CONFIDENCE should be in (0.5, 1]; at 0.5 or below ties are accepted")
+
+    if not 0 < TEXT_LAYER_MIN_QUALITY <= 1:
+        warnings.append("TEXT_LAYER_MIN_QUALITY must be in (0, 1]")
+
+    if not 0 <= PARSE_CHUNK_OVERLAP_PAGES < PARSE_CHUNK_PAGES:
+        warnings.append("PARSE_CHUNK_OVERLAP_PAGES must be at least 0 and below PARSE_CHUNK_PAGES")
+
+    if CHUNKED_PARSE_MIN_PAGES < PARSE_CHUNK_PAGES:
+        warnings.append("CHUNKED_PARSE_MIN_PAGES below PARSE_CHUNK_PAGES produces single-window 'chunked' parses")
+
+    if COMPRESSION_EXECUTOR not in ("process", "thread"):
+        warnings.append(f"Unknown COMPRESSION_EXECUTOR '{COMPRESSION_EXECUTOR}'; compressing on threads")
+
+    if MODEL_ROUTING not in ("tiered", "fixed"):
+        warnings.append(f"Unknown MODEL_ROUTING '{MODEL_ROUTING}'; each agent uses its fixed model")
+
+    if not 0 <= ESCALATION_CONFIDENCE_THRESHOLD <= 1:
+        warnings.append("ESCALATION_CONFIDENCE_THRESHOLD must be between 0 and 1")
+
+    if PIPELINE_MODE not in ("fanout", "fused"):
+        warnings.append(f"Unknown PIPELINE_MODE '{PIPELINE_MODE}'; using the fan-out graph")
+
+    if COLD_START_IMPORT_BUDGET_MS <= 0:
+        warnings.append("COLD_START_IMPORT_BUDGET_MS must be positive")
+    
+    return warnings 
\ No newline at end of file
@@ -25,11 +25,11 @@ import base64
 import boto3
 import asyncio
 import urllib.parse
-from io import BytesIO
-from pathlib import Path
 
-from Graphs.full_pipeline import build_full_pipeline_graph
-from utils import run_json_pipeline_with_stream
+from Graphs.fused_pipeline import get_pipeline_graph
+from utils.pipeline_runner import run_pipeline, LogStepObserver
+from utils.telemetry import JobTelemetry
+from utils.s3_attachment_loader import S3AttachmentLoader
 
 # ------------------------------------------------------------------------------
 # Environment (WeasyPrint / Fontconfig)
@@ -48,11 +48,6 @@ DOCUMENTS_BUCKET = os.environ.get("DOCUMENTS_BUCKET", "077938161517-us-west-2-dx
 RESULTS_BUCKET    = os.environ.get("RESULTS_BUCKET",   "077938161517-us-west-2-dxhub-results-bkt")
 REQUESTS_PREFIX   = os.environ.get("REQUESTS_PREFIX",  "jobs/")  # where job JSONs are dropped
 
-class NamedBytesIO(BytesIO):
-    def __init__(self, data: bytes, name: str):
-        super().__init__(data)
-        self.name = name  # give it a filename for libs that call .name
-
 # ------------------------------------------------------------------------------
 # Helpers
 # ------------------------------------------------------------------------------
@@ -89,18 +84,6 @@ def _guess_media_type(key: str):
     if k.endswith(".csv"):  return "text/csv"
     return "application/octet-stream"
 
-def _s3_uri_to_attachment(uri: str):
-    """Load S3 object and return a Bedrock 'attachment' with base64 'bytes'."""
-    bucket, key = _parse_s3_uri(uri)
-    obj = s3.get_object(Bucket=bucket, Key=key)
-    raw = obj["Body"].read()
-    return NamedBytesIO(raw, Path(key).name)
-    # return {
-    #     "name": uri,
-    #     "mediaType": _guess_media_type(key),
-    #     "source": {"bytes": b64},  # base64 BYTES
-    # }
-
 def _unique_result_key(job_id: str | None, prefix="summaries/", suffix=".pdf"):
     ts = time.strftime("%Y%m%d-%H%M%S")
     jid = job_id or uuid.uuid4().hex[:8]
@@ -121,10 +104,45 @@ def _load_job_from_event(event):
                 return data.get("s3_uris"), data.get("metadata", {}), data.get("job_id"), b, k
     return None, None, None, None, None
 
+# ------------------------------------------------------------------------------
+# Warm start
+# ------------------------------------------------------------------------------
+def warm_up():
+    """
+    Load everything that is reused across invocations: prompt registries, tool
+    specs, reference CSVs and the compiled graph. Safe to call more than once.
+    """
+    from prompt_loader import get_parser_prompt_registry, get_task_prompt_registry
+    from tools import load_tool_spec, build_general_doc_prompt_from_file, TOOL_CONFIG_DIR
+    from utils import get_union_job_table, get_pc_buyer_table, get_union_job_matcher
+    from Agents.pc_llm_mapping import CSV_PATH as PC_CSV_PATH
+
+    started = time.perf_counter()
+    get_parser_prompt_registry()
+    get_task_prompt_registry()
+    build_general_doc_prompt_from_file()
+    for filename in os.listdir(TOOL_CONFIG_DIR):
+        if filename.endswith(".json"):
+            load_tool_spec(filename[:-len(".json")])
+    len(get_union_job_table())
+    get_union_job_matcher()
+    len(get_pc_buyer_table(PC_CSV_PATH))
+    get_pipeline_graph()
+    return {"warm_up_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+# Provisioned concurrency runs module init ahead of traffic, so pay the cost there
+if os.environ.get("AWS_LAMBDA_INITIALIZATION_TYPE") == "provisioned-concurrency":
+    warm_up()
+
 # ------------------------------------------------------------------------------
 # Lambda handler
 # ------------------------------------------------------------------------------
 def handler(event, context):
+    # Scheduled warmers invoke with {"warmup": true}
+    if event.get("warmup"):
+        return {"statusCode": 200, "body": json.dumps(warm_up())}
+
     # 0) Prefer job-file trigger: S3:ObjectCreated on jobs/*.json
     s3_uris, metadata, job_id, job_bucket, job_key = _load_job_from_event(event)
 
@@ -140,27 +158,28 @@ def handler(event, context):
     if not s3_uris:
         return {"statusCode": 400, "body": json.dumps({"error": "No S3 URIs found."})}
 
-    # 2) Build pipeline
-    pipeline = build_full_pipeline_graph()
+    # 2) Compiled once per container (fan-out or fused, per PIPELINE_MODE)
+    pipeline = get_pipeline_graph()
 
-    # 3) Build Bedrock-friendly attachments
+    # 3) Start all S3 downloads concurrently; the parser picks up each
+    #    attachment as soon as its bytes arrive
+    loader = S3AttachmentLoader()
     try:
-        attachments = [_s3_uri_to_attachment(u) for u in s3_uris]
+        attachments = [loader.submit(*_parse_s3_uri(u)) for u in s3_uris]
     except Exception as e:
         return {"statusCode": 500, "body": json.dumps({"error": f"Failed to load S3 objects: {str(e)}"})}
 
-    # 4) Run pipeline (prefer attachments signature; fall back to s3_uris)
-    # try:
-    # try:
-    final_state = asyncio.run(
-        run_json_pipeline_with_stream(attachments, pipeline)
-    )
-    # except TypeError:
-    #     final_state = asyncio.run(
-    #         run_json_pipeline_with_stream(s3_uris, pipeline)
-    #     )
-    # except Exception as e:
-    #     return {"statusCode": 500, "body": json.dumps({"error": f"Pipeline failed: {str(e)}"})}
+    # 4) Run pipeline
+    telemetry = JobTelemetry(job_id)
+    try:
+        final_state = asyncio.run(
+            run_pipeline(attachments, pipeline, observers=[LogStepObserver(job_id)],
+                         telemetry=telemetry)
+        )
+    finally:
+        loader.close()
+    job_telemetry = telemetry.summary()
+    print(json.dumps({"event": "job_telemetry", **job_telemetry}))
 
     # 5) Persist the PDF
     pdf_bytes = (final_state or {}).get("pdf_summary")
@@ -193,5 +212,6 @@ def handler(event, context):
             "result_bucket": RESULTS_BUCKET,
             "result_key": out_key,
             "job_id": job_id,
+            "telemetry": job_telemetry,
         })
     }
@@ -19,4 +19,6 @@ class ModelRegistry:
 
     # Titan
     titan_2 = "amazon.titan-embed-text-v2:0"
-    
\ No newline at end of file
+
+    # Models that accept Converse cachePoint blocks (prompt caching)
+    PROMPT_CACHE_MODELS = {sonnet_3_7, sonnet_4, opus_4, haiku_3_5}
@@ -1,6 +1,6 @@
 import streamlit as st
 import asyncio
-from Graphs.full_pipeline import build_full_pipeline_graph
+from Graphs.full_pipeline import get_full_pipeline_graph
 from utils import run_json_pipeline_with_stream
 
 # ---- CONFIG ----
@@ -17,7 +17,7 @@ uploaded_files = st.file_uploader(
 # ---- ENTRY POINT ----
 if uploaded_files and st.button("Run Full Pipeline"):
     with st.spinner("Running full document pipeline..."):
-        pipeline = build_full_pipeline_graph()
+        pipeline = get_full_pipeline_graph()
         final_state = asyncio.run(run_json_pipeline_with_stream(uploaded_files, pipeline))
 
         pdf_bytes = final_state.get("pdf_summary")
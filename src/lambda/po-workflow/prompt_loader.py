@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 
 PARSER_PROMPTS_DIR = "Parser_Prompts"
 TASK_PROMPTS_DIR = "Task_Prompts"
@@ -12,5 +13,30 @@ def load_prompts_from_dir(path: str) -> dict:
                 prompts[key] = f.read()
     return prompts
 
-PARSER_PROMPT_REGISTRY = load_prompts_from_dir(PARSER_PROMPTS_DIR)
-TASK_PROMPT_REGISTRY = load_prompts_from_dir(TASK_PROMPTS_DIR)
\ No newline at end of file
+# Registries are read from disk once per container, on first use
+@lru_cache(maxsize=None)
+def get_parser_prompt_registry() -> dict:
+    return load_prompts_from_dir(PARSER_PROMPTS_DIR)
+
+@lru_cache(maxsize=None)
+def get_task_prompt_registry() -> dict:
+    return load_prompts_from_dir(TASK_PROMPTS_DIR)
+
+def split_prompt_template(template: str, placeholder: str) -> tuple:
+    """
+    Split a filled-in template at its per-job placeholder. The part before it is
+    identical across jobs and can be sent as a cached prefix; the part after it
+    follows the per-job data.
+    """
+    index = template.find(placeholder)
+    if index == -1:
+        return template, ""
+    return template[:index], template[index + len(placeholder):]
+
+def __getattr__(name):
+    # Keeps `from prompt_loader import PARSER_PROMPT_REGISTRY` working with lazy loading
+    if name == "PARSER_PROMPT_REGISTRY":
+        return get_parser_prompt_registry()
+    if name == "TASK_PROMPT_REGISTRY":
+        return get_task_prompt_registry()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
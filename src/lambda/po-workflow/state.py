@@ -1,9 +1,8 @@
 
 from typing import TypedDict, List, Dict, Any
-from streamlit.runtime.uploaded_file_manager import UploadedFile
 
 class PipelineState(TypedDict, total=False):
-    uploaded_files: List[UploadedFile]
+    uploaded_files: List[Any]  # UploadedFile, NamedBytesIO, SpilledFile or PendingAttachment
     parsed_data: Dict[str, Any]
     checklist_result: Any
     validation_result: Any
@@ -12,4 +11,6 @@ class PipelineState(TypedDict, total=False):
     phi_agreement: Any
     pc_mapping: Any
     data_security: Any
+    goods_services: Any
+    fused_analysis: Any
     pdf_summary: bytes
\ No newline at end of file
@@ -2,6 +2,7 @@ from prompt_loader import PARSER_PROMPT_REGISTRY, TASK_PROMPT_REGISTRY
 import json
 from typing import List
 import os
+from functools import lru_cache
 from utils import get_uc_cost
 
 TOOL_CONFIG_DIR = "Tools_Config"
@@ -32,22 +33,27 @@ def run_tool_by_name(tool_name: str, input_data: dict) -> dict:
     return TOOL_REGISTRY[tool_name](input_data)
 
 
+@lru_cache(maxsize=None)
+def load_tool_spec(name: str) -> dict:
+    path = os.path.join(TOOL_CONFIG_DIR, f"{name}.json")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Tool config not found: {path}")
+    with open(path) as f:
+        return json.load(f)
+
+
 def get_tool_config(selected_tool_names: List[str]) -> dict:
     tools = []
 
     for name in selected_tool_names:
-        path = os.path.join(TOOL_CONFIG_DIR, f"{name}.json")
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"Tool config not found: {path}")
-        with open(path) as f:
-            spec = json.load(f)
-            tools.append({"toolSpec": spec})
+        tools.append({"toolSpec": load_tool_spec(name)})
 
     return {
         "tools": tools
     }
 
 
+@lru_cache(maxsize=None)
 def build_general_doc_prompt_from_file(template_path="Task_Prompts/Parser.txt"):
     with open(template_path, "r") as f:
         template = f.read()
@@ -1,45 +1,103 @@
-# JSON parsing, file name cleaning
-from .file_format_utils import try_parse_json_like, clean_file_name, sanitize_doc_name, parse_pdf_form_fields
-
-# Bedrock interaction helpers
-from .bedrock_utils import (
-    create_doc_messages,
-    query_bedrock_with_multiple_files,
-    query_bedrock_with_multiple_files_with_tools,
-    handle_bedrock_tool_use,
-    build_pdf_based_message,
-)
-
-from .embedding_utils import (
-    load_texts_for_embedding,
-    embed_texts_to_jsonl,
-)
-
-from .filtering_utils import get_unique_purchasing_categories
-
-# from .vector_utils import (
-#     load_embeddings,
-#     build_faiss_index,
-#     search_faiss,
-#     embed_input,
-#     vector_search,
-# )
-# UI render utilities
-from .render_utils import (
-    render_json_checklist,
-    render_json_output,
-    render_key_fields,
-    render_parsed_documents,
-)
-
-# Union job-specific helpers
-from .union_job_utils import (
-    load_union_job_data,
-    TITLE_COLUMN,
-    COST_COLUMN,
-    get_uc_cost
-)
-
-from .langgraph_streaming_utils import run_json_pipeline_with_stream
-
-from .file_compression_utils import compress_file_if_needed, get_file_size_mb, MAX_CHUNK_SIZE_MB
\ No newline at end of file
+"""
+Helpers are resolved on first access (PEP 562), so `from utils import x` only
+imports the submodule that defines x. Keeps pandas, PyPDF2, PIL and streamlit
+off the Lambda cold-start path until a node actually needs them.
+"""
+import importlib
+
+_EXPORTS = {
+    # JSON parsing, file name cleaning
+    "try_parse_json_like": "file_format_utils",
+    "clean_file_name": "file_format_utils",
+    "sanitize_doc_name": "file_format_utils",
+    "parse_pdf_form_fields": "file_format_utils",
+
+    # Bedrock interaction helpers
+    "create_doc_messages": "bedrock_utils",
+    "converse": "bedrock_utils",
+    "aconverse": "bedrock_utils",
+    "get_response_text": "bedrock_utils",
+    "supports_prompt_cache": "bedrock_utils",
+    "summarize_usage": "bedrock_utils",
+    "log_token_usage": "bedrock_utils",
+    "query_bedrock_with_multiple_files": "bedrock_utils",
+    "aquery_bedrock_with_multiple_files": "bedrock_utils",
+    "query_bedrock_with_multiple_files_with_tools": "bedrock_utils",
+    "aquery_bedrock_with_multiple_files_with_tools": "bedrock_utils",
+    "handle_bedrock_tool_use": "bedrock_utils",
+    "ahandle_bedrock_tool_use": "bedrock_utils",
+    "build_pdf_based_message": "bedrock_utils",
+    "invoke_model": "bedrock_utils",
+
+    "load_texts_for_embedding": "embedding_utils",
+    "build_embedding_index": "embedding_utils",
+    "embed_text": "embedding_utils",
+    "invoke_embedding": "embedding_utils",
+    "get_embedding_cache": "embedding_cache",
+    "embedding_cache_stats": "embedding_cache",
+    "build_pc_vector_index": "embedding_utils",
+
+    # Prebuilt vector index (numpy)
+    "get_vector_index": "vector_index",
+    "write_vector_index": "vector_index",
+    "vector_search": "vector_utils",
+    "get_vector_store": "vector_store",
+    "search_similar_description": "embedding_utils_opensearch",
+    "embed_input": "vector_utils",
+
+    "get_unique_purchasing_categories": "filtering_utils",
+    "get_buyer_rows_for_categories": "filtering_utils",
+    "get_pc_buyer_table": "filtering_utils",
+
+    # Cheapest-model-first routing with escalation
+    "routed_call": "model_router",
+    "model_routing_stats": "model_router",
+
+    # Per-task parsed_data projections for prompts
+    "build_prompt_payload": "prompt_payload",
+
+    # CSV reference tables
+    "ReferenceTable": "reference_data",
+    "get_reference_table": "reference_data",
+
+    # UI render utilities (streamlit)
+    "render_json_checklist": "render_utils",
+    "render_json_output": "render_utils",
+    "render_key_fields": "render_utils",
+    "render_parsed_documents": "render_utils",
+
+    # Union job-specific helpers
+    "load_union_job_data": "union_job_utils",
+    "get_union_job_table": "union_job_utils",
+    "TITLE_COLUMN": "union_job_utils",
+    "COST_COLUMN": "union_job_utils",
+    "get_uc_cost": "union_job_utils",
+    "get_union_job_matcher": "union_job_matcher",
+
+    # Pipeline runners; the streamlit one is only for pages/
+    "run_pipeline": "pipeline_runner",
+    "PipelineObserver": "pipeline_runner",
+    "LogStepObserver": "pipeline_runner",
+    "run_json_pipeline_with_stream": "langgraph_streaming_utils",
+    "StreamlitStepObserver": "langgraph_streaming_utils",
+
+    "compress_file_if_needed": "file_compression_utils",
+    "get_file_size_mb": "file_compression_utils",
+    "MAX_CHUNK_SIZE_MB": "file_compression_utils",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{module_name}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,244 @@
+import random
+import asyncio
+import functools
+import threading
+import time
+from collections import deque
+from botocore.exceptions import (
+    ClientError,
+    ReadTimeoutError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ConnectionClosedError
+)
+from config.processing_limits import (
+    MAX_CONCURRENT_REQUESTS,
+    MIN_CONCURRENT_REQUESTS,
+    MAX_RETRIES,
+    RETRY_DELAY_SECONDS,
+    THROTTLING_BACKOFF_MULTIPLIER,
+    MAX_BACKOFF_SECONDS,
+    ENABLE_THROTTLING_PROTECTION,
+    ENABLE_PROGRESS_LOGGING
+)
+
+THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+}
+
+
+# Retried like throttles (botocore makes a single attempt) but without shrinking the limit
+TRANSIENT_ERROR_CODES = {
+    "InternalServerException",
+    "ModelTimeoutException",
+    "ServiceException",
+    "RequestTimeout",
+    "RequestTimeoutException",
+}
+TRANSIENT_EXCEPTIONS = (ReadTimeoutError, ConnectTimeoutError, EndpointConnectionError, ConnectionClosedError)
+
+
+def is_throttling_error(error) -> bool:
+    if not isinstance(error, ClientError):
+        return False
+    return error.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+
+def is_transient_error(error) -> bool:
+    if isinstance(error, TRANSIENT_EXCEPTIONS):
+        return True
+    if not isinstance(error, ClientError):
+        return False
+    return error.response.get("Error", {}).get("Code") in TRANSIENT_ERROR_CODES
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff capped at MAX_BACKOFF_SECONDS, with equal jitter."""
+    cap = min(MAX_BACKOFF_SECONDS,
+              RETRY_DELAY_SECONDS * (THROTTLING_BACKOFF_MULTIPLIER ** attempt))
+    return cap / 2 + random.uniform(0, cap / 2)
+
+
+class BedrockGovernor:
+    """
+    Adaptive concurrency limit for one Bedrock model (AIMD).
+
+    Every success grows the limit by 1/limit (about +1 per full window of
+    requests) up to MAX_CONCURRENT_REQUESTS; every throttle divides it by
+    THROTTLING_BACKOFF_MULTIPLIER down to MIN_CONCURRENT_REQUESTS. Callers wait
+    while the model already has `limit` requests in flight: threads in acquire(),
+    coroutines in aacquire(), so waiting never occupies an executor thread.
+    """
+
+    def __init__(self, model_id: str,
+                 max_limit: int = MAX_CONCURRENT_REQUESTS,
+                 min_limit: int = MIN_CONCURRENT_REQUESTS):
+        self.model_id = model_id
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.throttle_count = 0
+        self._cond = threading.Condition()
+        self._async_waiters = deque()  # (loop, future) of coroutines waiting for a slot
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def _wake_async_waiters(self):
+        # Called with the condition held; each woken coroutine re-checks the limit
+        while self._async_waiters:
+            loop, waiter = self._async_waiters.popleft()
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_resolve, waiter)
+
+    def release(self, throttled: bool = False, succeeded: bool = True):
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.throttle_count += 1
+                self.limit = max(float(self.min_limit),
+                                 self.limit / THROTTLING_BACKOFF_MULTIPLIER)
+            elif succeeded:
+                self.limit = min(float(self.max_limit),
+                                 self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+            self._wake_async_waiters()
+
+    def _check_retry(self, error, attempt: int):
+        """Re-raise errors that are not retried, or when the attempts are used up."""
+        if not is_throttling_error(error) and not is_transient_error(error):
+            raise error
+        if attempt >= MAX_RETRIES:
+            if ENABLE_PROGRESS_LOGGING:
+                print(f"❌ {self.model_id} still failing after {MAX_RETRIES + 1} attempts: {error}")
+            raise error
+
+    def _retry_delay(self, error, attempt: int) -> float:
+        delay = backoff_delay(attempt)
+        if ENABLE_PROGRESS_LOGGING:
+            reason = "Throttled" if is_throttling_error(error) else (
+                error.response.get("Error", {}).get("Code") if isinstance(error, ClientError)
+                else type(error).__name__)
+            print(f"⚠️  {reason} on {self.model_id}, retrying in {delay:.2f}s "
+                  f"(attempt {attempt + 1}/{MAX_RETRIES + 1}, limit now {int(self.limit)})")
+        return delay
+
+    def call(self, fn, *args, stats=None, **kwargs):
+        """
+        Run fn under the concurrency limit, retrying throttles and transient
+        errors (5xx, timeouts, dropped connections) with jittered backoff; only
+        throttles shrink the limit. If `stats` is given it is filled with
+        queue_ms (time spent waiting for a slot), attempts and throttles.
+        """
+        stats = stats if stats is not None else {}
+        stats.update(queue_ms=0.0, attempts=0, throttles=0)
+        for attempt in range(MAX_RETRIES + 1):
+            waited = time.perf_counter()
+            self.acquire()
+            stats["queue_ms"] += (time.perf_counter() - waited) * 1000
+            stats["attempts"] += 1
+            throttled = False
+            succeeded = False
+            try:
+                result = fn(*args, **kwargs)
+                succeeded = True
+                return result
+            except Exception as e:
+                throttled = is_throttling_error(e)
+                stats["throttles"] += int(throttled)
+                error = e
+                self._check_retry(e, attempt)
+            finally:
+                self.release(throttled=throttled, succeeded=succeeded)
+            time.sleep(self._retry_delay(error, attempt))
+
+    async def acall(self, executor, fn, *args, stats=None, **kwargs):
+        """
+        call() for coroutines: the slot is awaited and the backoff slept on the
+        event loop, and only fn itself runs on `executor`, so a throttled model
+        cannot tie up the executor threads other models need.
+        """
+        loop = asyncio.get_running_loop()
+        stats = stats if stats is not None else {}
+        stats.update(queue_ms=0.0, attempts=0, throttles=0)
+        for attempt in range(MAX_RETRIES + 1):
+            waited = time.perf_counter()
+            await self.aacquire()
+            stats["queue_ms"] += (time.perf_counter() - waited) * 1000
+            stats["attempts"] += 1
+            throttled = False
+            succeeded = False
+            try:
+                result = await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+                succeeded = True
+                return result
+            except Exception as e:
+                throttled = is_throttling_error(e)
+                stats["throttles"] += int(throttled)
+                error = e
+                self._check_retry(e, attempt)
+            finally:
+                self.release(throttled=throttled, succeeded=succeeded)
+            await asyncio.sleep(self._retry_delay(error, attempt))
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "model_id": self.model_id,
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "throttle_count": self.throttle_count,
+            }
+
+
+def _resolve(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_governors = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(model_id: str) -> BedrockGovernor:
+    with _governors_lock:
+        governor = _governors.get(model_id)
+        if governor is None:
+            governor = BedrockGovernor(model_id)
+            _governors[model_id] = governor
+        return governor
+
+
+def governed_call(model_id: str, fn, *args, stats=None, **kwargs):
+    if not ENABLE_THROTTLING_PROTECTION:
+        if stats is not None:
+            stats.update(queue_ms=0.0, attempts=1, throttles=0)
+        return fn(*args, **kwargs)
+    return get_governor(model_id).call(fn, *args, stats=stats, **kwargs)
+
+
+async def agoverned_call(model_id: str, executor, fn, *args, stats=None, **kwargs):
+    loop = asyncio.get_running_loop()
+    if not ENABLE_THROTTLING_PROTECTION:
+        if stats is not None:
+            stats.update(queue_ms=0.0, attempts=1, throttles=0)
+        return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+    return await get_governor(model_id).acall(executor, fn, *args, stats=stats, **kwargs)
@@ -1,13 +1,44 @@
 from model_registry import ModelRegistry
 from utils import clean_file_name
+import os
+import json
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import boto3
+from botocore.config import Config
 from utils import parse_pdf_form_fields, sanitize_doc_name
 from utils.s3_uri_utils import create_doc_messages_s3_uri
+from utils.bedrock_governor import governed_call, agoverned_call
+from utils.telemetry import record_bedrock_call
+from config.processing_limits import ENABLE_THROTTLING_PROTECTION
 
-bedrock = boto3.client(service_name='bedrock-runtime')
+# boto3 clients are thread-safe; the connection pool is sized to the executor so
+# every in-flight converse call gets its own HTTP connection.
+BEDROCK_MAX_WORKERS = int(os.environ.get("BEDROCK_MAX_WORKERS", "16"))
 
+# Retries (throttles and transient errors) are owned by the governor, so botocore makes a single attempt
+BEDROCK_CLIENT_CONFIG = Config(
+    max_pool_connections=BEDROCK_MAX_WORKERS,
+    retries={"mode": "standard", "total_max_attempts": 1} if ENABLE_THROTTLING_PROTECTION else None
+)
+bedrock = boto3.client(service_name='bedrock-runtime', config=BEDROCK_CLIENT_CONFIG)
 
-def create_doc_messages(prompt, files):
+_bedrock_executor = ThreadPoolExecutor(
+    max_workers=BEDROCK_MAX_WORKERS, thread_name_prefix="bedrock")
+
+
+def supports_prompt_cache(model_id) -> bool:
+    return model_id in ModelRegistry.PROMPT_CACHE_MODELS
+
+
+def create_doc_messages(prompt, files, cache_prefix=None, model_id=None):
+    """
+    Build the user message. When `cache_prefix` is given (the static instructions
+    and reference lists of a task prompt) it is placed first and, on models that
+    support it, closed with a cachePoint so Bedrock reuses it across jobs; the
+    per-job `prompt` follows the attached files.
+    """
     content = [{"text": prompt}]
 
     def get_file_format(filename):
@@ -56,13 +87,99 @@ def create_doc_messages(prompt, files):
                 }
             })
 
+    if cache_prefix:
+        prefix_blocks = [{"text": cache_prefix}]
+        if supports_prompt_cache(model_id):
+            prefix_blocks.append({"cachePoint": {"type": "default"}})
+        content = prefix_blocks + content
+
     return [{"role": "user", "content": content}]
 
 
+# --- Bedrock invocation layer ---
+def _timed_call(operation, fn, **kwargs):
+    # Wall time, governor queueing/retries and token usage go to the job's telemetry
+    stats = {}
+    started = time.perf_counter()
+    try:
+        response = governed_call(kwargs["modelId"], fn, stats=stats, **kwargs)
+    except Exception as e:
+        record_bedrock_call(operation, kwargs["modelId"],
+                            (time.perf_counter() - started) * 1000, stats, error=e)
+        raise
+    record_bedrock_call(operation, kwargs["modelId"],
+                        (time.perf_counter() - started) * 1000, stats, response=response)
+    return response
+
+
+def converse(**kwargs):
+    """
+    Single choke point for every Bedrock converse call in the pipeline. Calls are
+    admitted by the per-model governor, which bounds concurrency and retries throttles.
+    """
+    return _timed_call("converse", bedrock.converse, **kwargs)
+
+
+def invoke_model(client=None, **kwargs):
+    """
+    invoke_model (embeddings) through the per-model governor and telemetry, on
+    the shared client or a region-specific one built with BEDROCK_CLIENT_CONFIG.
+    """
+    return _timed_call("invoke_model", (client or bedrock).invoke_model, **kwargs)
+
+
+async def aconverse(**kwargs):
+    """
+    Non-blocking converse: the governor slot and any backoff are awaited on the
+    event loop and only the boto3 call runs on the shared Bedrock executor, so
+    the parallel LangGraph branches overlap their network waits.
+    """
+    stats = {}
+    started = time.perf_counter()
+    try:
+        response = await agoverned_call(
+            kwargs["modelId"], _bedrock_executor, bedrock.converse, stats=stats, **kwargs)
+    except Exception as e:
+        record_bedrock_call("converse", kwargs["modelId"],
+                            (time.perf_counter() - started) * 1000, stats, error=e)
+        raise
+    # Recorded from the calling task, so the telemetry job/node context is intact
+    record_bedrock_call("converse", kwargs["modelId"],
+                        (time.perf_counter() - started) * 1000, stats, response=response)
+    return response
+
+
+def get_response_text(response):
+    content = response['output']['message']['content']
+    return "".join([c['text'] for c in content if 'text' in c])
+
+
+def summarize_usage(*responses) -> dict:
+    """Input tokens split into uncached, cache-read and cache-write, summed over responses."""
+    summary = {
+        "input_tokens": 0,
+        "cache_read_input_tokens": 0,
+        "cache_write_input_tokens": 0,
+        "output_tokens": 0,
+    }
+    for response in responses:
+        usage = response.get("usage") or {}
+        summary["input_tokens"] += usage.get("inputTokens", 0)
+        summary["cache_read_input_tokens"] += usage.get("cacheReadInputTokens", 0)
+        summary["cache_write_input_tokens"] += usage.get("cacheWriteInputTokens", 0)
+        summary["output_tokens"] += usage.get("outputTokens", 0)
+    return summary
+
+
+def log_token_usage(agent, model_id, *responses) -> dict:
+    summary = summarize_usage(*responses)
+    print(json.dumps({"event": "bedrock_usage", "agent": agent, "model_id": model_id, **summary}))
+    return summary
+
 
 def query_bedrock_with_multiple_files(prompt, files, model_id=ModelRegistry.sonnet_3):
     messages = create_doc_messages(prompt, files)
-    response = bedrock.converse(
+    response = converse(
         modelId=model_id,
         messages=messages,
         inferenceConfig={
@@ -70,15 +187,30 @@ def query_bedrock_with_multiple_files(prompt, files, model_id=ModelRegistry.sonn
             "topP": 0
         }
     )
-    content = response['output']['message']['content']
-    return "".join([c['text'] for c in content if 'text' in c])
+    return get_response_text(response)
+
+
+async def aquery_bedrock_with_multiple_files(prompt, files, model_id=ModelRegistry.sonnet_3,
+                                             cache_prefix=None, agent=None):
+    messages = create_doc_messages(prompt, files, cache_prefix, model_id)
+    response = await aconverse(
+        modelId=model_id,
+        messages=messages,
+        inferenceConfig={
+            "temperature": 0,
+            "topP": 0
+        }
+    )
+    if agent:
+        log_token_usage(agent, model_id, response)
+    return get_response_text(response)
 
 
 def query_bedrock_with_multiple_files_with_tools(prompt, files, model_id, tool_config):
     messages = create_doc_messages(prompt, files)
 
     # Step 1: Send the initial message
-    response = bedrock.converse(
+    response = converse(
         modelId=model_id,
         messages=messages,
         inferenceConfig={"temperature": 0},
@@ -96,7 +228,37 @@ def query_bedrock_with_multiple_files_with_tools(prompt, files, model_id, tool_c
     return handle_bedrock_tool_use(messages, tool_use, model_id, tool_config)
 
 
-def handle_bedrock_tool_use(messages, tool_use, model_id, tool_config):
+async def aquery_bedrock_with_multiple_files_with_tools(prompt, files, model_id, tool_config,
+                                                        cache_prefix=None, agent=None):
+    messages = create_doc_messages(prompt, files, cache_prefix, model_id)
+
+    # Step 1: Send the initial message
+    response = await aconverse(
+        modelId=model_id,
+        messages=messages,
+        inferenceConfig={"temperature": 0},
+        toolConfig=tool_config,
+    )
+    bedrock_message = response["output"]["message"]
+    messages.append(bedrock_message)
+
+    content = bedrock_message["content"]
+    tool_use = next((c["toolUse"] for c in content if "toolUse" in c), None)
+
+    if not tool_use:
+        if agent:
+            log_token_usage(agent, model_id, response)
+        return "".join([c["text"] for c in content if "text" in c])
+
+    # The follow-up resends the whole thread, so a cached prefix is read again here
+    followup = await ahandle_bedrock_tool_use(
+        messages, tool_use, model_id, tool_config, return_response=True)
+    if agent:
+        log_token_usage(agent, model_id, response, followup)
+    return followup["output"]["message"]["content"][0].get("text", "<no text>")
+
+
+def build_tool_result_message(tool_use):
     # Step 2: Run the tool locally
     from tools import run_tool_by_name
     result_data = run_tool_by_name(tool_use["name"], tool_use["input"])
@@ -110,7 +272,7 @@ def handle_bedrock_tool_use(messages, tool_use, model_id, tool_config):
         raise TypeError("Tool output must be a str or dict")
 
     # Step 3: Respond with toolResult
-    tool_result_message = {
+    return {
         "role": "user",
         "content": [{
             "toolResult": {
@@ -121,16 +283,36 @@ def handle_bedrock_tool_use(messages, tool_use, model_id, tool_config):
         }]
     }
 
+
+def handle_bedrock_tool_use(messages, tool_use, model_id, tool_config):
+    messages.append(build_tool_result_message(tool_use))
+
+    # Step 4: Send the updated full message thread
+    followup = converse(
+        modelId=model_id,
+        messages=messages,
+        inferenceConfig={"temperature": 0},
+        toolConfig=tool_config
+    )
+
+    return followup["output"]["message"]["content"][0].get("text", "<no text>")
+
+
+async def ahandle_bedrock_tool_use(messages, tool_use, model_id, tool_config, return_response=False):
+    # Tools read local reference data, keep that off the event loop as well
+    tool_result_message = await asyncio.to_thread(build_tool_result_message, tool_use)
     messages.append(tool_result_message)
 
     # Step 4: Send the updated full message thread
-    followup = bedrock.converse(
+    followup = await aconverse(
         modelId=model_id,
         messages=messages,
         inferenceConfig={"temperature": 0},
         toolConfig=tool_config
     )
 
+    if return_response:
+        return followup
     return followup["output"]["message"]["content"][0].get("text", "<no text>")
 
 
@@ -159,4 +341,4 @@ def build_pdf_based_message(model_id, input_text, input_files):
     message = {"role": "user", "content": content_blocks}
     messages = [message]
 
-    return bedrock.converse(modelId=model_id, messages=messages)
+    return converse(modelId=model_id, messages=messages)
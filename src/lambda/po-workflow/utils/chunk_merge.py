@@ -0,0 +1,117 @@
+import re
+
+# Values the parser writes when a field is not on the pages it was shown
+EMPTY_MARKERS = {"", "n/a", "na", "none", "null", "not found", "not provided", "not specified",
+                 "unknown", "not available", "not applicable", "-"}
+
+
+def page_windows(total_pages: int, size: int, overlap: int = 0) -> list:
+    """[(start, end), ...] zero-based, end exclusive, each `size` pages sharing `overlap` with the previous."""
+    step = max(1, size - overlap)
+    windows, start = [], 0
+    while start < total_pages:
+        end = min(total_pages, start + size)
+        windows.append((start, end))
+        if end == total_pages:
+            break
+        start += step
+    return windows
+
+
+def is_empty(value) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return value.strip().lower() in EMPTY_MARKERS
+    if isinstance(value, (list, dict)):
+        return not value
+    return False
+
+
+def _normalize(value) -> str:
+    return re.sub(r"\s+", " ", str(value)).strip().lower()
+
+
+def merge_values(values: list):
+    """
+    One value for a field seen in several chunks (in page order). Lists are
+    concatenated without duplicates (line items run across pages), dicts are
+    merged key by key, and differing scalars go to the most common value, ties
+    to the earliest page, where headers and identifiers normally sit.
+    Returns (value, conflicting_values).
+    """
+    values = [v for v in values if not is_empty(v)]
+    if not values:
+        return None, []
+
+    if all(isinstance(v, list) for v in values):
+        merged, seen = [], set()
+        for item in (item for v in values for item in v):
+            key = _normalize(item)
+            if key not in seen:
+                seen.add(key)
+                merged.append(item)
+        return merged, []
+
+    if all(isinstance(v, dict) for v in values):
+        merged, conflicts = merge_fields(values)
+        return merged, [conflicts] if conflicts else []
+
+    votes = {}
+    for index, value in enumerate(values):
+        key = _normalize(value)
+        count, first, original = votes.get(key, (0, index, value))
+        votes[key] = (count + 1, first, original)
+    ranked = sorted(votes.values(), key=lambda vote: (-vote[0], vote[1]))
+    return ranked[0][2], [vote[2] for vote in ranked] if len(ranked) > 1 else []
+
+
+def merge_fields(chunks: list):
+    """Merge per-chunk parsed_data dicts field by field; returns (parsed_data, {field: conflicting values})."""
+    fields = []
+    for chunk in chunks:
+        fields.extend(name for name in chunk if name not in fields)
+
+    merged, conflicts = {}, {}
+    for name in fields:
+        value, conflicting = merge_values([chunk.get(name) for chunk in chunks])
+        merged[name] = value
+        if conflicting:
+            conflicts[name] = conflicting[0] if len(conflicting) == 1 and isinstance(conflicting[0], dict) \
+                else conflicting
+    return merged, conflicts
+
+
+def merge_chunk_results(doc_type: str, results: list, windows: list) -> dict:
+    """
+    Combine the parse results of a document's page windows into one parsed_data
+    entry. Windows that failed, or that the parser assigned another doc type
+    (an appendix in a different format), are listed but not merged.
+    """
+    parsed, merged_pages, skipped = [], [], []
+    for result, (start, end) in zip(results, windows):
+        body = (result or {}).get("result") or {}
+        pages = f"{start + 1}-{end}"
+        if (body.get("doc_type") or "").upper() == doc_type and isinstance(body.get("parsed_data"), dict):
+            parsed.append(body["parsed_data"])
+            merged_pages.append(pages)
+        else:
+            skipped.append(pages)
+
+    if not parsed:
+        return {
+            "result": None,
+            "error": f"❌ Failed to parse any of {len(windows)} page windows.",
+            "chunks": {"windows": len(windows), "skipped_pages": skipped},
+        }
+
+    parsed_data, conflicts = merge_fields(parsed)
+    return {
+        "result": {"doc_type": doc_type, "parsed_data": parsed_data},
+        "chunks": {
+            "windows": len(windows),
+            "merged_pages": merged_pages,
+            "skipped_pages": skipped,
+            "conflicts": conflicts,
+        },
+    }
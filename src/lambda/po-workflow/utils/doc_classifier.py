@@ -0,0 +1,102 @@
+import re
+from dataclasses import dataclass, field
+from utils.pdf_text import extract_pdf_pages, is_pdf
+from config.processing_limits import DOC_CLASSIFIER_MIN_CONFIDENCE, DOC_CLASSIFIER_MAX_PAGES
+
+# Keys match the Parser_Prompts registry (file names, upper-cased)
+FILENAME_PATTERNS = {
+    "PO": r"(^|[^a-z])(po|p\.o)([^a-z]|$)|purchase[\s_-]*order",
+    "INVOICE": r"invoice|(^|[^a-z])inv[\s_-]*\d",
+    "SOW": r"(^|[^a-z])sow([^a-z]|$)|statement[\s_-]*of[\s_-]*work",
+    "SSPR": r"sspr|source[\s_-]*selection|price[\s_-]*reasonableness",
+    "CONFLICT OF INTEREST(EVRD)": r"evrd|conflict[\s_-]*of[\s_-]*interest|(^|[^a-z])coi([^a-z]|$)",
+}
+
+# Phrases in the text layer / form fields, with how strongly each points at the type
+KEYWORDS = {
+    "PO": {"purchase order": 3, "po number": 2, "po #": 2, "p.o. number": 2, "ship to": 1,
+           "order date": 1, "deliver to": 1},
+    "INVOICE": {"invoice": 3, "invoice number": 2, "invoice date": 2, "amount due": 2,
+                "bill to": 2, "remit to": 2, "due date": 1},
+    "SOW": {"statement of work": 3, "scope of work": 2, "deliverables": 2, "period of performance": 2,
+            "milestones": 1},
+    "SSPR": {"source selection": 3, "price reasonableness": 3, "sspr": 3, "sole source": 2,
+             "funding source": 1},
+    "CONFLICT OF INTEREST(EVRD)": {"conflict of interest": 3, "evrd": 3, "independent contractor": 2,
+                                   "uc employee": 2, "employee vs": 2},
+}
+
+FILENAME_WEIGHT = 4
+MIN_SCORE = 4  # Below this nothing is known about the document, however lopsided the scores
+# A file name alone ("PO_1234_vendor_quote.pdf") never skips the LLM's own classification
+FILENAME_ONLY_MAX_CONFIDENCE = 0.5
+
+
+@dataclass
+class DocTypeGuess:
+    doc_type: str
+    confidence: float
+    scores: dict = field(default_factory=dict)
+    signals: list = field(default_factory=list)
+    text_evidence: bool = False  # Keywords for doc_type were found in the text layer / form fields
+
+    @property
+    def is_confident(self) -> bool:
+        return bool(self.doc_type) and self.text_evidence and self.confidence >= DOC_CLASSIFIER_MIN_CONFIDENCE
+
+
+def _form_field_text(file_bytes: bytes) -> str:
+    from utils.file_format_utils import parse_pdf_form_fields
+
+    fields = parse_pdf_form_fields(file_bytes)
+    if not fields or "error" in fields:
+        return ""
+    return " ".join(f"{name} {value or ''}" for name, value in fields.items())
+
+
+def score_document(file_name: str, text: str, doc_types=None) -> DocTypeGuess:
+    """Score every known type from the file name and text; confidence is the top score's share."""
+    name = (file_name or "").lower()
+    text = " ".join((text or "").lower().split())
+    doc_types = doc_types or list(FILENAME_PATTERNS)
+
+    scores, text_scores, signals = {}, {}, []
+    for doc_type in doc_types:
+        score = text_score = 0
+        if re.search(FILENAME_PATTERNS.get(doc_type, r"$^"), name):
+            score += FILENAME_WEIGHT
+            signals.append(f"{doc_type}: file name")
+        for keyword, weight in KEYWORDS.get(doc_type, {}).items():
+            if keyword in text:
+                text_score += weight
+                signals.append(f"{doc_type}: '{keyword}'")
+        scores[doc_type] = score + text_score
+        text_scores[doc_type] = text_score
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    best_type, best = ranked[0] if ranked else (None, 0)
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0
+    if best < MIN_SCORE:
+        return DocTypeGuess(None, 0.0, scores, signals)
+    confidence = best / (best + runner_up)
+    text_evidence = text_scores[best_type] > 0
+    if not text_evidence:
+        confidence = min(confidence, FILENAME_ONLY_MAX_CONFIDENCE)
+    return DocTypeGuess(best_type, confidence, scores, signals, text_evidence)
+
+
+def classify_document(file_name: str, file_bytes: bytes, doc_types=None, text_layer=None) -> DocTypeGuess:
+    """
+    Guess the Parser_Prompts type of an attachment locally from its file name,
+    the text layer of its first pages and its form field names/values. CPU-bound
+    for PDFs; run it off the event loop. An already extracted `text_layer` is reused.
+    """
+    if text_layer is not None:
+        fields = " ".join(f"{name} {value or ''}" for name, value in text_layer.form_fields.items())
+        text = " ".join(text_layer.pages[:DOC_CLASSIFIER_MAX_PAGES]) + " " + fields
+        return score_document(file_name, text, doc_types)
+
+    text = " ".join(extract_pdf_pages(file_bytes, max_pages=DOC_CLASSIFIER_MAX_PAGES))
+    if is_pdf(file_bytes):
+        text += " " + _form_field_text(file_bytes)
+    return score_document(file_name, text, doc_types)
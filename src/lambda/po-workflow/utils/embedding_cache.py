@@ -0,0 +1,156 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from config.processing_limits import (
+    EMBEDDING_CACHE_SIZE,
+    EMBEDDING_CACHE_BACKEND,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_MAX_ENTRIES
+)
+
+TRIM_EVERY_PUTS = 100
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", str(text)).split())
+
+
+def embedding_cache_key(model_id: str, text: str) -> str:
+    return hashlib.sha256(f"{model_id}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class SQLiteEmbeddingStore:
+    """On-disk tier: vectors as float32 blobs, trimmed least-recently-used first."""
+
+    def __init__(self, path=EMBEDDING_CACHE_PATH, max_entries=EMBEDDING_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model_id TEXT NOT NULL, vector BLOB NOT NULL, "
+            "accessed REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE embeddings SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        vector = array("f")
+        vector.frombytes(row[0])
+        return vector.tolist()
+
+    def put(self, key: str, model_id: str, vector):
+        blob = array("f", vector).tobytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, model_id, vector, accessed) "
+                "VALUES (?, ?, ?, ?)", (key, model_id, blob, time.time()))
+            self._puts += 1
+            if self._puts % TRIM_EVERY_PUTS == 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings "
+                    "ORDER BY accessed DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+            self._conn.commit()
+
+
+class EmbeddingCache:
+    """
+    Query-time embedding cache keyed by (model id, normalized text): an in-memory
+    LRU in front of an optional on-disk store that survives warm invocations.
+    """
+
+    def __init__(self, max_size=EMBEDDING_CACHE_SIZE, store=None):
+        self.max_size = max_size
+        self.store = store
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+
+    def get_or_compute(self, text: str, model_id: str, embed_fn):
+        """Return the embedding of `text`, calling embed_fn(text) only on a miss."""
+        key = embedding_cache_key(model_id, text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+
+        if self.store is not None:
+            try:
+                vector = self.store.get(key)
+            except Exception as e:
+                print(f"⚠️  Embedding cache read failed: {str(e)}")
+                vector = None
+            if vector is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, vector)
+                return vector
+
+        vector = embed_fn(text)
+        with self._lock:
+            self.misses += 1
+        self._remember(key, vector)
+        if self.store is not None:
+            try:
+                self.store.put(key, model_id, vector)
+            except Exception as e:
+                print(f"⚠️  Embedding cache write failed: {str(e)}")
+        return vector
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "lookups": lookups,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None,
+                "memory_entries": len(self._memory),
+            }
+
+
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            store = None
+            if EMBEDDING_CACHE_BACKEND == "sqlite":
+                try:
+                    store = SQLiteEmbeddingStore()
+                except Exception as e:
+                    print(f"⚠️  Embedding disk cache unavailable, memory only: {str(e)}")
+            _embedding_cache = EmbeddingCache(store=store)
+        return _embedding_cache
+
+
+def embedding_cache_stats():
+    """Stats of the shared cache, or None if nothing has been embedded yet."""
+    return _embedding_cache.stats() if _embedding_cache is not None else None
@@ -1,13 +1,27 @@
-import boto3
+import argparse
 import csv
+import hashlib
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from model_registry import ModelRegistry
+from config.processing_limits import (
+    VECTOR_INDEX_DIR,
+    EMBEDDING_MAX_WORKERS,
+    EMBEDDING_CHECKPOINT_EVERY,
+    ENABLE_PROGRESS_LOGGING
+)
 
-REGION = "us-west-2"
-ENCODING_METHOD = "windows-1252"
+ENCODING_METHOD = "utf-8-sig"
 PC_COLUMN = "Purchasing Category"
 Blink_DESCRIPTION_COLUMN = "Blink Description"
 
+EMBEDDING_MODEL_ID = ModelRegistry.titan_2
+PC_CSV_PATH = os.path.join("Data", "PC_Buyer_Assignments - Copy(Buyer Review).csv")
+PC_INDEX_PATH = os.path.join(VECTOR_INDEX_DIR, "pc_vector_index")
+CHECKPOINT_SUFFIX = ".checkpoint.jsonl"
+
+
 def load_texts_for_embedding(csv_path: str) -> list[str]:
     to_embed = []
     with open(csv_path, "r", encoding=ENCODING_METHOD) as f:
@@ -18,12 +32,149 @@ def load_texts_for_embedding(csv_path: str) -> list[str]:
     return to_embed
 
 
-def embed_texts_to_jsonl(texts: list[str], output_path: str, model_id: str = ModelRegistry.titan_2, region: str = REGION):
-    client = boto3.client("bedrock-runtime", region_name=region)
-    with open(output_path, "w") as out:
-        for item in texts:
-            request = json.dumps({"inputText": item})
-            response = client.invoke_model(modelId=model_id, body=request)
-            model_response = json.loads(response["body"].read())
-            embedding = model_response["embedding"]
-            out.write(json.dumps({json.dumps(embedding): item}) + "\n")
+def text_hash(text: str, model_id: str) -> str:
+    return hashlib.sha256(f"{model_id}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def invoke_embedding(text: str, model_id: str = EMBEDDING_MODEL_ID) -> list[float]:
+    """One uncached Titan call; index builds use this directly."""
+    from utils.bedrock_utils import invoke_model
+
+    response = invoke_model(
+        modelId=model_id,
+        body=json.dumps({"inputText": text}),
+        accept="application/json",
+        contentType="application/json"
+    )
+    return json.loads(response["body"].read())["embedding"]
+
+
+def embed_text(text: str, model_id: str = EMBEDDING_MODEL_ID) -> list[float]:
+    """Query-time embedding, served from the shared embedding cache when possible."""
+    from utils.embedding_cache import get_embedding_cache
+    return get_embedding_cache().get_or_compute(
+        text, model_id, lambda t: invoke_embedding(t, model_id))
+
+
+def load_embeddings_jsonl(jsonl_path: str):
+    """Read the legacy embeddings.jsonl ({"<vector as JSON>": text} per line)."""
+    vectors, texts = [], []
+    with open(jsonl_path, "r") as f:
+        for line in f:
+            for vec_str, text in json.loads(line).items():
+                vectors.append(json.loads(vec_str))
+                texts.append(text)
+    return vectors, texts
+
+
+def _load_known_vectors(index_path: str, model_id: str) -> dict:
+    """hash -> vector from the existing index and any checkpoint of an interrupted build."""
+    known = {}
+    try:
+        from utils.vector_index import VectorIndex
+        index = VectorIndex(index_path)
+        if index.model_id == model_id and index.hashes:
+            for h, row in zip(index.hashes, index.matrix):
+                known[h] = row.tolist()
+    except FileNotFoundError:
+        pass
+
+    checkpoint_path = index_path + CHECKPOINT_SUFFIX
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn line from a killed run
+                known[entry["hash"]] = entry["embedding"]
+    return known
+
+
+def _terminate_checkpoint(checkpoint_path: str):
+    """End a checkpoint left with a torn last line, so appended rows start on a line of their own."""
+    if not os.path.exists(checkpoint_path) or os.path.getsize(checkpoint_path) == 0:
+        return
+    with open(checkpoint_path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def build_embedding_index(texts: list[str], index_path: str, model_id: str = EMBEDDING_MODEL_ID,
+                          max_workers: int = EMBEDDING_MAX_WORKERS, embed_fn=invoke_embedding) -> dict:
+    """
+    Embed `texts` into the binary index at index_path.
+
+    Rows whose text hash already has a vector (in the current index or the
+    checkpoint of an interrupted run) are reused; the rest are embedded
+    concurrently on a bounded pool and appended to <index>.checkpoint.jsonl as
+    they finish. The index is only rewritten once every row has a vector, after
+    which the checkpoint is removed. Rerun the same call to resume.
+    """
+    from utils.vector_index import write_vector_index
+
+    hashes = [text_hash(t, model_id) for t in texts]
+    known = _load_known_vectors(index_path, model_id)
+    pending = {}
+    for h, t in zip(hashes, texts):
+        if h not in known:
+            pending.setdefault(h, t)
+
+    stats = {"total": len(texts), "reused": len(texts) - len(pending), "embedded": 0, "failed": 0}
+    if ENABLE_PROGRESS_LOGGING:
+        print(f"🔄 Embedding {len(pending)} of {len(texts)} rows with {model_id}")
+
+    checkpoint_path = index_path + CHECKPOINT_SUFFIX
+    os.makedirs(os.path.dirname(checkpoint_path) or ".", exist_ok=True)
+    _terminate_checkpoint(checkpoint_path)
+    with open(checkpoint_path, "a") as checkpoint, \
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="embed") as pool:
+        futures = {pool.submit(embed_fn, t, model_id): h for h, t in pending.items()}
+        for n, future in enumerate(as_completed(futures), start=1):
+            h = futures[future]
+            try:
+                known[h] = future.result()
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"❌ Embedding failed for row {h[:12]}: {str(e)}")
+                continue
+            stats["embedded"] += 1
+            checkpoint.write(json.dumps({"hash": h, "embedding": known[h]}) + "\n")
+            if n % EMBEDDING_CHECKPOINT_EVERY == 0:
+                checkpoint.flush()
+
+    if stats["failed"]:
+        raise RuntimeError(
+            f"{stats['failed']} of {len(pending)} embeddings failed; "
+            f"progress kept in {checkpoint_path}, rerun to resume")
+
+    write_vector_index(index_path, [known[h] for h in hashes], texts, model_id, hashes=hashes)
+    os.remove(checkpoint_path)
+    return stats
+
+
+def build_pc_vector_index(csv_path: str = PC_CSV_PATH, index_path: str = PC_INDEX_PATH,
+                          model_id: str = EMBEDDING_MODEL_ID, from_jsonl: str = None):
+    """Offline step: embed the PC CSV (or convert a legacy JSONL) into the binary index."""
+    if from_jsonl:
+        from utils.vector_index import write_vector_index
+        vectors, texts = load_embeddings_jsonl(from_jsonl)
+        write_vector_index(index_path, vectors, texts, model_id,
+                           hashes=[text_hash(t, model_id) for t in texts])
+        return {"total": len(texts), "reused": len(texts), "embedded": 0, "failed": 0}
+    return build_embedding_index(load_texts_for_embedding(csv_path), index_path, model_id)
+
+
+if __name__ == "__main__":
+    # python -m utils.embedding_utils [--from-jsonl Data/embeddings.jsonl]
+    parser = argparse.ArgumentParser(description="Build the purchasing-category vector index")
+    parser.add_argument("--csv", default=PC_CSV_PATH)
+    parser.add_argument("--out", default=PC_INDEX_PATH)
+    parser.add_argument("--model-id", default=EMBEDDING_MODEL_ID)
+    parser.add_argument("--from-jsonl", default=None)
+    args = parser.parse_args()
+
+    stats = build_pc_vector_index(args.csv, args.out, args.model_id, args.from_jsonl)
+    print(f"✅ Wrote {stats['total']} vectors to {args.out} "
+          f"({stats['embedded']} embedded, {stats['reused']} reused)")
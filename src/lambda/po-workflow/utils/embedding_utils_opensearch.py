@@ -1,56 +1,52 @@
-import boto3
 import json
-import numpy as np
-from opensearchpy import OpenSearch
+from functools import lru_cache
 
 
-# Initialize Bedrock runtime client
-bedrock = boto3.client("bedrock-runtime", region_name="us-east-1")
-
-import sys
-print("Running Python from:", sys.executable)
-
 # Titan Embeddings model ID (as of 2024)
 MODEL_ID = "amazon.titan-embed-text-v1"
+SERVICES_INDEX = "services"
+
+
+# Created on first search, not at import, so importing this module is free
+@lru_cache(maxsize=1)
+def get_embedding_client():
+    import boto3
+    from utils.bedrock_utils import BEDROCK_CLIENT_CONFIG
+    return boto3.client("bedrock-runtime", region_name="us-east-1", config=BEDROCK_CLIENT_CONFIG)
+
+
+def _invoke_titan(text):
+    from utils.bedrock_utils import invoke_model
 
-def get_normalized_embedding(text):
     body = json.dumps({"inputText": text})
-    response = bedrock.invoke_model(
+    response = invoke_model(
+        client=get_embedding_client(),
         body=body,
         modelId=MODEL_ID,
         accept="application/json",
         contentType="application/json"
     )
-    response_body = json.loads(response["body"].read())
-    embedding = np.array(response_body["embedding"])
+    return json.loads(response["body"].read())["embedding"]
+
+
+def get_normalized_embedding(text):
+    import numpy as np
+    from utils.embedding_cache import get_embedding_cache
+
+    embedding = np.array(get_embedding_cache().get_or_compute(text, MODEL_ID, _invoke_titan))
     return (embedding / np.linalg.norm(embedding)).tolist()
 
-client = OpenSearch(
-    hosts=[{"host": "search-service-map-ndxrw2lm2reeycx6ufvlouqaeq.us-west-2.es.amazonaws.com", "port": 443}],
-    http_auth=("admuruge", "Bestbro1325!"),  # or use IAM
-    use_ssl=True,
-    verify_certs=True
-)
-
-def search_similar_description(query_text):
-    embedding = get_normalized_embedding(query_text)
-    
-    response = client.search(
-        index="services",
-        body={
-            "size": 1,
-            "query": {
-                "knn": {
-                    "embedding": {
-                        "vector": embedding,
-                        "k": 1
-                    }
-                }
-            }
-        }
-    )
 
-    hits = response["hits"]["hits"]
+def search_similar_description(query_text, store=None):
+    """
+    Closest record in the services index. Runs against the configured vector
+    store (local NumPy index by default, OpenSearch when VECTOR_STORE_BACKEND
+    is "opensearch").
+    """
+    from utils.vector_store import get_vector_store
+
+    store = store or get_vector_store(SERVICES_INDEX)
+    hits = store.search(get_normalized_embedding(query_text), k=1)
     if hits:
-        return hits[0]["_source"]
-    return None
\ No newline at end of file
+        return hits[0][0]
+    return None
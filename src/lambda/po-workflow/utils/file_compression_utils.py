@@ -1,13 +1,29 @@
 import subprocess
 import os
-import tempfile
 import io
-from PIL import Image
-from PyPDF2 import PdfReader, PdfWriter
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from config.processing_limits import (
+    COMPRESSION_EXECUTOR,
+    COMPRESSION_MAX_WORKERS,
+    COMPRESSION_CACHE_MAX_MB,
+    MAX_IMAGE_SIZE_MB,
+    ENABLE_PROGRESS_LOGGING
+)
 
 MAX_CHUNK_SIZE_MB = 4.5
 MAX_PDF_PAGES = 50
 
+# Image resolutions (dpi) tried for PDFs, best first; the search keeps the highest that fits
+PDF_RESOLUTION_LADDER = (300, 200, 150, 110, 96, 72, 50)
+# Long-edge scales and JPEG qualities tried for images, best first
+IMAGE_SCALE_LADDER = (1.0, 0.75, 0.5, 0.35, 0.25)
+IMAGE_QUALITY_LADDER = (90, 80, 70, 60, 50, 40)
+IMAGE_EXTENSIONS = {"jpg", "jpeg", "png"}
+
 
 def get_file_size_mb(file) -> float:
     pos = file.tell()
@@ -18,6 +34,8 @@ def get_file_size_mb(file) -> float:
 
 
 def trim_pdf(file: io.BytesIO, max_pages=MAX_PDF_PAGES) -> io.BytesIO:
+    from PyPDF2 import PdfReader, PdfWriter
+
     file.seek(0)
     reader = PdfReader(file)
     total_pages = len(reader.pages)
@@ -36,58 +54,152 @@ def trim_pdf(file: io.BytesIO, max_pages=MAX_PDF_PAGES) -> io.BytesIO:
     return trimmed_pdf
 
 
+def split_pdf(file_bytes: bytes, windows: list) -> list:
+    """One standalone PDF (bytes) per (start, end) page window, from a single read of the source."""
+    from PyPDF2 import PdfReader, PdfWriter
+
+    reader = PdfReader(io.BytesIO(file_bytes))
+    parts = []
+    for start, end in windows:
+        writer = PdfWriter()
+        for i in range(start, end):
+            writer.add_page(reader.pages[i])
+        part = io.BytesIO()
+        writer.write(part)
+        parts.append(part.getvalue())
+    return parts
+
+
+# --- Ghostscript (piped, no temp files) ---
+def ghostscript_pdf(data: bytes, quality: str = "ebook", resolution: int = None):
+    """
+    Rewrite a PDF with Ghostscript reading stdin and writing stdout. Images are
+    downsampled to `resolution` dpi when given. None if gs is missing or fails.
+    """
+    args = [
+        "gs",
+        "-sDEVICE=pdfwrite",
+        "-dCompatibilityLevel=1.4",
+        f"-dPDFSETTINGS=/{quality}",
+        "-dNOPAUSE",
+        "-dQUIET",
+        "-dBATCH",
+        "-dSAFER",
+    ]
+    if resolution:
+        for kind in ("Color", "Gray", "Mono"):
+            args += [f"-dDownsample{kind}Images=true", f"-d{kind}ImageResolution={resolution}"]
+    args += ["-sOutputFile=-", "-"]
+
+    try:
+        completed = subprocess.run(args, input=data, capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Ghostscript compression failed: {e}")
+        return None
+    return completed.stdout or None
+
+
 def compress_pdf(file: io.BytesIO, quality: str = "screen") -> io.BytesIO:
     file.seek(0)
-    with tempfile.TemporaryDirectory() as tmpdir:
-        input_path = os.path.join(tmpdir, "input.pdf")
-        output_path = os.path.join(tmpdir, "output_compressed.pdf")
-
-        with open(input_path, "wb") as f:
-            f.write(file.read())
-
-        try:
-            subprocess.run([
-                "gs",
-                "-sDEVICE=pdfwrite",
-                "-dCompatibilityLevel=1.4",
-                f"-dPDFSETTINGS=/{quality}",
-                "-dNOPAUSE",
-                "-dQUIET",
-                "-dBATCH",
-                f"-sOutputFile={output_path}",
-                input_path
-            ], check=True)
-        except subprocess.CalledProcessError as e:
-            print(f"Ghostscript compression failed: {e}")
-            file.seek(0)
-            return file  # Return original if compression fails
-
-        with open(output_path, "rb") as f:
-            compressed = io.BytesIO(f.read())
-
-    compressed.seek(0)
-    return compressed
+    compressed = ghostscript_pdf(file.read(), quality)
+    if compressed is None:
+        file.seek(0)
+        return file  # Return original if compression fails
+    return io.BytesIO(compressed)
+
+
+# --- Images (Pillow, in memory) ---
+def encode_image(img, scale: float, quality: int) -> bytes:
+    from PIL import Image
+
+    if scale < 1.0:
+        img = img.resize((max(1, int(img.width * scale)), max(1, int(img.height * scale))),
+                         Image.Resampling.LANCZOS)
+    output = io.BytesIO()
+    img.save(output, format="JPEG", quality=quality, optimize=True)
+    return output.getvalue()
 
 
 def compress_image(file, target_quality=85, resize_factor=0.5) -> io.BytesIO:
+    from PIL import Image
+
     file.seek(0)
     img = Image.open(file)
-    if img.mode in ("RGBA", "P"):
+    if img.mode not in ("RGB", "L"):
         img = img.convert("RGB")
+    return io.BytesIO(encode_image(img, resize_factor, target_quality))
 
-    new_size = (int(img.width * resize_factor),
-                int(img.height * resize_factor))
-    img = img.resize(new_size, Image.Resampling.LANCZOS)
 
-    output = io.BytesIO()
-    img.save(output, format="JPEG", quality=target_quality, optimize=True)
-    output.seek(0)
-    return output
+# --- Adaptive search against the size limit ---
+def search_ladder(ladder, encode, target_bytes: int):
+    """
+    Binary search for the first (best) ladder step whose output fits, assuming
+    output size shrinks down the ladder. Returns (step, output), or the last
+    step's output with step None when nothing fits.
+    """
+    low, high, best, smallest = 0, len(ladder) - 1, None, None
+    while low <= high:
+        mid = (low + high) // 2
+        output = encode(ladder[mid])
+        if output is not None and len(output) <= target_bytes:
+            best, high = (ladder[mid], output), mid - 1
+        else:
+            if output is not None and (smallest is None or len(output) < len(smallest)):
+                smallest = output
+            low = mid + 1
+    return best if best is not None else (None, smallest)
+
+
+def compress_pdf_to_fit(data: bytes, target_bytes: int):
+    step, output = search_ladder(
+        PDF_RESOLUTION_LADDER, lambda dpi: ghostscript_pdf(data, "ebook", dpi), target_bytes)
+    return output, {"method": "ghostscript", "resolution": step}
+
+
+def compress_image_to_fit(data: bytes, target_bytes: int):
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    smallest = None
+    for scale in IMAGE_SCALE_LADDER:
+        quality, output = search_ladder(
+            IMAGE_QUALITY_LADDER, lambda q: encode_image(img, scale, q), target_bytes)
+        if quality is not None:
+            return output, {"method": "jpeg", "scale": scale, "quality": quality}
+        if output is not None and (smallest is None or len(output) < len(smallest)):
+            smallest = output
+    return smallest, {"method": "jpeg", "scale": None, "quality": None}
+
+
+def compress_bytes(data: bytes, file_name: str, target_bytes: int):
+    """
+    Worker entry point (runs in the compression pool): the best-quality version
+    of the file under `target_bytes`. Returns (bytes, file_name, info); images
+    become JPEGs and are renamed, and anything that cannot be shrunk comes back as is.
+    """
+    ext = file_name.lower().split(".")[-1]
+    output, info = None, {"method": None}
+    try:
+        if ext == "pdf":
+            output, info = compress_pdf_to_fit(data, target_bytes)
+        elif ext in IMAGE_EXTENSIONS:
+            output, info = compress_image_to_fit(data, target_bytes)
+            if output is not None:
+                file_name = os.path.splitext(file_name)[0] + ".jpg"
+    except Exception as e:
+        info = {"method": None, "error": str(e)}
+
+    if output is None or len(output) >= len(data):
+        return data, file_name, {**info, "compressed": False}
+    return output, file_name, {**info, "compressed": True}
 
 
 def compress_file_if_needed(file, filename: str) -> io.BytesIO:
     file.seek(0)
-    size_mb = get_file_size_mb(file)
     ext = filename.lower().split(".")[-1]
 
     if ext == "pdf":
@@ -96,15 +208,90 @@ def compress_file_if_needed(file, filename: str) -> io.BytesIO:
 
     # Check if size still exceeds limit after trimming (or if no trimming was needed)
     size_mb = get_file_size_mb(file)
-    if size_mb <= MAX_CHUNK_SIZE_MB:
+    if size_mb <= size_limit_mb(filename):
         file.seek(0)
         return file
 
-    # Apply compression based on file type
-    if ext == "pdf":
-        return compress_pdf(file)
-    if ext in {"jpg", "jpeg", "png"}:
-        return compress_image(file)
-
     file.seek(0)
-    return file
+    data, _, _ = compress_bytes(file.read(), filename, int(size_limit_mb(filename) * 1024 * 1024))
+    return io.BytesIO(data)
+
+
+def size_limit_mb(file_name: str) -> float:
+    """Bedrock's per-block limit: documents 4.5 MB, images 3.75 MB."""
+    ext = file_name.lower().split(".")[-1]
+    return MAX_IMAGE_SIZE_MB if ext in IMAGE_EXTENSIONS else MAX_CHUNK_SIZE_MB
+
+
+# --- Pool and content-hash cache ---
+_pool = None
+_pool_lock = threading.Lock()
+_cache = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+
+def get_compression_pool():
+    """
+    Process pool for the CPU-bound work. Lambda has no /dev/shm, which process
+    pools need for their queues, so this falls back to threads there (Ghostscript
+    runs as a subprocess either way; Pillow releases the GIL while encoding).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if COMPRESSION_EXECUTOR == "process":
+                try:
+                    _pool = ProcessPoolExecutor(max_workers=COMPRESSION_MAX_WORKERS)
+                except (OSError, NotImplementedError) as e:
+                    if ENABLE_PROGRESS_LOGGING:
+                        print(f"⚠️ Process pool unavailable ({e}); compressing on threads")
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=COMPRESSION_MAX_WORKERS,
+                                           thread_name_prefix="compress")
+    return _pool
+
+
+def _cache_get(key: str):
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    return None
+
+
+def _cache_put(key: str, value):
+    global _cache_bytes
+    limit = COMPRESSION_CACHE_MAX_MB * 1024 * 1024
+    with _cache_lock:
+        if key in _cache:
+            return
+        _cache[key] = value
+        _cache_bytes += len(value[0])
+        while _cache_bytes > limit and _cache:
+            _, evicted = _cache.popitem(last=False)
+            _cache_bytes -= len(evicted[0])
+
+
+async def acompress_to_fit(data: bytes, file_name: str, target_bytes: int = None):
+    """
+    Compress in the pool unless the bytes already fit. Results are cached by
+    content hash, so a document seen again (a retry, a resubmitted job) is not
+    recompressed. Returns (bytes, file_name, info).
+    """
+    target_bytes = target_bytes or int(size_limit_mb(file_name) * 1024 * 1024)
+    if len(data) <= target_bytes:
+        return data, file_name, {"compressed": False, "method": None}
+
+    key = f"{hashlib.sha256(data).hexdigest()}:{file_name.lower().split('.')[-1]}:{target_bytes}"
+    cached = _cache_get(key)
+    if cached is not None:
+        data, ext, info = cached
+        return data, os.path.splitext(file_name)[0] + ext, {**info, "cached": True}
+
+    loop = asyncio.get_running_loop()
+    output, out_name, info = await loop.run_in_executor(
+        get_compression_pool(), compress_bytes, data, file_name, target_bytes)
+    info = {**info, "original_bytes": len(data), "compressed_bytes": len(output)}
+    _cache_put(key, (output, os.path.splitext(out_name)[1], info))
+    return output, out_name, info
@@ -4,8 +4,7 @@ import json
 import re
 import os
 import io
-from PyPDF2 import PdfReader
-import streamlit as st
+from config.processing_limits import ENABLE_PROGRESS_LOGGING
 
 def sanitize_doc_name(name: str) -> str:
     cleaned_name = re.sub(r"[^\w\s\-\(\)\[\]]", "", os.path.splitext(name)[0])
@@ -13,11 +12,14 @@ def sanitize_doc_name(name: str) -> str:
 
 def parse_pdf_form_fields(file_bytes: bytes) -> dict:
     try:
+        from PyPDF2 import PdfReader
+
         reader = PdfReader(io.BytesIO(file_bytes))
         fields = reader.get_fields()
         if not fields:
             return {}
-        st.write("Fields successfully parsed.")
+        if ENABLE_PROGRESS_LOGGING:
+            print("Fields successfully parsed.")
         return {name: field.get("/V") for name, field in fields.items()}
     except Exception as e:
         return {"error": str(e)}
@@ -1,10 +1,16 @@
-import csv
+from utils.reference_data import get_reference_table
+
+PC_COLUMN = "Purchasing Category"
+
+
+def get_pc_buyer_table(csv_path: str):
+    # Indexed by normalized purchasing category -> buyer assignment rows
+    return get_reference_table(csv_path, PC_COLUMN)
 
 
 def get_unique_purchasing_categories(csv_path: str) -> list[str]:
-    unique = set()
-    with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            unique.add(row["Purchasing Category"])
-    return sorted(unique)
+    return get_pc_buyer_table(csv_path).key_values()
+
+
+def get_buyer_rows_for_categories(csv_path: str, categories) -> list[dict]:
+    return get_pc_buyer_table(csv_path).lookup_all(categories)
@@ -0,0 +1,96 @@
+import io
+import asyncio
+import hashlib
+from config.processing_limits import (
+    IMAGE_MAX_LONG_EDGE,
+    IMAGE_GRAYSCALE_MAX_SATURATION,
+    IMAGE_JPEG_QUALITY
+)
+
+IMAGE_EXTENSIONS = {"jpg", "jpeg", "png"}
+
+
+def is_image(file_name: str) -> bool:
+    return file_name.lower().split(".")[-1] in IMAGE_EXTENSIONS
+
+
+def pixel_hash(img) -> str:
+    """Exact content key: identical decoded pixels hash the same, whatever metadata the files carried."""
+    digest = hashlib.sha256(f"{img.mode}:{img.size}".encode())
+    digest.update(img.tobytes())
+    return digest.hexdigest()
+
+
+def is_grayscale(img) -> bool:
+    """True for scans and photos of black-and-white paper: mean saturation below the threshold."""
+    if img.mode in ("L", "1"):
+        return True
+    sample = img.convert("RGB").resize((64, 64)).convert("HSV")
+    saturation = list(sample.getdata(band=1))
+    return sum(saturation) / (len(saturation) * 255) <= IMAGE_GRAYSCALE_MAX_SATURATION
+
+
+def normalize_image(data: bytes, file_name: str):
+    """
+    Downsample to IMAGE_MAX_LONG_EDGE (beyond it the model rescales the image
+    anyway, but the upload and token cost are paid at full size), apply the
+    EXIF orientation, drop colour from effectively grey pages and re-encode
+    without metadata. CPU-bound. Returns (bytes, file_name, info).
+    """
+    from PIL import Image, ImageOps
+
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    original_size = img.size
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    if max(img.size) > IMAGE_MAX_LONG_EDGE:
+        img.thumbnail((IMAGE_MAX_LONG_EDGE, IMAGE_MAX_LONG_EDGE), Image.Resampling.LANCZOS)
+    grayscale = is_grayscale(img)
+    if grayscale:
+        img = img.convert("L")
+
+    # A fresh encode carries no EXIF, GPS, ICC or text chunks
+    output = io.BytesIO()
+    ext = file_name.lower().split(".")[-1]
+    if ext == "png":
+        img.save(output, format="PNG", optimize=True)
+    else:
+        img.save(output, format="JPEG", quality=IMAGE_JPEG_QUALITY, optimize=True)
+    normalized = output.getvalue()
+
+    info = {
+        "original_size": original_size,
+        "size": img.size,
+        "grayscale": grayscale,
+        "original_bytes": len(data),
+        "bytes": len(normalized),
+        "pixel_hash": pixel_hash(img),
+    }
+    # Re-encoding an already small image can grow it; keep the original bytes then
+    if len(normalized) >= len(data) and img.size == original_size:
+        return data, file_name, {**info, "bytes": len(data), "normalized": False}
+    return normalized, file_name, {**info, "normalized": True}
+
+
+class ImageDeduper:
+    """
+    Per-job registry of normalized image content. An image whose pixels are
+    identical to an earlier attachment's (the same file attached twice, or
+    re-saved with other metadata) waits for that parse and reuses it. Similar
+    but not identical images, e.g. two filled-in copies of one form, are
+    always parsed separately.
+    """
+
+    def __init__(self):
+        self._seen = {}  # pixel hash -> (file name, future result)
+
+    def claim(self, content_hash: str, file_name: str):
+        """(None, future) to parse and resolve, or (original name, future) to await."""
+        if content_hash in self._seen:
+            return self._seen[content_hash]
+        future = asyncio.get_running_loop().create_future()
+        self._seen[content_hash] = (file_name, future)
+        return None, future
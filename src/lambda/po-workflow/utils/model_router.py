@@ -0,0 +1,147 @@
+import json
+import threading
+from model_registry import ModelRegistry
+from utils.file_format_utils import try_parse_json_like
+from config.processing_limits import MODEL_ROUTING, ESCALATION_CONFIDENCE_THRESHOLD
+
+# Cheapest model first. Agents that ran on Haiku before routing existed
+# (union job, PHI, PC classifier) escalate to Sonnet 3.7, a new and costlier
+# target; the others escalate to the model they always used
+AGENT_MODEL_TIERS = {
+    "Checklist": (ModelRegistry.haiku_3_5, ModelRegistry.sonnet_3_5),
+    "Validate PO data": (ModelRegistry.haiku_3_5, ModelRegistry.sonnet_3_5),
+    "Check if Union Job": (ModelRegistry.haiku_3_5, ModelRegistry.sonnet_3_7),
+    "PHI Agreement Check": (ModelRegistry.haiku_3_5, ModelRegistry.sonnet_3_7),
+    "LLM PC Classifier": (ModelRegistry.haiku_3_5, ModelRegistry.sonnet_3_7),
+    "Goods/Services Classification": (ModelRegistry.haiku_3_5, ModelRegistry.sonnet_3_7),
+    "Data Security Classification": (ModelRegistry.haiku_3_5, ModelRegistry.sonnet_3_7),
+}
+
+# The model each agent used before routing; MODEL_ROUTING="fixed" runs only this one
+AGENT_FIXED_MODELS = {
+    "Checklist": ModelRegistry.sonnet_3_5,
+    "Validate PO data": ModelRegistry.sonnet_3_5,
+    "Check if Union Job": ModelRegistry.haiku_3_5,
+    "PHI Agreement Check": ModelRegistry.haiku_3_5,
+    "LLM PC Classifier": ModelRegistry.haiku_3_5,
+    "Goods/Services Classification": ModelRegistry.sonnet_3_7,
+    "Data Security Classification": ModelRegistry.sonnet_3_7,
+}
+
+# Appended after the documents of JSON-object tasks so the cached prefix is unchanged
+CONFIDENCE_INSTRUCTION = (
+    '\n\nAlso include a top-level "confidence" field: a number from 0 to 1 for how sure '
+    "you are of this answer given the documents."
+)
+
+CONFIDENCE_WORDS = {"low": 0.3, "medium": 0.6, "high": 0.9}
+
+
+def get_model_tiers(agent: str) -> tuple:
+    if MODEL_ROUTING == "tiered":
+        return AGENT_MODEL_TIERS[agent]
+    return (AGENT_FIXED_MODELS[agent],)
+
+
+def read_confidence(value):
+    """Self-reported confidence as a float, accepting numbers, "0.8", "80%" or low/medium/high."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value / 100 if value > 1 else float(value)
+    text = str(value).strip().lower()
+    if text in CONFIDENCE_WORDS:
+        return CONFIDENCE_WORDS[text]
+    try:
+        number = float(text.rstrip("%"))
+    except ValueError:
+        return None
+    return number / 100 if text.endswith("%") or number > 1 else number
+
+
+# --- Output checks: return None when the answer is acceptable, else the escalation reason ---
+def expect_json(types=(dict,), required=(), check_confidence=False):
+    def validate(text):
+        parsed = try_parse_json_like(text) if isinstance(text, str) else text
+        if not isinstance(parsed, types) or not parsed:
+            return "malformed_json"
+        if isinstance(parsed, dict) and any(key not in parsed for key in required):
+            return "missing_fields"
+        if check_confidence and isinstance(parsed, dict):
+            confidence = read_confidence(parsed.get("confidence"))
+            if confidence is not None and confidence < ESCALATION_CONFIDENCE_THRESHOLD:
+                return "low_confidence"
+        return None
+    return validate
+
+
+# --- Escalation metrics (per container) ---
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(agent: str, model_id: str, outcome: str):
+    with _stats_lock:
+        stats = _stats.setdefault(agent, {"tasks": 0, "escalations": 0, "reasons": {}, "final_model": {}})
+        if outcome == "accepted":
+            stats["tasks"] += 1
+            stats["final_model"][model_id] = stats["final_model"].get(model_id, 0) + 1
+        else:
+            stats["escalations"] += 1
+            stats["reasons"][outcome] = stats["reasons"].get(outcome, 0) + 1
+
+
+def model_routing_stats() -> dict:
+    """Per-agent task count, escalation rate and which tier answered, since container start."""
+    with _stats_lock:
+        return {
+            agent: {
+                **stats,
+                "escalation_rate": round(stats["escalations"] / stats["tasks"], 3) if stats["tasks"] else 0.0,
+                "reasons": dict(stats["reasons"]),
+                "final_model": dict(stats["final_model"]),
+            }
+            for agent, stats in _stats.items()
+        }
+
+
+def reset_model_routing_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+# --- Router ---
+async def routed_call(agent: str, call, validate, tiers=None):
+    """
+    Run `call(model_id)` on the agent's cheapest tier and move up a tier while
+    `validate(result)` returns a reason (malformed JSON, low confidence, ...).
+    Exceptions below the top tier escalate too. Returns (result, model_id); the
+    top tier's answer is returned even if it fails validation.
+    """
+    tiers = tiers or get_model_tiers(agent)
+    for index, model_id in enumerate(tiers):
+        is_last = index == len(tiers) - 1
+        try:
+            result = await call(model_id)
+        except Exception as e:
+            if is_last:
+                raise
+            reason, result = "error", None
+            detail = str(e)
+        else:
+            reason = None if is_last else validate(result)
+            detail = None
+
+        if reason is None:
+            _record(agent, model_id, "accepted")
+            return result, model_id
+
+        _record(agent, model_id, reason)
+        print(json.dumps({
+            "event": "model_escalation",
+            "agent": agent,
+            "from_model": model_id,
+            "to_model": tiers[index + 1],
+            "reason": reason,
+            **({"detail": detail} if detail else {}),
+        }))
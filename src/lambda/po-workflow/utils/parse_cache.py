@@ -0,0 +1,170 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from config.processing_limits import (
+    PARSE_CACHE_BACKEND,
+    PARSE_CACHE_PATH,
+    PARSE_CACHE_S3_BUCKET,
+    PARSE_CACHE_S3_PREFIX,
+    PARSE_CACHE_TTL_SECONDS,
+    PARSE_CACHE_MAX_SIZE_MB,
+    ENABLE_PROGRESS_LOGGING
+)
+
+
+def parse_cache_key(file_bytes: bytes, prompt: str, model_id: str, *extra: str) -> str:
+    """
+    Content address for a parse result: the document bytes plus everything that
+    shapes the model's answer (prompt, model id, and any prompts the tools return).
+    """
+    digest = hashlib.sha256()
+    for part in (file_bytes, prompt.encode("utf-8"), model_id.encode("utf-8"),
+                 *(e.encode("utf-8") for e in extra)):
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
+
+
+class SQLiteParseCache:
+    """Local parse cache with TTL expiry and least-recently-used size trimming."""
+
+    def __init__(self, path=PARSE_CACHE_PATH, ttl_seconds=PARSE_CACHE_TTL_SECONDS,
+                 max_size_mb=PARSE_CACHE_MAX_SIZE_MB):
+        self.ttl_seconds = ttl_seconds
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS parse_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM parse_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if now - created > self.ttl_seconds:
+                self._conn.execute("DELETE FROM parse_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE parse_cache SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(value)
+
+    def put(self, key: str, value: dict):
+        payload = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parse_cache (key, value, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now))
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute(
+            "DELETE FROM parse_cache WHERE created < ?", (now - self.ttl_seconds,))
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM parse_cache").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+        for key, size in self._conn.execute(
+                "SELECT key, size FROM parse_cache ORDER BY accessed ASC").fetchall():
+            self._conn.execute("DELETE FROM parse_cache WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_size_bytes:
+                break
+
+
+class S3ParseCache:
+    """
+    Shared parse cache in S3, so results survive across Lambda containers.
+    Entries carry their creation time for TTL checks; bucket size should be
+    bounded with a lifecycle expiration rule on the cache prefix.
+    """
+
+    def __init__(self, bucket=PARSE_CACHE_S3_BUCKET, prefix=PARSE_CACHE_S3_PREFIX,
+                 ttl_seconds=PARSE_CACHE_TTL_SECONDS):
+        import boto3
+        self.bucket = bucket
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self._s3 = boto3.client("s3")
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}.json"
+
+    def get(self, key: str):
+        try:
+            obj = self._s3.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self._s3.exceptions.NoSuchKey:
+            return None
+        entry = json.loads(obj["Body"].read())
+        if time.time() - entry.get("created", 0) > self.ttl_seconds:
+            return None
+        return entry.get("value")
+
+    def put(self, key: str, value: dict):
+        body = json.dumps({"created": time.time(), "value": value})
+        self._s3.put_object(
+            Bucket=self.bucket,
+            Key=self._object_key(key),
+            Body=body.encode("utf-8"),
+            ContentType="application/json",
+        )
+
+
+_parse_cache = None
+_parse_cache_loaded = False
+_parse_cache_lock = threading.Lock()
+
+
+def get_parse_cache():
+    """Return the configured cache backend, or None when caching is disabled."""
+    global _parse_cache, _parse_cache_loaded
+    with _parse_cache_lock:
+        if not _parse_cache_loaded:
+            _parse_cache_loaded = True
+            try:
+                if PARSE_CACHE_BACKEND == "sqlite":
+                    _parse_cache = SQLiteParseCache()
+                elif PARSE_CACHE_BACKEND == "s3" and PARSE_CACHE_S3_BUCKET:
+                    _parse_cache = S3ParseCache()
+            except Exception as e:
+                print(f"⚠️  Parse cache unavailable, continuing without it: {str(e)}")
+                _parse_cache = None
+        return _parse_cache
+
+
+def cache_get(key: str):
+    """Cache lookup that never fails the caller; errors count as a miss."""
+    cache = get_parse_cache()
+    if cache is None:
+        return None
+    try:
+        value = cache.get(key)
+    except Exception as e:
+        print(f"⚠️  Parse cache read failed: {str(e)}")
+        return None
+    if value is not None and ENABLE_PROGRESS_LOGGING:
+        print(f"✅ Parse cache hit {key[:12]}")
+    return value
+
+
+def cache_put(key: str, value: dict):
+    cache = get_parse_cache()
+    if cache is None:
+        return
+    try:
+        cache.put(key, value)
+    except Exception as e:
+        print(f"⚠️  Parse cache write failed: {str(e)}")
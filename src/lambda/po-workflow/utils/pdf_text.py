@@ -0,0 +1,121 @@
+import io
+import re
+from dataclasses import dataclass
+from config.processing_limits import TEXT_LAYER_MIN_PAGE_CHARS
+
+
+def is_pdf(file_bytes: bytes) -> bool:
+    return file_bytes[:1024].lstrip().startswith(b"%PDF")
+
+
+def extract_pdf_pages(file_bytes: bytes, max_pages: int = None) -> list:
+    """Text layer of each page (an empty string for pages without one). [] if unreadable."""
+    if not is_pdf(file_bytes):
+        return []
+    try:
+        from PyPDF2 import PdfReader
+
+        reader = PdfReader(io.BytesIO(file_bytes))
+        pages = reader.pages if max_pages is None else reader.pages[:max_pages]
+        return [page.extract_text() or "" for page in pages]
+    except Exception:
+        # Encrypted, malformed or scanned-only files simply have no usable text layer
+        return []
+
+
+# --- Layout-preserving extraction ---
+ROW_TOLERANCE = 3.0  # Points; fragments whose baselines are this close share a row
+COLUMN_GAP = 12.0  # Horizontal gap (points) that marks a new table cell rather than a space
+
+
+def _layout_page_text(page) -> str:
+    """
+    Page text rebuilt row by row from fragment positions, with wide horizontal
+    gaps written as " | " so line-item tables keep their columns.
+    """
+    fragments = []
+
+    def visit(text, cm, tm, font_dict, font_size):
+        if not text or not text.strip():
+            return
+        x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+        y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+        size = (font_size or 10) * (abs(tm[0]) or 1)
+        fragments.append((x, y, text.strip(), size))
+
+    plain = page.extract_text(visitor_text=visit) or ""
+    if not fragments:
+        return plain
+
+    rows = []
+    for fragment in sorted(fragments, key=lambda f: -f[1]):
+        if rows and abs(rows[-1][0] - fragment[1]) <= ROW_TOLERANCE:
+            rows[-1][1].append(fragment)
+        else:
+            rows.append((fragment[1], [fragment]))
+
+    lines = []
+    for _, row in rows:
+        line, end = "", None
+        for x, _, text, size in sorted(row, key=lambda f: f[0]):
+            if end is not None:
+                line += " | " if x - end > COLUMN_GAP else " "
+            line += text
+            end = x + len(text) * size * 0.5  # Rough glyph width; only gaps need to be told apart
+        lines.append(line)
+    return "\n".join(lines)
+
+
+# --- Text layer quality ---
+GARBAGE_PATTERN = re.compile(r"\(cid:\d+\)|\ufffd|[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def text_quality(pages: list) -> float:
+    """
+    0..1: the share of pages with a real text layer times the share of their
+    characters that are not extraction garbage (unmapped glyphs, control chars).
+    Scans score 0, born-digital documents close to 1.
+    """
+    if not pages:
+        return 0.0
+    covered = [p for p in pages if len("".join(p.split())) >= TEXT_LAYER_MIN_PAGE_CHARS]
+    if not covered:
+        return 0.0
+    text = "".join("".join(p.split()) for p in covered)
+    garbage = sum(len(m) for m in GARBAGE_PATTERN.findall(text))
+    readable = sum(ch.isalnum() or ch in ".,:;$%#/()-&'\"@*+|" for ch in text)
+    return (len(covered) / len(pages)) * max(0.0, readable - garbage) / len(text)
+
+
+@dataclass
+class TextLayer:
+    pages: list
+    form_fields: dict
+    quality: float
+
+    def render(self, start: int = 0, end: int = None) -> str:
+        """
+        Compact text sent in place of the PDF: pages start..end (all by default),
+        then any filled-in form fields, which go with the window holding page 1.
+        """
+        pages = self.pages[start:end]
+        parts = [f"--- Page {i} ---\n{text.strip()}" for i, text in enumerate(pages, start + 1)]
+        filled = {name: value for name, value in self.form_fields.items() if value not in (None, "")}
+        if filled and start == 0:
+            parts.append("--- Form fields ---\n" + "\n".join(f"{name}: {value}" for name, value in filled.items()))
+        return "\n\n".join(parts)
+
+
+def extract_text_layer(file_bytes: bytes) -> TextLayer:
+    """Layout text of every page, the form field values and a quality score. CPU-bound."""
+    if not is_pdf(file_bytes):
+        return TextLayer([], {}, 0.0)
+    try:
+        from PyPDF2 import PdfReader
+
+        reader = PdfReader(io.BytesIO(file_bytes))
+        pages = [_layout_page_text(page) for page in reader.pages]
+        form_fields = {str(name): field.get("/V") for name, field in (reader.get_fields() or {}).items()}
+    except Exception:
+        return TextLayer([], {}, 0.0)
+    return TextLayer(pages, form_fields, text_quality(pages))
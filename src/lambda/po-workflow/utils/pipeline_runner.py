@@ -0,0 +1,144 @@
+import json
+import time
+from state import PipelineState
+from config.processing_limits import ENABLE_PROGRESS_LOGGING
+
+
+def safe_for_json(obj, skip_keys=None):
+    if skip_keys is None:
+        skip_keys = set()
+
+    if isinstance(obj, float) and (obj != obj):  # NaN check
+        return None
+    elif isinstance(obj, bytes):
+        return f"[{len(obj)} bytes]"
+    elif isinstance(obj, dict):
+        return {k: safe_for_json(v, skip_keys) for k, v in obj.items() if k not in skip_keys}
+    elif isinstance(obj, list):
+        return [safe_for_json(item, skip_keys) for item in obj]
+    elif type(obj).__name__ == "DataFrame":
+        # Only reachable when pandas is already loaded, so no import is paid here
+        return [safe_for_json(row, skip_keys) for row in obj.to_dict(orient="records")]
+    else:
+        return obj
+
+
+# ---- DEEP MERGE ----
+def deep_update(d, u, path=""):
+    changes = []
+    for k, v in u.items():
+        if isinstance(v, dict) and isinstance(d.get(k), dict):
+            sub_changes = deep_update(d[k], v, path + f"{k}.")
+            changes.extend(sub_changes)
+        else:
+            if d.get(k) != v:
+                changes.append(path + k)
+            d[k] = v
+    return changes
+
+
+def flatten_agent_outputs(cumulative_state: dict) -> dict:
+    flattened_output = {}
+    for agent_output in cumulative_state.values():
+        if isinstance(agent_output, dict):
+            for k, v in agent_output.items():
+                flattened_output[k] = v
+    return flattened_output
+
+
+# ---- OBSERVERS ----
+class PipelineObserver:
+    """
+    Hooks called by run_pipeline. Subclass and override what you need; the
+    defaults do nothing, so the runner itself stays free of any UI code.
+    """
+
+    def on_step(self, agent_name: str, agent_output, changed_keys: list, elapsed_ms: float):
+        pass
+
+    def on_complete(self, cumulative_state: dict, agent_count: int, changed_keys: list,
+                    elapsed_ms: float):
+        pass
+
+
+class LogStepObserver(PipelineObserver):
+    """One JSON line per step and per run, for CloudWatch Logs."""
+
+    def __init__(self, job_id=None):
+        self.job_id = job_id
+
+    def _emit(self, record: dict):
+        if self.job_id:
+            record["job_id"] = self.job_id
+        print(json.dumps(record))
+
+    def on_step(self, agent_name, agent_output, changed_keys, elapsed_ms):
+        if not ENABLE_PROGRESS_LOGGING:
+            return
+        self._emit({
+            "event": "pipeline_step",
+            "agent": agent_name,
+            "changed_keys": list(agent_output) if isinstance(agent_output, dict) else [],
+            "elapsed_ms": round(elapsed_ms, 1),
+        })
+
+    def on_complete(self, cumulative_state, agent_count, changed_keys, elapsed_ms):
+        from utils.embedding_cache import embedding_cache_stats
+        from utils.model_router import model_routing_stats
+
+        record = {
+            "event": "pipeline_complete",
+            "agents_run": agent_count,
+            "elapsed_ms": round(elapsed_ms, 1),
+        }
+        cache_stats = embedding_cache_stats()
+        if cache_stats:
+            record["embedding_cache"] = cache_stats
+        routing_stats = model_routing_stats()
+        if routing_stats:
+            record["model_routing"] = routing_stats
+        self._emit(record)
+
+
+# ---- RUNNER ----
+async def run_pipeline(uploaded_files, pipeline, observers=None, telemetry=None):
+    """
+    Stream the graph and merge each agent's output into one state. Returns the
+    agent outputs flattened into a single dict (e.g. result["pdf_summary"]).
+    Node timings and Bedrock calls are collected into `telemetry` (a
+    utils.telemetry.JobTelemetry) when one is given.
+    """
+    from utils.telemetry import start_job, end_job
+
+    observers = observers or []
+    telemetry_token = start_job(telemetry) if telemetry is not None else None
+    initial_state: PipelineState = {"uploaded_files": uploaded_files}
+
+    cumulative_state = {}
+    changed_keys = []
+    agent_counter = 0
+
+    started = time.perf_counter()
+    last_step = started
+    try:
+        async for step in pipeline.astream(initial_state):
+            for agent_name, agent_output in step.items():
+                agent_counter += 1
+                now = time.perf_counter()
+
+                # Merge and track changes
+                changed_keys = deep_update(cumulative_state, {agent_name: agent_output})
+
+                for observer in observers:
+                    observer.on_step(agent_name, agent_output, changed_keys,
+                                     (now - last_step) * 1000)
+                last_step = now
+    finally:
+        if telemetry_token is not None:
+            end_job(telemetry_token)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for observer in observers:
+        observer.on_complete(cumulative_state, agent_counter, changed_keys, elapsed_ms)
+
+    return flatten_agent_outputs(cumulative_state)
@@ -0,0 +1,126 @@
+import json
+import hashlib
+from config.processing_limits import COMPACT_PROMPT_PAYLOADS, ENABLE_PROGRESS_LOGGING
+
+# Parsed-field keywords each task reads; None keeps every field. Parser output keys
+# vary by document ("Line Item Description", "line_items", "Scope of Work", ...), so
+# a field is kept when its name contains any of the keywords.
+DESCRIPTION_FIELDS = ("description", "item", "service", "scope", "summary", "purpose", "title")
+AGENT_FIELDS = {
+    "checklist": None,
+    "validation": None,
+    "fused": None,
+    "union_job": DESCRIPTION_FIELDS + ("labor", "job", "role", "position", "rate", "cost", "amount", "price"),
+    "phi_agreement": DESCRIPTION_FIELDS + ("information", "data", "patient", "health"),
+    "pc_classification": DESCRIPTION_FIELDS + ("supplier", "vendor", "category", "product"),
+    "goods_services": DESCRIPTION_FIELDS + ("product", "software", "deliverable"),
+    "data_security": DESCRIPTION_FIELDS + ("information", "data", "supplier", "vendor", "software",
+                                           "access", "system", "student", "payment"),
+}
+
+EMPTY_VALUES = (None, "", "N/A", "n/a", "None", "null", [], {})
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose and JSON
+    return max(1, len(text) // 4)
+
+
+def compact_json(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def prune_empty(value):
+    """Drop empty / placeholder values at every depth."""
+    if isinstance(value, dict):
+        pruned = {k: prune_empty(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if not any(v == e for e in EMPTY_VALUES)}
+    if isinstance(value, list):
+        pruned = [prune_empty(v) for v in value]
+        return [v for v in pruned if not any(v == e for e in EMPTY_VALUES)]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def _field_matches(name, keywords) -> bool:
+    name = str(name).lower().replace("_", " ")
+    return any(keyword in name for keyword in keywords)
+
+
+def project_fields(fields, keywords):
+    """Keep the fields whose name matches; nested objects are filtered the same way."""
+    if keywords is None or not isinstance(fields, dict):
+        return fields
+    projected = {}
+    for name, value in fields.items():
+        if _field_matches(name, keywords):
+            projected[name] = value
+        elif isinstance(value, dict):
+            nested = project_fields(value, keywords)
+            if nested:
+                projected[name] = nested
+    return projected
+
+
+def project_document(doc: dict, keywords) -> dict:
+    """One parser result reduced to what a task reads: doc type, matching fields, summary."""
+    result = (doc or {}).get("result")
+    if not isinstance(result, dict):
+        # Failed parses carry raw model output and error text; the task only needs to know
+        return {"doc_type": "Unparsed"}
+
+    fields = prune_empty(result.get("parsed_data") or {})
+    projected = project_fields(fields, keywords)
+    if fields and not projected:
+        # Nothing matched the task's keywords: better to send everything than nothing
+        projected = fields
+
+    payload = {"doc_type": result.get("doc_type", "Unknown")}
+    if projected:
+        payload["parsed_data"] = projected
+    if result.get("summary"):
+        payload["summary"] = str(result["summary"]).strip()
+    return payload
+
+
+def build_prompt_payload(parsed_data: dict, agent: str) -> str:
+    """
+    Minified JSON of the parsed documents for one task's prompt: only the fields
+    AGENT_FIELDS lists for it, empty values and parse-error blobs dropped, and
+    documents identical after projection (the same attachment sent twice) sent once.
+    With COMPACT_PROMPT_PAYLOADS off this is the indented dump the agents used to send.
+    """
+    if not COMPACT_PROMPT_PAYLOADS:
+        return json.dumps(parsed_data, indent=2)
+
+    keywords = AGENT_FIELDS.get(agent)
+    documents, seen = {}, {}
+    for name, doc in (parsed_data or {}).items():
+        projected = project_document(doc, keywords)
+        digest = hashlib.sha256(compact_json(projected).encode("utf-8")).hexdigest()
+        if digest in seen and projected.get("parsed_data"):
+            documents[name] = {"duplicate_of": seen[digest]}
+        else:
+            seen.setdefault(digest, name)
+            documents[name] = projected
+
+    payload = compact_json(documents)
+    log_payload_size(agent, parsed_data, payload)
+    return payload
+
+
+def log_payload_size(agent: str, parsed_data: dict, payload: str) -> dict:
+    baseline_tokens = estimate_tokens(json.dumps(parsed_data, indent=2, default=str))
+    payload_tokens = estimate_tokens(payload)
+    record = {
+        "event": "prompt_payload",
+        "agent": agent,
+        "documents": len(parsed_data or {}),
+        "estimated_tokens": payload_tokens,
+        "baseline_estimated_tokens": baseline_tokens,
+        "estimated_tokens_saved": baseline_tokens - payload_tokens,
+    }
+    if ENABLE_PROGRESS_LOGGING:
+        print(json.dumps(record))
+    return record
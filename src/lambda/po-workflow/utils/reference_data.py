@@ -0,0 +1,117 @@
+import csv
+import os
+import re
+import threading
+
+CSV_ENCODING = "utf-8-sig"
+
+
+def normalize_key(value) -> str:
+    return re.sub(r"\s+", " ", str(value or "")).strip().lower()
+
+
+class ReferenceTable:
+    """
+    A reference CSV held in memory as row tuples plus an index from the
+    normalized key column to row positions. The file is re-read only when its
+    mtime changes, so edits to Data/ are picked up by a warm container.
+    Empty cells are returned as None.
+    """
+
+    def __init__(self, path: str, key_column: str):
+        self.path = path
+        self.key_column = key_column
+        self.columns = ()
+        self._rows = ()
+        self._index = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _ensure_fresh(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime != self._mtime:
+                self._load()
+                self._mtime = mtime
+
+    def _load(self):
+        with open(self.path, "r", encoding=CSV_ENCODING, newline="") as f:
+            reader = csv.reader(f)
+            columns = tuple(c.strip() for c in next(reader, ()))
+            if self.key_column not in columns:
+                raise ValueError(f"Missing required column: '{self.key_column}' in CSV.")
+            key_pos = columns.index(self.key_column)
+
+            rows, index = [], {}
+            for raw in reader:
+                if not any(raw):
+                    continue
+                row = tuple((cell.strip() or None) for cell in raw[:len(columns)])
+                row += (None,) * (len(columns) - len(row))
+                key = normalize_key(row[key_pos])
+                if key:
+                    index.setdefault(key, []).append(len(rows))
+                rows.append(row)
+
+        # Swap in one step so readers never see a half-built table
+        self.columns, self._rows = columns, tuple(rows)
+        self._index = {k: tuple(v) for k, v in index.items()}
+
+    def _as_dict(self, row) -> dict:
+        return dict(zip(self.columns, row))
+
+    def lookup(self, key):
+        """First row whose key column matches `key` (case/whitespace-insensitive)."""
+        self._ensure_fresh()
+        positions = self._index.get(normalize_key(key))
+        return self._as_dict(self._rows[positions[0]]) if positions else None
+
+    def lookup_all(self, keys) -> list:
+        """All rows matching any of `keys`, in file order."""
+        self._ensure_fresh()
+        positions = set()
+        for key in keys:
+            positions.update(self._index.get(normalize_key(key), ()))
+        return [self._as_dict(self._rows[i]) for i in sorted(positions)]
+
+    def key_values(self) -> list:
+        """Distinct raw values of the key column, sorted."""
+        self._ensure_fresh()
+        key_pos = self.columns.index(self.key_column)
+        return sorted({row[key_pos] for row in self._rows if row[key_pos]})
+
+    def column_values(self, column: str) -> list:
+        self._ensure_fresh()
+        pos = self.columns.index(column)
+        return [row[pos] for row in self._rows]
+
+    @property
+    def version(self):
+        """Changes whenever the file is reloaded; lets derived indexes rebuild too."""
+        self._ensure_fresh()
+        return self._mtime
+
+    def __len__(self):
+        self._ensure_fresh()
+        return len(self._rows)
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def get_reference_table(path: str, key_column: str) -> ReferenceTable:
+    """One table per (path, key column) per container."""
+    with _tables_lock:
+        table = _tables.get((path, key_column))
+        if table is None:
+            table = ReferenceTable(path, key_column)
+            _tables[(path, key_column)] = table
+        return table
+
+
+def clear_reference_tables():
+    with _tables_lock:
+        _tables.clear()
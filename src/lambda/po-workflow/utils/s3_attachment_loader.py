@@ -0,0 +1,173 @@
+import asyncio
+import contextlib
+import io
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import boto3
+from botocore.config import Config
+from config.processing_limits import (
+    S3_MAX_CONCURRENT_DOWNLOADS,
+    MAX_IN_MEMORY_ATTACHMENTS_MB,
+    SPILL_THRESHOLD_MB,
+    SPILL_DIR
+)
+
+MB = 1024 * 1024
+STREAM_CHUNK_SIZE = 1 * MB
+
+_s3 = None
+_executor = None
+_init_lock = threading.Lock()
+
+
+def get_pooled_s3_client():
+    """One S3 client and download pool per container, sized for parallel GETs."""
+    global _s3, _executor
+    with _init_lock:
+        if _s3 is None:
+            _s3 = boto3.client(
+                "s3", config=Config(max_pool_connections=S3_MAX_CONCURRENT_DOWNLOADS))
+            _executor = ThreadPoolExecutor(
+                max_workers=S3_MAX_CONCURRENT_DOWNLOADS, thread_name_prefix="s3-loader")
+    return _s3, _executor
+
+
+class NamedBytesIO(io.BytesIO):
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name  # give it a filename for libs that call .name
+
+
+class SpilledFile:
+    """File-like view of an attachment streamed to disk; the temp file is gone once closed."""
+
+    def __init__(self, fileobj, name: str, loader=None, size: int = 0):
+        self._file = fileobj
+        self.name = name
+        self.loader = loader
+        self.size = size
+
+    def __getattr__(self, attr):
+        return getattr(self._file, attr)
+
+
+class PendingAttachment:
+    """
+    Placeholder put in `uploaded_files` while the download is still running. The
+    parser awaits it per document, so parsing starts as soon as each object lands.
+    """
+
+    def __init__(self, name: str, future):
+        self.name = name
+        self._future = future
+
+    async def load(self):
+        return await asyncio.wrap_future(self._future)
+
+    def result(self):
+        return self._future.result()
+
+
+async def resolve_attachment(file):
+    if isinstance(file, PendingAttachment):
+        return await file.load()
+    return file
+
+
+@contextlib.asynccontextmanager
+async def attachment_in_memory(file):
+    """
+    Wrap the span in which an attachment's bytes are held in RAM (the parse).
+    Spilled attachments wait for room in their job's memory budget first.
+    """
+    if isinstance(file, SpilledFile) and file.loader is not None:
+        async with file.loader.spilled_read(file.size):
+            yield
+    else:
+        yield
+
+
+class S3AttachmentLoader:
+    """
+    Fetches a job's attachments concurrently. Small objects are kept in memory
+    until MAX_IN_MEMORY_ATTACHMENTS_MB is used up; anything larger than
+    SPILL_THRESHOLD_MB, or arriving after the budget is spent, streams to SPILL_DIR.
+    """
+
+    def __init__(self, memory_budget_mb=MAX_IN_MEMORY_ATTACHMENTS_MB,
+                 spill_threshold_mb=SPILL_THRESHOLD_MB):
+        self._s3, self._executor = get_pooled_s3_client()
+        self._budget_bytes = int(memory_budget_mb * MB)
+        self._spill_threshold_bytes = int(spill_threshold_mb * MB)
+        self._in_memory_bytes = 0
+        self._lock = threading.Lock()
+        self._opened = []
+        self._spilled_reads = 0
+        self._read_cond = asyncio.Condition()
+
+    def submit(self, bucket: str, key: str) -> PendingAttachment:
+        future = self._executor.submit(self._fetch, bucket, key)
+        return PendingAttachment(Path(key).name, future)
+
+    def _reserve(self, size: int) -> bool:
+        with self._lock:
+            if self._in_memory_bytes + size > self._budget_bytes:
+                return False
+            self._in_memory_bytes += size
+            return True
+
+    def _release(self, size: int):
+        with self._lock:
+            self._in_memory_bytes -= size
+
+    @contextlib.asynccontextmanager
+    async def spilled_read(self, size: int):
+        """
+        Reserve `size` bytes of the memory budget while a spilled attachment is
+        read back and parsed. One spilled read is always admitted, so a budget
+        already used up by in-memory downloads cannot stall the job; the peak is
+        the budget plus the largest spilled attachment.
+        """
+        async with self._read_cond:
+            while not self._reserve(size):
+                if self._spilled_reads == 0:
+                    with self._lock:
+                        self._in_memory_bytes += size
+                    break
+                await self._read_cond.wait()
+            self._spilled_reads += 1
+        try:
+            yield
+        finally:
+            async with self._read_cond:
+                self._spilled_reads -= 1
+                self._release(size)
+                self._read_cond.notify_all()
+
+    def _fetch(self, bucket: str, key: str):
+        name = Path(key).name
+        obj = self._s3.get_object(Bucket=bucket, Key=key)
+        size = obj.get("ContentLength", 0)
+
+        if size <= self._spill_threshold_bytes and self._reserve(size):
+            return NamedBytesIO(obj["Body"].read(), name)
+
+        spill = tempfile.TemporaryFile(dir=SPILL_DIR)
+        for chunk in obj["Body"].iter_chunks(chunk_size=STREAM_CHUNK_SIZE):
+            spill.write(chunk)
+        spill.seek(0)
+        with self._lock:
+            self._opened.append(spill)
+        return SpilledFile(spill, name, loader=self, size=size)
+
+    def close(self):
+        """Release spilled temp files once the job is done."""
+        with self._lock:
+            opened, self._opened = self._opened, []
+        for f in opened:
+            try:
+                f.close()
+            except Exception:
+                pass
@@ -30,7 +30,16 @@ def filelike_from_s3_uri(s3_uri: str) -> io.BytesIO:
     return buf
 
 def files_from_s3_uris(s3_uris):
-    return [filelike_from_s3_uri(uri) for uri in s3_uris]
+    """Download all URIs in parallel (large objects spill to /tmp) and return file-likes in order."""
+    from utils.s3_attachment_loader import S3AttachmentLoader
+    loader = S3AttachmentLoader()
+    pending = []
+    for s3_uri in s3_uris:
+        parsed = urlparse(s3_uri)
+        if parsed.scheme != "s3":
+            raise ValueError(f"Not a valid S3 URI: {s3_uri}")
+        pending.append(loader.submit(parsed.netloc, unquote(parsed.path.lstrip("/"))))
+    return [p.result() for p in pending]
 
 def upload_json_to_s3(data: dict, bucket: str, key: str):
     """
@@ -0,0 +1,223 @@
+import json
+import time
+import asyncio
+import functools
+import threading
+import contextvars
+from config.processing_limits import METRICS_NAMESPACE, ENABLE_EMF_METRICS
+
+# Set for the duration of a pipeline run / a graph node. asyncio tasks and
+# asyncio.to_thread copy the context, and aconverse records its calls from the
+# calling task, so calls made anywhere under a node are attributed to it.
+_current_job = contextvars.ContextVar("telemetry_job", default=None)
+_current_node = contextvars.ContextVar("telemetry_node", default=None)
+
+TOKEN_FIELDS = (
+    ("inputTokens", "input_tokens"),
+    ("outputTokens", "output_tokens"),
+    ("cacheReadInputTokens", "cache_read_input_tokens"),
+    ("cacheWriteInputTokens", "cache_write_input_tokens"),
+)
+
+
+def emit_emf(dimensions: list, metrics: dict, properties: dict):
+    """
+    One CloudWatch Embedded Metric Format line: CloudWatch Logs turns `metrics`
+    into metrics under METRICS_NAMESPACE, the rest stays searchable as log fields.
+    """
+    if not ENABLE_EMF_METRICS:
+        return
+    units = {name: ("Milliseconds" if name.endswith("Ms") else "Count") for name in metrics}
+    print(json.dumps({
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": METRICS_NAMESPACE,
+                "Dimensions": dimensions,
+                "Metrics": [{"Name": name, "Unit": unit} for name, unit in units.items()],
+            }],
+        },
+        **properties,
+        **metrics,
+    }, default=str))
+
+
+def _empty_totals() -> dict:
+    return {"calls": 0, "errors": 0, "bedrock_ms": 0.0, "queue_ms": 0.0, "retries": 0,
+            "throttles": 0, **{name: 0 for _, name in TOKEN_FIELDS}}
+
+
+def _add_call(totals: dict, call: dict):
+    totals["calls"] += 1
+    totals["errors"] += 1 if call.get("error") else 0
+    totals["bedrock_ms"] += call["wall_ms"]
+    for key in ("queue_ms", "retries", "throttles", *(name for _, name in TOKEN_FIELDS)):
+        totals[key] += call.get(key, 0)
+
+
+class JobTelemetry:
+    """Node timings and Bedrock calls of one pipeline run, summarised for the Lambda response."""
+
+    def __init__(self, job_id=None):
+        self.job_id = job_id
+        self.started = time.perf_counter()
+        self.nodes = []
+        self.calls = []
+        self.documents = []
+        self._lock = threading.Lock()
+
+    def add_node(self, record: dict):
+        with self._lock:
+            self.nodes.append(record)
+
+    def add_call(self, record: dict):
+        with self._lock:
+            self.calls.append(record)
+
+    def add_document(self, record: dict):
+        with self._lock:
+            self.documents.append(record)
+
+    def summary(self) -> dict:
+        with self._lock:
+            nodes, calls, documents = list(self.nodes), list(self.calls), list(self.documents)
+
+        by_node, by_model, bedrock = {}, {}, _empty_totals()
+        for node in nodes:
+            by_node[node["node"]] = {"node_wall_ms": node["wall_ms"], **_empty_totals()}
+        for call in calls:
+            _add_call(bedrock, call)
+            _add_call(by_model.setdefault(call["model_id"], _empty_totals()), call)
+            node = by_node.setdefault(call.get("node") or "(none)", {"node_wall_ms": None, **_empty_totals()})
+            _add_call(node, call)
+
+        def rounded(totals):
+            return {k: round(v, 1) if isinstance(v, float) else v for k, v in totals.items()}
+
+        return {
+            "job_id": self.job_id,
+            "wall_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "bedrock": {**rounded(bedrock), "by_model": {m: rounded(t) for m, t in by_model.items()}},
+            "nodes": {name: rounded(totals) for name, totals in by_node.items()},
+            "text_layer": {
+                "documents": len(documents),
+                "sent_as_text": sum(1 for d in documents if d["sent_as"] == "text"),
+                "bytes_saved": sum(d["bytes_saved"] for d in documents),
+                "est_tokens_saved": sum(d["est_tokens_saved"] for d in documents),
+            },
+        }
+
+
+def start_job(telemetry: JobTelemetry):
+    """Make `telemetry` the collector for this context; returns the token for end_job."""
+    return _current_job.set(telemetry)
+
+
+def end_job(token):
+    _current_job.reset(token)
+
+
+def current_job():
+    return _current_job.get()
+
+
+# --- Bedrock calls ---
+def record_bedrock_call(operation: str, model_id: str, wall_ms: float, governor_stats: dict,
+                        response=None, error=None) -> dict:
+    """Called by bedrock_utils for every converse / invoke_model once it returns or fails."""
+    usage = (response.get("usage") or {}) if isinstance(response, dict) else {}
+    record = {
+        "operation": operation,
+        "model_id": model_id,
+        "node": _current_node.get(),
+        "wall_ms": wall_ms,
+        "queue_ms": governor_stats.get("queue_ms", 0.0),
+        "retries": max(0, governor_stats.get("attempts", 1) - 1),
+        "throttles": governor_stats.get("throttles", 0),
+        **{name: usage.get(field, 0) for field, name in TOKEN_FIELDS},
+    }
+    if error is not None:
+        record["error"] = type(error).__name__
+
+    job = _current_job.get()
+    if job is None:
+        return record
+    job.add_call(record)
+    emit_emf(
+        [["ModelId"], ["Node", "ModelId"]],
+        {
+            "BedrockLatencyMs": round(wall_ms, 1),
+            "BedrockQueueMs": round(record["queue_ms"], 1),
+            "BedrockRetries": record["retries"],
+            "InputTokens": record["input_tokens"],
+            "OutputTokens": record["output_tokens"],
+            "CacheReadInputTokens": record["cache_read_input_tokens"],
+            "CacheWriteInputTokens": record["cache_write_input_tokens"],
+        },
+        {"event": "bedrock_call", "job_id": job.job_id, "Node": record["node"] or "(none)",
+         "ModelId": model_id, "operation": operation, "error": record.get("error")},
+    )
+    return record
+
+
+# --- Documents ---
+def record_text_layer(file_name: str, sent_as: str, quality: float, original_bytes: int,
+                      sent_bytes: int, est_tokens_saved: int) -> dict:
+    """Called by the parser for every attachment: whether it went to Bedrock as text or as the original file."""
+    record = {
+        "file_name": file_name,
+        "sent_as": sent_as,
+        "quality": round(quality, 3),
+        "original_bytes": original_bytes,
+        "sent_bytes": sent_bytes,
+        "bytes_saved": original_bytes - sent_bytes,
+        "est_tokens_saved": est_tokens_saved,
+    }
+    print(json.dumps({"event": "text_layer", **record}))
+    job = _current_job.get()
+    if job is not None:
+        job.add_document(record)
+    return record
+
+
+# --- Graph nodes ---
+def _finish_node(name: str, started: float, error):
+    wall_ms = (time.perf_counter() - started) * 1000
+    job = _current_job.get()
+    if job is None:
+        return
+    job.add_node({"node": name, "wall_ms": wall_ms, "error": error})
+    emit_emf([["Node"]], {"NodeLatencyMs": round(wall_ms, 1)},
+             {"event": "pipeline_node", "job_id": job.job_id, "Node": name, "error": error})
+
+
+def traced(name: str, fn):
+    """Wrap a graph node so its wall time, and every Bedrock call it makes, are attributed to `name`."""
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_node(state):
+            token = _current_node.set(name)
+            started, error = time.perf_counter(), None
+            try:
+                return await fn(state)
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                _finish_node(name, started, error)
+                _current_node.reset(token)
+        return async_node
+
+    @functools.wraps(fn)
+    def node(state):
+        token = _current_node.set(name)
+        started, error = time.perf_counter(), None
+        try:
+            return fn(state)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            _finish_node(name, started, error)
+            _current_node.reset(token)
+    return node
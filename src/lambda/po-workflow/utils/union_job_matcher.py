@@ -0,0 +1,243 @@
+import math
+import re
+import threading
+from dataclasses import dataclass
+from utils.union_job_utils import get_union_job_table, TITLE_COLUMN
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+SEGMENT_RE = re.compile(r"[,;:.\n\r\t()/|]+")
+STOPWORDS = {"a", "an", "and", "the", "of", "for", "to", "in", "on", "at", "by", "with", "or"}
+
+SEGMENT_WINDOW = 8  # long field values are scored in overlapping windows of this many tokens
+FUZZY_TOKEN_THRESHOLD = 0.6  # trigram Jaccard for "custodial" ~ "custodian"
+FUZZY_CACHE_SIZE = 20000
+# Only fields describing the work are matched: vendor names, addresses and
+# product names ("Cook Medical Inc", "Printer driver software") are not labour
+DESCRIPTION_FIELD_RE = re.compile(
+    r"descr|scope|service|labou?r|work|line.?item|deliverable|position|role|job|task|dut(y|ies)|purpose",
+    re.IGNORECASE)
+# Sibling fields of a matched description that hold its price
+COST_FIELD_RE = re.compile(r"price|rate|cost|amount|total|fee", re.IGNORECASE)
+
+
+def tokenize(text: str) -> list:
+    tokens = []
+    for token in TOKEN_RE.findall(str(text).lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def trigrams(token: str) -> set:
+    padded = f"#{token}#"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class UnionJobCandidate:
+    title: str
+    score: float  # share of the title's IDF weight found in one phrase, 0..1
+    matched_weight: float
+    phrase: str = ""
+    doc_name: str = ""
+    doc_type: str = ""
+    field: str = ""
+
+
+class UnionJobMatcher:
+    """
+    Ranks union job titles against free text. Titles are indexed by token
+    (weighted by IDF) and every title token by character trigram, so plurals
+    and near spellings still count. A title scores by how much of its weight
+    appears inside a single phrase, so words scattered across a document do
+    not add up to a match.
+    """
+
+    def __init__(self, titles):
+        self.titles = list(dict.fromkeys(t for t in titles if t))
+        self._title_tokens = [set(tokenize(t)) for t in self.titles]
+
+        doc_freq = {}
+        for tokens in self._title_tokens:
+            for token in tokens:
+                doc_freq[token] = doc_freq.get(token, 0) + 1
+        n = len(self.titles)
+        self._idf = {t: math.log((n + 1) / (df + 0.5)) for t, df in doc_freq.items()}
+        self._title_weight = [sum(self._idf[t] for t in tokens) or 1.0
+                              for tokens in self._title_tokens]
+        self._weight_by_title = dict(zip(self.titles, self._title_weight))
+
+        self._postings = {}
+        for i, tokens in enumerate(self._title_tokens):
+            for token in tokens:
+                self._postings.setdefault(token, []).append(i)
+
+        self._trigram_index = {}
+        for token in self._idf:
+            for gram in trigrams(token):
+                self._trigram_index.setdefault(gram, set()).add(token)
+        self._fuzzy_cache = {}
+
+    def _vocab_matches(self, token: str) -> dict:
+        """Title tokens this document token counts as, with a similarity in 0..1."""
+        if token in self._idf:
+            return {token: 1.0}
+        cached = self._fuzzy_cache.get(token)
+        if cached is not None:
+            return cached
+        matches = {}
+        if len(token) >= 4:
+            grams = trigrams(token)
+            seen = set()
+            for gram in grams:
+                seen.update(self._trigram_index.get(gram, ()))
+            for vocab in seen:
+                other = trigrams(vocab)
+                similarity = len(grams & other) / len(grams | other)
+                if similarity >= FUZZY_TOKEN_THRESHOLD:
+                    matches[vocab] = similarity
+        if len(self._fuzzy_cache) >= FUZZY_CACHE_SIZE:
+            self._fuzzy_cache.clear()
+        self._fuzzy_cache[token] = matches
+        return matches
+
+    def _score_phrase(self, tokens: list) -> dict:
+        best_token = {}
+        for token in tokens:
+            for vocab, similarity in self._vocab_matches(token).items():
+                if similarity > best_token.get(vocab, 0.0):
+                    best_token[vocab] = similarity
+        matched = {}
+        for vocab, similarity in best_token.items():
+            weight = self._idf[vocab] * similarity
+            for i in self._postings.get(vocab, ()):
+                matched[i] = matched.get(i, 0.0) + weight
+        return matched
+
+    def rank(self, phrases, top_k: int = 10) -> list:
+        """
+        phrases: iterable of (text, source) where source is a dict with doc_name,
+        doc_type and field. Returns the best UnionJobCandidate per title, best first.
+        """
+        best = {}
+        for text, source in phrases:
+            for segment in SEGMENT_RE.split(text):
+                tokens = tokenize(segment)
+                if not tokens:
+                    continue
+                step = SEGMENT_WINDOW // 2
+                starts = range(0, max(1, len(tokens) - SEGMENT_WINDOW + step), step)
+                for start in starts:
+                    window = tokens[start:start + SEGMENT_WINDOW]
+                    for i, weight in self._score_phrase(window).items():
+                        score = min(1.0, weight / self._title_weight[i])
+                        current = best.get(i)
+                        if current is None or (score, weight) > (current.score, current.matched_weight):
+                            best[i] = UnionJobCandidate(
+                                title=self.titles[i], score=score, matched_weight=weight,
+                                phrase=segment.strip(), **source)
+
+        # Full matches first; between equal scores prefer the more specific title,
+        # then the one with less unmatched weight (e.g. without "Upon Request")
+        ranked = sorted(
+            best.values(),
+            key=lambda c: (-c.score, -c.matched_weight, self._weight_by_title[c.title]))
+        return ranked[:top_k]
+
+    def rank_parsed_data(self, parsed_data: dict, top_k: int = 10) -> list:
+        return self.rank(iter_parsed_phrases(parsed_data), top_k=top_k)
+
+    def best_title(self, text: str, min_score: float):
+        """Resolve a free-form title (e.g. the LLM's answer) to a listed one."""
+        ranked = self.rank([(text, {})], top_k=1)
+        if ranked and ranked[0].score >= min_score:
+            return ranked[0].title
+        return None
+
+
+def iter_parsed_phrases(parsed_data: dict):
+    """Yield (text, source) for every string value under a description/labour field."""
+    for doc_name, doc in (parsed_data or {}).items():
+        doc_type = _find_doc_type(doc) or ""
+        for text, source in _walk(doc, {"doc_name": str(doc_name), "doc_type": doc_type}, ""):
+            if DESCRIPTION_FIELD_RE.search(source["field"]):
+                yield text, source
+
+
+def find_phrase_cost(parsed_data: dict, candidate):
+    """
+    The price stated next to a candidate's phrase: a cost field in the same
+    record (line item or section) as the description it was found in. None
+    when the document does not put one there.
+    """
+    phrase = candidate.phrase.lower()
+    doc = (parsed_data or {}).get(candidate.doc_name)
+    return _find_cost(doc, phrase) if phrase else None
+
+
+def _find_cost(node, phrase):
+    if isinstance(node, dict):
+        described = any(
+            isinstance(value, str) and phrase in value.lower() and DESCRIPTION_FIELD_RE.search(str(key))
+            for key, value in node.items())
+        if described:
+            for key, value in node.items():
+                if COST_FIELD_RE.search(str(key)) and isinstance(value, (str, int, float)) \
+                        and not isinstance(value, bool) and str(value).strip():
+                    return value
+        children = node.values()
+    elif isinstance(node, list):
+        children = node
+    else:
+        return None
+    for child in children:
+        found = _find_cost(child, phrase)
+        if found is not None:
+            return found
+    return None
+
+
+def _find_doc_type(node):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key.lower().replace(" ", "_") == "doc_type" and isinstance(value, str):
+                return value
+        for value in node.values():
+            found = _find_doc_type(value)
+            if found:
+                return found
+    return None
+
+
+def _walk(node, source, field):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in ("doc_type", "error", "raw"):
+                continue
+            yield from _walk(value, source, f"{field} > {key}" if field else str(key))
+    elif isinstance(node, list):
+        for item in node:
+            # Line items inherit the list's field name unless they have their own keys
+            yield from _walk(item, source, field)
+    elif isinstance(node, str) and node.strip():
+        yield node, {**source, "field": field}
+
+
+_matcher = None
+_matcher_version = None
+_matcher_lock = threading.Lock()
+
+
+def get_union_job_matcher() -> UnionJobMatcher:
+    """Built once per container and rebuilt when the union job CSV changes."""
+    global _matcher, _matcher_version
+    table = get_union_job_table()
+    version = table.version
+    with _matcher_lock:
+        if _matcher is None or _matcher_version != version:
+            _matcher = UnionJobMatcher(table.column_values(TITLE_COLUMN))
+            _matcher_version = version
+        return _matcher
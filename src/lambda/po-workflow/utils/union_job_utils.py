@@ -1,25 +1,42 @@
 import os
-import pandas as pd
+import re
+from utils.reference_data import get_reference_table
 
 TITLE_COLUMN = "Deciphered Job Code Description"
 COST_COLUMN = "Total UC Cost"
 CSV_PATH = os.path.join("Data", "union_job_titles.csv")
 
 
+def get_union_job_table(filepath=CSV_PATH, title_col=TITLE_COLUMN):
+    # Indexed by normalized job title; loaded once and reloaded only if the CSV changes
+    return get_reference_table(filepath, title_col)
+
+
 def load_union_job_data(filepath=CSV_PATH, title_col=TITLE_COLUMN):
-    df = pd.read_csv(filepath)
-    df.columns = df.columns.str.strip()  # Clean column names
-    if title_col not in df.columns:
-        raise ValueError(f"Missing required column: '{title_col}' in CSV.")
-    titles = df[title_col].dropna().astype(str).tolist()
-    return df, titles
+    table = get_union_job_table(filepath, title_col)
+    return table, [t for t in table.column_values(title_col) if t]
+
+
+def to_amount(value):
+    """First number in a cost field ("$42.50/hr" -> 42.5), or None."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r"-?\d[\d,]*(?:\.\d+)?", str(value or ""))
+    return float(match.group(0).replace(",", "")) if match else None
+
+
+def build_cost_check(uc_cost, po_cost) -> dict:
+    """The cost_check section the prompt asks for: the PO passes at or above the UC cost."""
+    uc_amount, po_amount = to_amount(uc_cost), to_amount(po_cost)
+    return {
+        "UC_Cost": uc_cost,
+        "PO_Cost": po_cost,
+        "Pass": po_amount >= uc_amount if uc_amount is not None and po_amount is not None else None,
+    }
+
 
 def get_uc_cost(job_title: str) -> str:
-    df, _ = load_union_job_data()
-    df["__normalized_title__"] = df[TITLE_COLUMN].astype(
-        str).str.strip().str.lower()
-    title_norm = job_title.strip().lower()
-    match = df[df["__normalized_title__"] == title_norm]
-    if not match.empty:
-        return str(match.iloc[0][COST_COLUMN])
+    row = get_union_job_table().lookup(job_title)
+    if row is not None:
+        return str(row[COST_COLUMN])
     return "N/A"
@@ -0,0 +1,97 @@
+import json
+import os
+from functools import lru_cache
+import numpy as np
+
+MATRIX_SUFFIX = ".npy"
+TEXTS_SUFFIX = ".texts.json"
+
+
+def normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+def _replace_atomically(path: str, write):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def write_vector_index(base_path: str, vectors, texts: list, model_id: str, hashes=None,
+                       records=None):
+    """
+    Write an index as <base>.npy (unit-length float32 rows) plus <base>.texts.json
+    (model id, dimension, the text of each row and optionally a metadata record
+    per row). Both files are replaced atomically, so a running container never
+    sees a half-written index.
+    """
+    matrix = normalize_rows(np.asarray(vectors, dtype=np.float32))
+    if matrix.ndim != 2 or matrix.shape[0] != len(texts):
+        raise ValueError(f"Expected {len(texts)} vectors, got shape {matrix.shape}")
+
+    meta = {
+        "model_id": model_id,
+        "dim": int(matrix.shape[1]),
+        "count": int(matrix.shape[0]),
+        "texts": list(texts),
+    }
+    if hashes is not None:
+        meta["hashes"] = list(hashes)
+    if records is not None:
+        meta["records"] = list(records)
+
+    os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+    _replace_atomically(base_path + MATRIX_SUFFIX, lambda f: np.save(f, matrix))
+    _replace_atomically(base_path + TEXTS_SUFFIX,
+                        lambda f: f.write(json.dumps(meta).encode("utf-8")))
+
+
+class VectorIndex:
+    """Prebuilt embedding matrix, memory-mapped read-only, searched by inner product."""
+
+    def __init__(self, base_path: str):
+        with open(base_path + TEXTS_SUFFIX, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.base_path = base_path
+        self.model_id = meta["model_id"]
+        self.texts = meta["texts"]
+        self.hashes = meta.get("hashes")
+        self.records = meta.get("records")
+        self.matrix = np.load(base_path + MATRIX_SUFFIX, mmap_mode="r")
+        if self.matrix.shape != (len(self.texts), meta["dim"]):
+            raise ValueError(f"Vector index {base_path} is inconsistent: "
+                             f"{self.matrix.shape} vs {len(self.texts)} texts")
+
+    def __len__(self):
+        return len(self.texts)
+
+    def top_k(self, query_vector, k: int = 5) -> list:
+        """Top-k (row position, cosine similarity) pairs, best first."""
+        if not len(self.texts):
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        scores = self.matrix @ query
+
+        k = min(k, len(scores))
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+        else:
+            top = np.argsort(-scores)
+        return [(int(i), float(scores[i])) for i in top]
+
+    def search(self, query_vector, k: int = 5) -> list:
+        """Top-k (text, cosine similarity) pairs, best first."""
+        return [(self.texts[i], score) for i, score in self.top_k(query_vector, k)]
+
+
+@lru_cache(maxsize=None)
+def get_vector_index(base_path: str) -> VectorIndex:
+    # Loaded once per container; the matrix pages in from disk on first search
+    return VectorIndex(base_path)
@@ -0,0 +1,132 @@
+import argparse
+import os
+import threading
+from abc import ABC, abstractmethod
+from config.processing_limits import (
+    VECTOR_STORE_BACKEND,
+    VECTOR_INDEX_DIR,
+    OPENSEARCH_HOST,
+    OPENSEARCH_PORT,
+    OPENSEARCH_REGION,
+    OPENSEARCH_USERNAME,
+    OPENSEARCH_PASSWORD
+)
+
+EMBEDDING_FIELD = "embedding"
+
+
+class VectorStore(ABC):
+    """k-NN lookup over stored records. search() returns [(record, score), ...], best first."""
+
+    @abstractmethod
+    def search(self, vector, k: int = 1) -> list:
+        ...
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-container store: a prebuilt index (see utils.vector_index) searched with
+    NumPy. Exact inner product is used because the reference sets are a few
+    thousand rows at most, where a brute-force matmul beats a graph index.
+    """
+
+    def __init__(self, name: str, index_dir: str = VECTOR_INDEX_DIR):
+        from utils.vector_index import get_vector_index
+        self.index = get_vector_index(os.path.join(index_dir, f"{name}_vector_index"))
+
+    def search(self, vector, k: int = 1) -> list:
+        records = self.index.records
+        return [
+            (records[i] if records else {"text": self.index.texts[i]}, score)
+            for i, score in self.index.top_k(vector, k)
+        ]
+
+
+class OpenSearchVectorStore(VectorStore):
+    """Adapter for an OpenSearch k-NN index; credentials come from the environment or IAM."""
+
+    def __init__(self, name: str, host: str = OPENSEARCH_HOST, port: int = OPENSEARCH_PORT):
+        from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
+
+        if not host:
+            raise ValueError("OPENSEARCH_HOST is not set")
+        if OPENSEARCH_USERNAME:
+            auth = (OPENSEARCH_USERNAME, OPENSEARCH_PASSWORD)
+        else:
+            import boto3
+            auth = AWSV4SignerAuth(boto3.Session().get_credentials(), OPENSEARCH_REGION, "es")
+
+        self.name = name
+        self.client = OpenSearch(
+            hosts=[{"host": host, "port": port}],
+            http_auth=auth,
+            use_ssl=True,
+            verify_certs=True,
+            connection_class=RequestsHttpConnection
+        )
+
+    def search(self, vector, k: int = 1) -> list:
+        response = self.client.search(
+            index=self.name,
+            body={
+                "size": k,
+                "_source": {"excludes": [EMBEDDING_FIELD]},
+                "query": {"knn": {EMBEDDING_FIELD: {"vector": list(vector), "k": k}}}
+            }
+        )
+        return [(hit["_source"], hit.get("_score")) for hit in response["hits"]["hits"]]
+
+    def export(self, batch_size: int = 500):
+        """Yield (embedding, source) for every document, for building a local index."""
+        from opensearchpy.helpers import scan
+
+        for hit in scan(self.client, index=self.name, size=batch_size,
+                        query={"query": {"match_all": {}}}):
+            source = dict(hit["_source"])
+            yield source.pop(EMBEDDING_FIELD), source
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_vector_store(name: str, backend: str = VECTOR_STORE_BACKEND) -> VectorStore:
+    """One store per (index name, backend) per container."""
+    with _stores_lock:
+        store = _stores.get((name, backend))
+        if store is None:
+            if backend == "opensearch":
+                store = OpenSearchVectorStore(name)
+            elif backend == "local":
+                store = LocalVectorStore(name)
+            else:
+                raise ValueError(f"Unknown VECTOR_STORE_BACKEND '{backend}'")
+            _stores[(name, backend)] = store
+        return store
+
+
+def export_opensearch_to_local(name: str, model_id: str, text_field: str = None,
+                               index_dir: str = VECTOR_INDEX_DIR) -> int:
+    """Copy an OpenSearch k-NN index into the local store format."""
+    from utils.vector_index import write_vector_index
+
+    vectors, records = [], []
+    for vector, source in OpenSearchVectorStore(name).export():
+        vectors.append(vector)
+        records.append(source)
+    texts = [str(r.get(text_field, "")) if text_field else "" for r in records]
+    write_vector_index(os.path.join(index_dir, f"{name}_vector_index"),
+                       vectors, texts, model_id, records=records)
+    return len(records)
+
+
+if __name__ == "__main__":
+    # OPENSEARCH_HOST=... python -m utils.vector_store services --model-id amazon.titan-embed-text-v1
+    parser = argparse.ArgumentParser(description="Export an OpenSearch k-NN index to the local store")
+    parser.add_argument("name")
+    parser.add_argument("--model-id", required=True)
+    parser.add_argument("--text-field", default=None)
+    args = parser.parse_args()
+
+    count = export_opensearch_to_local(args.name, args.model_id, args.text_field)
+    print(f"✅ Exported {count} records from '{args.name}' to {VECTOR_INDEX_DIR}")